@@ -17,6 +17,12 @@ const long printInterval = 500; // Interval 0.5 detik (500 milidetik)
 
 const int AMBANG_BATAS = 7;
 
+// --- Pesan biner (selain JSON) ---
+const size_t PESAN_BINER_UKURAN = 11;
+const uint8_t PESAN_BINER_VERSI = 1;
+uint16_t lastSeqBiner = 0;
+bool adaSeqBiner = false;
+
 // --- PENGATURAN HOTSPOT ---
 // Atur nama dan password untuk hotspot yang akan dibuat oleh ESP32
 const char* ssid = "ESP32-FaceController";
@@ -35,6 +41,26 @@ void onWebSocketEvent(uint8_t num, WStype_t type, uint8_t * payload, size_t leng
     latestKanan = doc["kanan"];
     latestKiri = doc["kiri"];
   }
+  else if (type == WStype_BIN) {
+    // Pesan biner 11 byte (Inti/wire_protocol.py):
+    // [versi|flag] [kanan] [kiri] [atas] [bawah] [seq 2 byte] [timestamp ms 4 byte]
+    if (length != PESAN_BINER_UKURAN || (payload[0] >> 4) != PESAN_BINER_VERSI) {
+      return;
+    }
+    uint16_t seq = payload[5] | (payload[6] << 8);
+    bool keyframe = payload[0] & 0x01;
+    // Abaikan pesan yang datang terlambat (urutan tertukar), kecuali keyframe
+    if (adaSeqBiner && !keyframe && (uint16_t)(seq - lastSeqBiner) >= 0x8000) {
+      return;
+    }
+    adaSeqBiner = true;
+    lastSeqBiner = seq;
+
+    latestKanan = payload[1];
+    latestKiri = payload[2];
+    latestAtas = payload[3];
+    latestBawah = payload[4];
+  }
 }
 
 void setup() {
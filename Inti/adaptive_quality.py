@@ -0,0 +1,175 @@
+import time
+
+import cv2
+import mediapipe as mp
+
+from head_features import LandmarkResult, landmarks_to_array
+
+# --- TANGGA KUALITAS ---
+# (lebar inferensi atau None = resolusi kamera, refine_landmarks/iris, stride inferensi)
+# Dari kualitas tertinggi ke terendah; controller turun satu anak tangga jika frame terlalu lambat.
+LADDER = [
+    (None, True, 1),
+    (960, True, 1),
+    (640, True, 1),
+    (640, False, 1),
+    (480, False, 1),
+    (480, False, 2),
+    (320, False, 2),
+    (320, False, 3),
+]
+TARGET_FPS = 30
+HEADROOM = 0.55          # naik lagi jika biaya per frame < 55% budget ...
+DETIK_NAIK = 3.0         # ... selama selang ini
+DETIK_TURUN = 0.5        # turun jika biaya per frame > budget selama selang ini
+JEDA_GANTI = 1.0         # detik setelah pindah level sebelum level boleh berubah lagi
+HUKUMAN_AWAL = 10.0      # detik larangan naik ke level yang baru saja gagal (berlipat jika gagal lagi)
+MAKS_EKSTRAPOLASI = 0.15  # detik; lebih jauh dari ini landmark terakhir ditahan saja
+
+
+class QualityController:
+    """
+    Memilih level di LADDER dari biaya pemrosesan per frame (EWMA) terhadap budget 1/target_fps.
+    Turun cepat saat terlambat, naik pelan saat ada ruang, dan level yang baru saja membuat
+    terlambat diberi masa larangan yang makin panjang agar tidak bolak-balik.
+    Waktu diberikan dari luar (`now`) seperti HeadTracker.
+    """
+
+    def __init__(self, target_fps=TARGET_FPS, ladder=LADDER, level=0, alpha=0.1):
+        self.ladder = ladder
+        self.budget = 1.0 / target_fps
+        self.level = level
+        self.alpha = alpha
+        self.biaya = None  # EWMA detik per frame (frame yang dilewati stride ikut dihitung, biayanya kecil)
+        self._sejak_lambat = None
+        self._sejak_longgar = None
+        self._waktu_ganti = None
+        self._larangan = {}  # level -> (sampai, durasi hukuman)
+        self.riwayat = []    # (now, level_lama, level_baru, biaya)
+
+    @property
+    def setting(self):
+        return self.ladder[self.level]
+
+    def update(self, durasi, now):
+        """Catat biaya satu frame; kembalikan level (mungkin berubah)."""
+        self.biaya = durasi if self.biaya is None else self.biaya + self.alpha * (durasi - self.biaya)
+        if self._waktu_ganti is not None and now - self._waktu_ganti < JEDA_GANTI:
+            return self.level
+
+        if self.biaya > self.budget:
+            self._sejak_longgar = None
+            self._sejak_lambat = self._sejak_lambat if self._sejak_lambat is not None else now
+            if now - self._sejak_lambat >= DETIK_TURUN and self.level < len(self.ladder) - 1:
+                _, durasi_hukuman = self._larangan.get(self.level, (0.0, HUKUMAN_AWAL / 2))
+                self._larangan[self.level] = (now + durasi_hukuman * 2, durasi_hukuman * 2)
+                self._ganti(self.level + 1, now)
+        elif self.biaya < self.budget * HEADROOM:
+            self._sejak_lambat = None
+            self._sejak_longgar = self._sejak_longgar if self._sejak_longgar is not None else now
+            atas = self.level - 1
+            if (now - self._sejak_longgar >= DETIK_NAIK and atas >= 0
+                    and now >= self._larangan.get(atas, (0.0, 0.0))[0]):
+                self._ganti(atas, now)
+        else:
+            self._sejak_lambat = self._sejak_longgar = None
+        return self.level
+
+    def _ganti(self, level, now):
+        self.riwayat.append((now, self.level, level, self.biaya))
+        self.level = level
+        self._waktu_ganti = now
+        self._sejak_lambat = self._sejak_longgar = None
+        self.biaya = None  # biaya level baru diukur ulang dari nol
+
+
+class LandmarkExtrapolator:
+    """Perkirakan landmark di frame yang tidak diinferensi dari dua hasil terakhir (kecepatan konstan)."""
+
+    def __init__(self, maks_detik=MAKS_EKSTRAPOLASI):
+        self.maks_detik = maks_detik
+        self.reset()
+
+    def reset(self):
+        self._lama = None  # (t, [array (N, 3) per wajah])
+        self._baru = None
+
+    def update(self, wajah, t):
+        self._lama, self._baru = self._baru, (t, wajah)
+
+    def predict(self, t):
+        if self._baru is None:
+            return []
+        t1, wajah1 = self._baru
+        if self._lama is None or t - t1 > self.maks_detik:
+            return wajah1
+        t0, wajah0 = self._lama
+        if len(wajah0) != len(wajah1) or t1 <= t0:
+            return wajah1
+        k = (t - t1) / (t1 - t0)
+        return [b + (b - a) * k if a.shape == b.shape else b for a, b in zip(wajah0, wajah1)]
+
+
+class AdaptiveFaceMesh:
+    """
+    Pengganti `face_mesh.process` yang menjaga target FPS: resolusi inferensi, refine_landmarks
+    dan stride dipilih QualityController dari biaya tiap frame. Dua FaceMesh (dengan & tanpa iris)
+    dibuat sekali dan tetap hangat. Frame yang dilewati stride mendapat landmark hasil ekstrapolasi.
+    Hasil selalu LandmarkResult (array (N, 3)), jadi bisa dibungkus RoiFaceMesh atau direkam TraceWriter.
+    """
+
+    def __init__(self, target_fps=TARGET_FPS, max_num_faces=1, ladder=LADDER,
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5):
+        self.controller = QualityController(target_fps, ladder)
+        self.extrapolator = LandmarkExtrapolator()
+        self._opsi = dict(max_num_faces=max_num_faces, min_detection_confidence=min_detection_confidence,
+                          min_tracking_confidence=min_tracking_confidence)
+        self._model = {}
+        self._frame = 0
+        self.frames_inferensi = 0
+        self.frames_ekstrapolasi = 0
+
+    def _mesh(self, refine):
+        if refine not in self._model:
+            self._model[refine] = mp.solutions.face_mesh.FaceMesh(refine_landmarks=refine, **self._opsi)
+        return self._model[refine]
+
+    def process(self, rgb):
+        mulai = time.perf_counter()
+        lebar, refine, stride = self.controller.setting
+        self._frame += 1
+
+        if stride > 1 and self._frame % stride and self.frames_inferensi:
+            hasil = LandmarkResult(self.extrapolator.predict(mulai))
+            self.frames_ekstrapolasi += 1
+        else:
+            h, w = rgb.shape[:2]
+            if lebar is not None and w > lebar:
+                rgb = cv2.resize(rgb, (lebar, int(h * lebar / w)), interpolation=cv2.INTER_AREA)
+            mentah = self._mesh(refine).process(rgb)
+            wajah = [landmarks_to_array(f) for f in (mentah.multi_face_landmarks or [])]
+            if not wajah:
+                self.extrapolator.reset()
+            self.extrapolator.update(wajah, mulai)
+            hasil = LandmarkResult(wajah)
+            self.frames_inferensi += 1
+
+        # Landmark ternormalisasi (0..1), jadi ekstrapolasi tetap berlaku walau resolusi inferensi berganti
+        self.controller.update(time.perf_counter() - mulai, mulai)
+        return hasil
+
+    def ringkasan(self):
+        lebar, refine, stride = self.controller.setting
+        return (f"Kualitas adaptif: level {self.controller.level} (lebar {lebar or 'penuh'}, "
+                f"iris {'ya' if refine else 'tidak'}, stride {stride}), {len(self.controller.riwayat)}x pindah level, "
+                f"{self.frames_inferensi} frame inferensi + {self.frames_ekstrapolasi} ekstrapolasi")
+
+    def close(self):
+        for model in self._model.values():
+            model.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
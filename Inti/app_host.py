@@ -0,0 +1,331 @@
+import time
+
+import cv2
+import mediapipe as mp
+
+from calibration import ProfileStore, kunci_profil
+from face_count import FaceCountScheduler, fitur_wajah_utama
+from pipeline import TrackingPipeline
+from proctoring import ProctorConfig, ProctorSession, teks_pelanggaran
+from roi_tracker import RoiFaceMesh, buat_model_cari
+from motion_gate import MotionGate
+from temple_run_game import GameRunner
+from tracking import HeadTracker
+
+# --- KONFIGURASI ---
+WINDOW_NAME = "Head Tracking System"
+# Satu FaceMesh untuk semua mode. max_num_faces=2 agar mode pengawasan bisa memberi peringatan
+# multi-wajah (penghitung "mesh"); mode lain memakai wajah terbesar saja.
+MAX_FACES = 2
+ROI_MODE = False
+ROI_SIZE = 256
+ROI_FULL_INTERVAL = 30
+MOTION_GATE = False  # lewati inferensi saat gambar diam, landmark terakhir dipakai ulang
+
+# Mode test tracking (main.py)
+SMOOTHING_FRAMES = 7
+SMOOTHING_FILTER = "moving_average"
+DEADZONE_THRESHOLD = 4
+# Profil kalibrasi untuk mode test & game (sama dengan main.py): posisi netral dicek sebentar saat masuk mode,
+# kotak & jeda dilewati jika tidak bergeser. None = selalu kalibrasi.
+PROFILE_STORE = None  # mis. "calibration_profiles.json"
+PROFILE_USER = "default"
+
+mp_face_mesh = mp.solutions.face_mesh
+
+
+# --- MODE ---
+class Mode:
+    """
+    Satu layar aplikasi. Host memanggil `frame` setiap iterasi loop dengan paket kamera terbaru
+    (None jika tracker belum menghasilkan frame baru) dan `tombol` untuk setiap tombol yang ditekan.
+    `tombol` mengembalikan nama mode tujuan, "keluar", atau None untuk tetap di mode ini.
+    """
+
+    nama = ""
+
+    def masuk(self):
+        pass
+
+    def frame(self, paket, latensi_ms):
+        """Kembalikan gambar untuk ditampilkan, atau None jika tidak ada yang berubah."""
+        return None
+
+    def tombol(self, key):
+        return None
+
+    def tunggu_ms(self):
+        return 5
+
+
+class MenuMode(Mode):
+    nama = "menu"
+
+    def frame(self, paket, latensi_ms):
+        if paket is None:
+            return None
+        image = paket.frame
+        h, w = image.shape[:2]
+
+        # Background menu (hanya area menu yang digelapkan)
+        roi = image[50:h-50, 50:w-50]
+        cv2.addWeighted(roi, 0.3, roi, 0, 0, dst=roi)
+
+        cv2.putText(image, "HEAD TRACKING SYSTEM", (w//2 - 250, 120),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 3)
+        cv2.putText(image, "1. Tekan 'T' - Test Head Tracking", (w//2 - 200, 220),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+        cv2.putText(image, "2. Tekan 'G' - Play Temple Run Game", (w//2 - 200, 270),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+        cv2.putText(image, "3. Tekan 'P' - Pengawasan Ujian", (w//2 - 200, 320),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+        cv2.putText(image, "4. Tekan 'Q' - Quit", (w//2 - 200, 370),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+        cv2.putText(image, "Tekan 'M' untuk kembali ke menu dari mode lain", (w//2 - 220, h-100),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (150, 150, 150), 2)
+        return image
+
+    def tombol(self, key):
+        return {ord('t'): "tracking", ord('g'): "game", ord('p'): "proctor", ord('q'): "keluar"}.get(key)
+
+
+class TrackingMode(Mode):
+    """Logika main.py: kalibrasi (atau profil tersimpan) lalu persentase kanan/kiri/atas/bawah."""
+
+    nama = "tracking"
+
+    def __init__(self, profiles=None, kunci=None):
+        self.tracker = HeadTracker(SMOOTHING_FRAMES, SMOOTHING_FILTER, DEADZONE_THRESHOLD)
+        self.profiles = profiles
+        self.kunci = kunci or kunci_profil(PROFILE_USER)
+        self.profil_disimpan = False
+
+    def masuk(self):
+        self.tracker.reset(self.profiles.load(self.kunci) if self.profiles is not None else None)
+        self.profil_disimpan = False
+
+    def frame(self, paket, latensi_ms):
+        if paket is None:
+            return None
+        image = paket.frame
+        h, w = image.shape[:2]
+        tracker = self.tracker
+        status = tracker.update(fitur_wajah_utama(paket.results, w, h), w, h, time.time())
+
+        if status == tracker.KALIBRASI:
+            x1, y1, x2, y2 = tracker.calibration_box(w, h)
+            cv2.rectangle(image, (x1, y1), (x2, y2), (0, 255, 0), 2)
+            cv2.putText(image, "Posisikan wajah & tekan 'r' utk kalibrasi ulang", (x1 - 100, y1 - 20),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+        elif status == tracker.VERIFIKASI:
+            cv2.putText(image, "Mencocokkan profil kalibrasi...", (50, 50),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
+        elif status == tracker.SIAP:
+            cv2.putText(image, "Kalibrasi Selesai! SIAP!", (50, 50),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+        elif status == tracker.TRACKING:
+            if self.profiles is not None and not self.profil_disimpan and tracker.profile_used is None:
+                profil = tracker.calibration_profile(w, h)
+                if profil is not None:
+                    self.profiles.save(self.kunci, profil)
+                    self.profil_disimpan = True
+            kanan, kiri, atas, bawah = tracker.percents
+            cv2.putText(image, f"Kanan: {kanan}%  Kiri: {kiri}%",
+                        (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+            cv2.putText(image, f"Atas: {atas}%  Bawah: {bawah}%",
+                        (50, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+        else:
+            pesan = "Wajah tidak terdeteksi" if tracker.kalibrasi_selesai else "Posisikan wajah di dalam kotak"
+            cv2.putText(image, pesan, (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+
+        cv2.putText(image, f"Latensi: {latensi_ms:.0f} ms", (w - 200, h - 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 1)
+        return image
+
+    def tombol(self, key):
+        if key == ord('r'):
+            # Kalibrasi ulang eksplisit selalu penuh, hasilnya menggantikan profil tersimpan
+            self.tracker.reset()
+            self.profil_disimpan = False
+        elif key == ord('m'):
+            return "menu"
+        elif key == ord('q'):
+            return "keluar"
+        return None
+
+
+class ProctorMode(Mode):
+    """Logika branch.py. Sesi (kalibrasi & history pelanggaran) tetap tersimpan saat pindah mode."""
+
+    nama = "proctor"
+
+    def __init__(self, config=None):
+        self.sesi = ProctorSession("lokal", config or ProctorConfig())
+        self.penghitung_wajah = FaceCountScheduler("mesh")
+
+    def frame(self, paket, latensi_ms):
+        if paket is None:
+            return None
+        frame = paket.frame
+        h, w = frame.shape[:2]
+        sesi = self.sesi
+        jumlah_wajah = self.penghitung_wajah.count(None, paket.results)
+
+        if jumlah_wajah > 1:
+            cv2.putText(frame, "!!! LEBIH DARI 1 WAJAH !!!", (w // 2 - 300, h // 2 - 50),
+                        cv2.FONT_HERSHEY_DUPLEX, 1.5, (0, 0, 255), 3)
+        if not sesi.is_calibrated and not sesi.is_calibrating:
+            cv2.putText(frame, "Tekan 'c' untuk memulai kalibrasi", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
+
+        fitur = fitur_wajah_utama(paket.results, w, h)
+        now = time.time()
+        if fitur is not None and sesi.is_calibrating:
+            cv2.putText(frame, f"Tahan Posisi... {sesi.calibration_remaining(now)}", (50, 100),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
+
+        for event in sesi.update(fitur, w, h, now):
+            if event["type"] == "calibrated":
+                print("===== KALIBRASI BERHASIL! =====")
+            elif event["type"] == "violation":
+                print(teks_pelanggaran(event))
+
+        if fitur is not None and sesi.is_calibrated:
+            kanan, kiri, atas, bawah = sesi.percents
+            if sesi.warning:
+                cv2.putText(frame, "!!! WARNING !!!", (w // 2 - 200, h // 2), cv2.FONT_HERSHEY_TRIPLEX, 2, (0, 0, 255), 3)
+            cv2.putText(frame, f"Kanan: {kanan}% | Kiri: {kiri}%", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+            cv2.putText(frame, f"Atas: {atas}% | Bawah: {bawah}%", (50, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+            cv2.putText(frame, f"Pelanggaran (1 mnt): {sesi.violations_in_window}", (50, h-30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+            cv2.putText(frame, "Tekan 'c' untuk re-kalibrasi", (w - 350, h - 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+        elif fitur is None and sesi.is_calibrated:
+            cv2.putText(frame, "!!! WAJAH HILANG !!!", (w // 2 - 250, h // 2),
+                        cv2.FONT_HERSHEY_DUPLEX, 1.5, (0, 165, 255), 3)
+
+        cv2.putText(frame, f"Latensi: {latensi_ms:.0f} ms", (w - 200, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 1)
+        return frame
+
+    def tombol(self, key):
+        if key == ord('c'):
+            self.sesi.start_calibration(time.time())
+            print("\n===== MEMULAI KALIBRASI BARU =====")
+        elif key == ord('m'):
+            return "menu"
+        elif key == ord('q'):
+            return "keluar"
+        return None
+
+
+class GameMode(Mode):
+    """Temple Run dengan fixed timestep; dirender setiap iterasi, tidak hanya saat ada frame kamera."""
+
+    nama = "game"
+
+    def __init__(self, profiles=None):
+        self.runner = GameRunner(profiles=profiles)
+        self.ukuran = (720, 1280)
+
+    def masuk(self):
+        self.runner.reset()
+        self.runner.lanjut()
+
+    def frame(self, paket, latensi_ms):
+        if paket is not None:
+            self.ukuran = paket.frame.shape[:2]
+        h, w = self.ukuran
+        if paket is not None:
+            self.runner.input(paket.results, w, h)
+        self.runner.simulasi(w, h)
+        return self.runner.render(h, w, latensi_ms)
+
+    def tombol(self, key):
+        if key == ord('r'):
+            self.runner.reset()
+        elif key in (27, ord('m')):
+            return "menu"
+        return None
+
+    def tunggu_ms(self):
+        return self.runner.tunggu_ms()
+
+
+# --- HOST ---
+class AppHost:
+    """
+    Satu kamera, satu pipeline capture/inferensi dan satu FaceMesh yang tetap hangat untuk semua mode.
+    Pindah mode hanya mengganti objek yang menerima frame, tanpa membuka kamera atau memuat model lagi.
+    """
+
+    def __init__(self, sumber, modes, awal="menu"):
+        self.sumber = sumber
+        self.modes = {mode.nama: mode for mode in modes}
+        self.mode = None
+        self.waktu_ganti = []  # (dari, ke, ms) untuk laporan
+        self.ganti(awal)
+
+    def ganti(self, nama):
+        mulai = time.perf_counter()
+        lama = self.mode.nama if self.mode is not None else None
+        self.mode = self.modes[nama]
+        self.mode.masuk()
+        ms = (time.perf_counter() - mulai) * 1000
+        if lama is not None:
+            self.waktu_ganti.append((lama, nama, ms))
+            print(f"Mode {lama} -> {nama} ({ms:.2f} ms)")
+
+    def jalan(self):
+        paket = self.sumber.poll(timeout=5.0)
+        while paket is not None or self.sumber.aktif:
+            image = self.mode.frame(paket, self.sumber.latency.last_ms)
+            if image is not None:
+                cv2.imshow(WINDOW_NAME, image)
+            if paket is not None:
+                self.sumber.selesai(paket)
+
+            key = cv2.waitKey(self.mode.tunggu_ms()) & 0xFF
+            if key != 255:
+                tujuan = self.mode.tombol(key)
+                if tujuan == "keluar":
+                    break
+                if tujuan is not None and tujuan != self.mode.nama:
+                    self.ganti(tujuan)
+
+            paket = self.sumber.poll(timeout=0 if isinstance(self.mode, GameMode) else 0.1)
+
+    def ringkasan(self):
+        if not self.waktu_ganti:
+            return "Pindah mode: tidak ada"
+        ms = [w for _, _, w in self.waktu_ganti]
+        return f"Pindah mode: {len(ms)}x, rata-rata {sum(ms) / len(ms):.2f} ms, maks {max(ms):.2f} ms"
+
+
+if __name__ == "__main__":
+    cap = cv2.VideoCapture(0)
+
+    cv2.namedWindow(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN)
+    cv2.setWindowProperty(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+
+    with mp_face_mesh.FaceMesh(
+        max_num_faces=MAX_FACES, refine_landmarks=True, min_detection_confidence=0.5, min_tracking_confidence=0.5
+    ) as face_mesh:
+        roi = None
+        if ROI_MODE:
+            roi = RoiFaceMesh(face_mesh.process, ROI_SIZE, full_interval=ROI_FULL_INTERVAL,
+                              search_process=buat_model_cari(MAX_FACES).process)
+        proses = roi.process if ROI_MODE else face_mesh.process
+        gate = MotionGate(proses) if MOTION_GATE else None
+        sumber = TrackingPipeline(cap, gate.process if MOTION_GATE else proses)
+        profil_store = ProfileStore(PROFILE_STORE) if PROFILE_STORE else None
+        host = AppHost(sumber, [MenuMode(), TrackingMode(profil_store), ProctorMode(), GameMode(profil_store)])
+        host.jalan()
+        sumber.stop()
+
+    print(host.ringkasan())
+    print(sumber.latency.ringkasan())
+    if roi is not None:
+        print(roi.ringkasan())
+    if gate is not None:
+        print(gate.ringkasan())
+    cap.release()
+    cv2.destroyAllWindows()
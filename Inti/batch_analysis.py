@@ -0,0 +1,149 @@
+import argparse
+import json
+import multiprocessing as mproc
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from face_count import FaceCountScheduler, wajah_utama
+from head_features import HeadFeatures
+from proctoring import ProctorConfig, ProctorSession
+
+# --- KONFIGURASI DEFAULT ---
+CHUNK_SECONDS = 60  # panjang potongan video yang diproses paralel
+STRIDE = 2          # proses 1 dari tiap N frame (2 = 15 FPS untuk video 30 FPS)
+
+
+def info_video(path):
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    jumlah_frame = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return fps, jumlah_frame
+
+
+def ekstrak_potongan(path, frame_awal, frame_akhir, stride, fps):
+    """
+    Tahap 1 (paralel): jalankan FaceMesh di satu potongan video.
+    Hanya fitur kecil per frame yang dikembalikan: waktu, ukuran frame, nilai piksel HeadFeatures, jumlah wajah.
+    """
+    cap = cv2.VideoCapture(path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_awal)
+    penghitung = FaceCountScheduler("mesh")
+    face_mesh = mp.solutions.face_mesh.FaceMesh(
+        max_num_faces=penghitung.mesh_max_faces, refine_landmarks=True,
+        min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+    # kolom: t, w, h, x_n, y_n, x_eye_center, y_min, y_max, jumlah_wajah (x_n = -1 jika wajah tidak terdeteksi)
+    hasil = []
+    for frame_idx in range(frame_awal, frame_akhir):
+        if (frame_idx - frame_awal) % stride:
+            if not cap.grab():
+                break
+            continue
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frame = cv2.flip(frame, 1)
+        h, w, _ = frame.shape
+        results = face_mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        jumlah = penghitung.count(None, results)
+        nilai = (-1, -1, -1, -1, -1)
+        if results.multi_face_landmarks:
+            fitur = HeadFeatures(wajah_utama(results.multi_face_landmarks), w, h)
+            nilai = (fitur.x_n, fitur.y_n, fitur.x_eye_center, fitur.y_min, fitur.y_max)
+        hasil.append((frame_idx / fps, w, h, *nilai, jumlah))
+
+    cap.release()
+    face_mesh.close()
+    return np.array(hasil, dtype=np.float64).reshape(-1, 9)
+
+
+def jalankan_state_machine(session_id, fitur_per_frame, config):
+    """
+    Tahap 2 (berurutan, murah): state machine yang sama dengan branch.py, memakai timestamp video.
+    Kalibrasi dimulai otomatis di frame pertama.
+    """
+    sesi = ProctorSession(session_id, config)
+    events = []
+    multi_wajah_mulai = None
+    interval_multi_wajah = []
+    detik_wajah_hilang = 0.0
+    t_sebelum = None
+
+    for t, w, h, x_n, y_n, x_eye_center, y_min, y_max, jumlah in fitur_per_frame:
+        if t_sebelum is None:
+            events.append(sesi.start_calibration(t))
+        fitur = None
+        if x_n >= 0:
+            fitur = HeadFeatures.from_values(x_n, y_n, x_eye_center, y_min, y_max)
+        elif t_sebelum is not None and sesi.is_calibrated:
+            detik_wajah_hilang += t - t_sebelum
+        events.extend(sesi.update(fitur, int(w), int(h), t))
+
+        if jumlah > 1 and multi_wajah_mulai is None:
+            multi_wajah_mulai = t
+        elif jumlah <= 1 and multi_wajah_mulai is not None:
+            interval_multi_wajah.append([multi_wajah_mulai, t])
+            multi_wajah_mulai = None
+        t_sebelum = t
+
+    if multi_wajah_mulai is not None:
+        interval_multi_wajah.append([multi_wajah_mulai, t_sebelum])
+    return events, interval_multi_wajah, detik_wajah_hilang
+
+
+def analisis_video(path, executor, chunk_seconds, stride, config):
+    mulai = time.perf_counter()
+    fps, jumlah_frame = info_video(path)
+    panjang = max(1, int(chunk_seconds * fps))
+    # Potongan dimulai di kelipatan stride agar frame yang dipilih sama dengan tanpa potongan
+    panjang = max(stride, panjang - panjang % stride)
+    futures = [executor.submit(ekstrak_potongan, path, awal, min(awal + panjang, jumlah_frame), stride, fps)
+               for awal in range(0, jumlah_frame, panjang)]
+    fitur_per_frame = np.concatenate([f.result() for f in futures]) if futures else np.empty((0, 9))
+
+    session_id = os.path.splitext(os.path.basename(path))[0]
+    events, interval_multi_wajah, detik_wajah_hilang = jalankan_state_machine(session_id, fitur_per_frame, config)
+    durasi_proses = time.perf_counter() - mulai
+    durasi_video = jumlah_frame / fps
+    return {
+        "video": path,
+        "duration_seconds": durasi_video,
+        "fps": fps,
+        "stride": stride,
+        "frames_processed": len(fitur_per_frame),
+        "chunks": len(futures),
+        "calibrated": any(e["type"] == "calibrated" for e in events),
+        "violations": [e for e in events if e["type"] == "violation"],
+        "multiple_faces": interval_multi_wajah,
+        "face_lost_seconds": round(detik_wajah_hilang, 2),
+        "processing_seconds": round(durasi_proses, 2),
+        "speedup_vs_realtime": round(durasi_video / durasi_proses, 1) if durasi_proses else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analisis pelanggaran dari rekaman ujian (lebih cepat dari real time)")
+    parser.add_argument("videos", nargs="+", help="file rekaman ujian")
+    parser.add_argument("--output-dir", default="laporan_pelanggaran", help="folder laporan JSON per video")
+    parser.add_argument("--chunk-seconds", type=float, default=CHUNK_SECONDS)
+    parser.add_argument("--stride", type=int, default=STRIDE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    config = ProctorConfig()
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=mproc.get_context("spawn")) as executor:
+        for path in args.videos:
+            laporan = analisis_video(path, executor, args.chunk_seconds, args.stride, config)
+            nama = os.path.splitext(os.path.basename(path))[0] + ".violations.json"
+            with open(os.path.join(args.output_dir, nama), "w", encoding="utf-8") as f:
+                json.dump(laporan, f, indent=2)
+            print(f"{path}: {len(laporan['violations'])} pelanggaran, "
+                  f"{laporan['duration_seconds']:.0f} s video diproses dalam {laporan['processing_seconds']:.1f} s "
+                  f"({laporan['speedup_vs_realtime']}x real time)")
@@ -0,0 +1,136 @@
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from adaptive_quality import LADDER, TARGET_FPS, AdaptiveFaceMesh, LandmarkExtrapolator, QualityController
+from bench_stages import frame_rekaman, frame_sintetis, ringkas
+from landmark_trace import TraceReader
+
+# --- KONFIGURASI BENCHMARK ---
+JUMLAH_FRAME = 150
+JUMLAH_PEMANASAN = 10
+FPS_KAMERA = 30
+# Skenario beban: (detik, faktor perlambatan) — mis. laptop lain sibuk lalu longgar lagi
+SKENARIO = [(10, 1.0), (15, 8.0), (25, 1.0)]
+
+
+def biaya_per_level(frames_rgb, pemanasan):
+    """Ukur biaya inferensi nyata tiap kombinasi (lebar, refine) di LADDER; kembalikan {(lebar, refine): detik[]}."""
+    biaya = {}
+    for lebar, refine, _ in LADDER:
+        if (lebar, refine) in biaya:
+            continue
+        with AdaptiveFaceMesh(ladder=[(lebar, refine, 1)]) as model:
+            for rgb in frames_rgb[:pemanasan]:
+                model.process(rgb)
+            durasi = []
+            for rgb in frames_rgb[pemanasan:]:
+                mulai = time.perf_counter()
+                model.process(rgb)
+                durasi.append(time.perf_counter() - mulai)
+        biaya[(lebar, refine)] = np.array(durasi)
+    return biaya
+
+
+def simulasi(biaya, skenario, fps_kamera, target_fps, seed=0):
+    """
+    Jalankan QualityController dengan jam simulasi: biaya frame diambil acak dari hasil ukur level aktif
+    dikali faktor perlambatan skenario. Kembalikan list (detik, level, fps tercapai, faktor) per detik.
+    """
+    rng = np.random.default_rng(seed)
+    controller = QualityController(target_fps)
+    now, frame, jejak = 0.0, 0, []
+    batas, faktor = [], []
+    for detik, f in skenario:
+        batas.append((batas[-1] if batas else 0.0) + detik)
+        faktor.append(f)
+    detik_berikut, frame_detik = 1.0, 0
+    while now < batas[-1]:
+        f = faktor[np.searchsorted(batas, now, side="right")]
+        lebar, refine, stride = controller.setting
+        frame += 1
+        if stride > 1 and frame % stride:
+            durasi = 0.0002 * f  # ekstrapolasi: hampir tanpa biaya
+        else:
+            durasi = rng.choice(biaya[(lebar, refine)]) * f
+        controller.update(durasi, now)
+        now += max(durasi, 1.0 / fps_kamera)  # kamera tidak memberi frame lebih cepat dari FPS-nya
+        frame_detik += 1
+        if now >= detik_berikut:
+            jejak.append((detik_berikut, controller.level, frame_detik, f))
+            detik_berikut += 1.0
+            frame_detik = 0
+    return jejak, controller
+
+
+def galat_ekstrapolasi(path, stride):
+    """Rata-rata galat (piksel) landmark frame yang dilewati: ekstrapolasi vs menahan hasil terakhir."""
+    trace = TraceReader(path)
+    ada = trace.records["n_faces"] > 0
+    lm = trace.landmarks()
+    skala = np.array([trace.records["w"][0], trace.records["h"][0], 0], dtype=np.float32)
+    ex = LandmarkExtrapolator(maks_detik=float("inf"))
+    galat_ex, galat_tahan = [], []
+    terakhir = None
+    for i in range(len(trace)):
+        if not ada[i]:
+            ex.reset()
+            terakhir = None
+            continue
+        t = float(trace.t[i])
+        if i % stride == 0 or terakhir is None:
+            ex.update([lm[i]], t)
+            terakhir = lm[i]
+            continue
+        tebakan = ex.predict(t)[0]
+        galat_ex.append(np.linalg.norm((tebakan - lm[i]) * skala, axis=1).mean())
+        galat_tahan.append(np.linalg.norm((terakhir - lm[i]) * skala, axis=1).mean())
+    return np.mean(galat_ex) if galat_ex else float("nan"), np.mean(galat_tahan) if galat_tahan else float("nan")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark kualitas adaptif: biaya tiap level & respons controller")
+    parser.add_argument("--video", help="frame dari video rekaman (sebaiknya berisi wajah), default frame sintetis")
+    parser.add_argument("--resolution", default="1280x720")
+    parser.add_argument("--frames", type=int, default=JUMLAH_FRAME)
+    parser.add_argument("--warmup", type=int, default=JUMLAH_PEMANASAN)
+    parser.add_argument("--target-fps", type=float, default=TARGET_FPS)
+    parser.add_argument("--camera-fps", type=float, default=FPS_KAMERA)
+    parser.add_argument("--slowdown", type=float, nargs="+", help="faktor perlambatan per fase (ganti SKENARIO)")
+    parser.add_argument("--trace", help="file .htrace untuk mengukur galat ekstrapolasi landmark")
+    args = parser.parse_args()
+
+    w, h = map(int, args.resolution.split("x"))
+    jumlah = args.frames + args.warmup
+    frames = frame_rekaman(args.video, w, h, jumlah) if args.video else frame_sintetis(w, h, jumlah)
+    frames_rgb = [cv2.cvtColor(cv2.flip(f, 1), cv2.COLOR_BGR2RGB) for f in frames]
+
+    print(f"{args.frames} frame {w}x{h}, sumber: {args.video or 'sintetis'}, target {args.target_fps:g} FPS\n")
+    biaya = biaya_per_level(frames_rgb, args.warmup)
+    print(f"{'level':>5} {'lebar':>6} {'iris':>5} {'stride':>6} {'p50 ms':>8} {'p95 ms':>8} {'ms/frame':>9}")
+    for i, (lebar, refine, stride) in enumerate(LADDER):
+        r = ringkas(biaya[(lebar, refine)])
+        print(f"{i:5d} {lebar or w:6d} {'ya' if refine else '-':>5} {stride:6d} "
+              f"{r['p50_ms']:8.2f} {r['p95_ms']:8.2f} {r['mean_ms'] / stride:9.2f}")
+
+    skenario = SKENARIO
+    if args.slowdown:
+        skenario = [(SKENARIO[0][0], f) for f in args.slowdown]
+    jejak, controller = simulasi(biaya, skenario, args.camera_fps, args.target_fps)
+    print(f"\nsimulasi beban {' -> '.join(f'{f:g}x ({d} s)' for d, f in skenario)}:")
+    print("detik  beban  level  fps")
+    level_lama = None
+    for detik, level, fps, f in jejak:
+        if level == level_lama and detik % 5:
+            continue
+        level_lama = level
+        print(f"{detik:5.0f} {f:5.1f}x {level:6d} {fps:4d}  {'#' * level}")
+    print(f"{len(controller.riwayat)}x pindah level")
+
+    if args.trace:
+        print(f"\ngalat landmark frame yang dilewati ({args.trace}, piksel rata-rata):")
+        for stride in (2, 3):
+            ex, tahan = galat_ekstrapolasi(args.trace, stride)
+            print(f"stride {stride}: ekstrapolasi {ex:6.2f}   tahan hasil terakhir {tahan:6.2f}")
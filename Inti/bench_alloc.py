@@ -0,0 +1,119 @@
+import argparse
+import gc
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from bench_stages import frame_sintetis, landmark_uji
+from head_features import LandmarkResult, landmarks_to_array
+from pipeline import SequentialSource
+
+# --- KONFIGURASI BENCHMARK ---
+RESOLUSI = ["1280x720", "1920x1080"]
+JUMLAH_FRAME = 300
+JUMLAH_PEMANASAN = 20
+
+
+class KameraPalsu:
+    """Pengganti cv2.VideoCapture dari frame di memori; seperti OpenCV, `read(image)` menulis ke buffer jika cocok."""
+
+    def __init__(self, frames, jumlah):
+        self.frames = frames
+        self.sisa = jumlah
+        self.i = 0
+
+    def isOpened(self):
+        return self.sisa > 0
+
+    def read(self, image=None):
+        if self.sisa <= 0:
+            return False, None
+        self.sisa -= 1
+        sumber = self.frames[self.i % len(self.frames)]
+        self.i += 1
+        if image is not None and image.shape == sumber.shape:
+            np.copyto(image, sumber)
+            return True, image
+        return True, sumber.copy()
+
+
+def gambar_overlay(image, w, h):
+    """Overlay teks & kotak seperti loop main.py/branch.py, langsung di frame."""
+    cv2.rectangle(image, (w // 3, h // 3), (2 * w // 3, 2 * h // 3), (0, 255, 0), 2)
+    cv2.putText(image, "Kanan: 12%  Kiri: 0%", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+    cv2.putText(image, "Atas: 0%  Bawah: 3%", (50, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+    cv2.putText(image, "Latensi: 20 ms", (w - 200, h - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 1)
+
+
+def ukur(frames, jumlah, pemanasan, reuse_buffers, jejak_memori):
+    """
+    Jalankan hot path frame (baca, flip, konversi warna, overlay) tanpa inferensi.
+    Kembalikan durasi per frame (detik), puncak memori sementara per frame (byte) dan jeda GC per frame (detik).
+    """
+    landmark = LandmarkResult([landmarks_to_array(landmark_uji(1)[0])])
+    sumber = SequentialSource(KameraPalsu(frames, jumlah + pemanasan), lambda rgb: landmark,
+                              reuse_buffers=reuse_buffers)
+    jeda_gc, mulai_gc = [0.0], [0.0]
+
+    def callback_gc(fase, info):
+        if fase == "start":
+            mulai_gc[0] = time.perf_counter()
+        else:
+            jeda_gc[0] += time.perf_counter() - mulai_gc[0]
+
+    durasi, puncak, gc_frame = [], [], []
+    gc.callbacks.append(callback_gc)
+    if jejak_memori:
+        tracemalloc.start()
+    try:
+        n = 0
+        mulai = time.perf_counter()
+        awal_memori = tracemalloc.get_traced_memory()[0] if jejak_memori else 0
+        for paket in sumber:
+            h, w = paket.frame.shape[:2]
+            gambar_overlay(paket.frame, w, h)
+            sumber.selesai(paket)
+            n += 1
+            akhir = time.perf_counter()
+            if n > pemanasan:
+                durasi.append(akhir - mulai)
+                gc_frame.append(jeda_gc[0])
+                if jejak_memori:
+                    puncak.append(tracemalloc.get_traced_memory()[1] - awal_memori)
+            jeda_gc[0] = 0.0
+            if jejak_memori:
+                tracemalloc.reset_peak()
+                awal_memori = tracemalloc.get_traced_memory()[0]
+            mulai = time.perf_counter()
+    finally:
+        gc.callbacks.remove(callback_gc)
+        if jejak_memori:
+            tracemalloc.stop()
+    return np.array(durasi), np.array(puncak), np.array(gc_frame), sumber
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Alokasi & jeda GC per frame di hot path: buffer dipakai ulang vs baru")
+    parser.add_argument("--resolutions", nargs="+", default=RESOLUSI)
+    parser.add_argument("--frames", type=int, default=JUMLAH_FRAME)
+    parser.add_argument("--warmup", type=int, default=JUMLAH_PEMANASAN)
+    args = parser.parse_args()
+
+    print(f"{args.frames} frame per run, inferensi diganti hasil tetap (hanya capture/flip/konversi/overlay)\n")
+    print(f"{'resolusi':<10} {'buffer':<8} {'p50 ms':>7} {'p99 ms':>7} {'MB/frame':>9} "
+          f"{'GC/1000 frame':>13} {'jeda GC maks ms':>15} {'set':>4}")
+    for resolusi in args.resolutions:
+        w, h = map(int, resolusi.split("x"))
+        frames = frame_sintetis(w, h, 8)
+        for reuse in (False, True):
+            # Waktu & GC diukur tanpa tracemalloc (tracemalloc memperlambat setiap alokasi)
+            durasi, _, gc_frame, sumber = ukur(frames, args.frames, args.warmup, reuse, jejak_memori=False)
+            _, puncak, _, _ = ukur(frames, args.frames, args.warmup, reuse, jejak_memori=True)
+            p50, p99 = np.percentile(durasi * 1000, [50, 99])
+            jumlah_gc = np.count_nonzero(gc_frame) * 1000 / len(gc_frame)
+            alokasi = sumber.buffers.dialokasi if sumber.buffers is not None else "-"
+            print(f"{resolusi:<10} {'reuse' if reuse else 'baru':<8} {p50:7.2f} {p99:7.2f} "
+                  f"{np.median(puncak) / 1e6:9.2f} {jumlah_gc:13.1f} {gc_frame.max() * 1000:15.3f} {alokasi:>4}")
+    print("\nMB/frame = median puncak memori sementara yang dialokasikan dalam satu frame (tracemalloc)")
@@ -0,0 +1,129 @@
+import argparse
+import asyncio
+import json
+import socket
+import time
+
+import numpy as np
+from websockets.asyncio.client import connect
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+
+from bridge_server import MAX_RATE_HZ, BridgeServer, DeviceLink
+
+# --- KONFIGURASI DEFAULT ---
+BRIDGE_PORT = 18765
+ESP_PORT = 18181
+
+
+class FakeEsp:
+    """
+    Pengganti ESP32 lokal: server WebSocket yang membaca pesan JSON seperti compis.ino,
+    dengan jeda proses per pesan untuk mensimulasikan controller LED yang lambat.
+    Latensi relay diukur dari field "t" (time.time() saat aplikasi mengirim).
+    """
+
+    def __init__(self, jeda_proses=0.0):
+        self.jeda_proses = jeda_proses
+        self.latensi = []
+        self.terakhir = None
+
+    async def _handler(self, ws):
+        # Buffer terima kecil seperti lwIP di ESP32, agar backpressure terlihat seperti di perangkat asli
+        sock = ws.transport.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        try:
+            async for pesan in ws:
+                data = json.loads(pesan)
+                if "t" in data:
+                    self.latensi.append(time.time() - data["t"])
+                self.terakhir = data
+                if self.jeda_proses:
+                    await asyncio.sleep(self.jeda_proses)
+        except ConnectionClosed:
+            pass
+
+    def serve(self, host, port):
+        return serve(self._handler, host, port, compression=None, max_queue=1)
+
+
+async def klien_aplikasi(url, rate, durasi, seq_awal, terkirim):
+    """Satu klien aplikasi yang mengirim persentase gerakan dengan laju `rate` pesan/detik."""
+    async with connect(url, compression=None) as ws:
+        interval = 1.0 / rate
+        berikut = time.perf_counter()
+        akhir = berikut + durasi
+        i = seq_awal
+        while time.perf_counter() < akhir:
+            kanan = int(50 + 50 * np.sin(i / 20))
+            await ws.send(json.dumps({"kanan": kanan, "kiri": 0, "atas": 0, "bawah": 0,
+                                      "seq": i, "t": time.time()}))
+            terkirim.append(i)
+            i += 1
+            berikut += interval
+            await asyncio.sleep(max(0.0, berikut - time.perf_counter()))
+
+
+async def jalankan_load_test(args):
+    esp = FakeEsp(args.esp_delay / 1000)
+    async with esp.serve("127.0.0.1", args.esp_port):
+        device = DeviceLink("fake", f"ws://127.0.0.1:{args.esp_port}", max_rate=args.max_rate)
+        bridge = BridgeServer([device], "127.0.0.1", args.bridge_port)
+        siap = asyncio.Event()
+        tugas_bridge = asyncio.create_task(bridge.jalan(stats_interval=0, siap=siap))
+        await siap.wait()
+        while not device.terhubung:
+            await asyncio.sleep(0.01)
+
+        terkirim = []
+        url = f"ws://127.0.0.1:{args.bridge_port}/"
+        rate_per_klien = args.rate / args.clients
+        await asyncio.gather(*(klien_aplikasi(url, rate_per_klien, args.duration, k * 10_000_000, terkirim)
+                               for k in range(args.clients)))
+        await asyncio.sleep(0.5)  # beri waktu pesan terakhir sampai ke ESP
+        tugas_bridge.cancel()
+        await asyncio.gather(tugas_bridge, return_exceptions=True)
+
+    print(f"\n===== LOAD TEST BRIDGE ({args.clients} klien, {args.rate:.0f} pesan/s, "
+          f"jeda ESP {args.esp_delay:.1f} ms, "
+          f"batas {args.max_rate:.0f} Hz) =====")
+    print(f"Pesan dari aplikasi : {len(terkirim)} ({len(terkirim) / args.duration:.0f}/s)")
+    print(f"Diterima fake ESP   : {len(esp.latensi)} ({len(esp.latensi) / args.duration:.0f}/s), "
+          f"digabung di bridge: {device.digabung}")
+    if esp.latensi:
+        ms = np.asarray(esp.latensi) * 1000
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        print(f"Latensi relay       : p50 {p50:.2f} ms, p95 {p95:.2f} ms, p99 {p99:.2f} ms, maks {ms.max():.2f} ms")
+    terakhir_dikirim = max(terkirim) if terkirim else None
+    diterima_terakhir = esp.terakhir.get("seq") if esp.terakhir else None
+    print(f"Nilai terakhir sampai ke ESP: {'ya' if diterima_terakhir in (terakhir_dikirim, None) else 'TIDAK'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test bridge_server.py dengan ESP32 palsu")
+    parser.add_argument("--clients", type=int, default=4, help="jumlah klien aplikasi")
+    parser.add_argument("--rate", type=float, default=500, help="total pesan per detik dari semua klien")
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--esp-delay", type=float, default=0.0, help="jeda proses per pesan di ESP palsu (ms)")
+    parser.add_argument("--max-rate", type=float, default=MAX_RATE_HZ, help="batas pesan/detik bridge ke ESP")
+    parser.add_argument("--bridge-port", type=int, default=BRIDGE_PORT)
+    parser.add_argument("--esp-port", type=int, default=ESP_PORT)
+    parser.add_argument("--fake-esp-only", action="store_true",
+                        help="hanya jalankan ESP palsu di --esp-port (untuk diuji dengan bridge/aplikasi asli)")
+    args = parser.parse_args()
+
+    if args.fake_esp_only:
+        async def hanya_esp():
+            esp = FakeEsp(args.esp_delay / 1000)
+            async with esp.serve("0.0.0.0", args.esp_port):
+                print(f"ESP palsu berjalan di ws://0.0.0.0:{args.esp_port}")
+                while True:
+                    await asyncio.sleep(5)
+                    print(f"{len(esp.latensi)} pesan, terakhir: {esp.terakhir}")
+        try:
+            asyncio.run(hanya_esp())
+        except KeyboardInterrupt:
+            pass
+    else:
+        asyncio.run(jalankan_load_test(args))
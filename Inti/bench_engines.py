@@ -0,0 +1,113 @@
+import argparse
+import threading
+import time
+
+import cv2
+import mediapipe as mp
+
+from bench_stages import frame_rekaman, frame_sintetis, ringkas
+from tasks_engine import TasksFaceLandmarker
+
+# --- KONFIGURASI BENCHMARK ---
+JUMLAH_FRAME = 300
+JUMLAH_PEMANASAN = 20
+FPS_KAMERA = 30  # laju kiriman frame untuk mode live stream (0 = secepat mungkin)
+
+
+def bench_sinkron(process, frames_rgb, pemanasan):
+    """Engine sinkron: loop tertahan selama inferensi, latensi = waktu blok."""
+    for rgb in frames_rgb[:pemanasan]:
+        process(rgb)
+    durasi = []
+    wajah = 0
+    mulai_total = time.perf_counter()
+    for rgb in frames_rgb[pemanasan:]:
+        mulai = time.perf_counter()
+        hasil = process(rgb)
+        durasi.append(time.perf_counter() - mulai)
+        wajah += bool(hasil.multi_face_landmarks)
+    total = time.perf_counter() - mulai_total
+    return {"blok": ringkas(durasi), "latensi": ringkas(durasi),
+            "hasil_per_detik": len(durasi) / total, "frame_dengan_wajah": wajah}
+
+
+def bench_live_stream(frames_rgb, pemanasan, fps, pose):
+    """FaceLandmarker LIVE_STREAM: ukur waktu blok detect_async dan latensi kirim -> callback."""
+    terkirim = {}
+    latensi = []
+    wajah = [0]
+    kunci = threading.Lock()
+
+    def callback(hasil, t_ms):
+        with kunci:
+            t_kirim = terkirim.pop(t_ms, None)
+            if t_kirim is not None:
+                latensi.append(time.perf_counter() - t_kirim)
+                wajah[0] += bool(hasil.multi_face_landmarks)
+
+    with TasksFaceLandmarker(pose=pose, callback=callback) as engine:
+        for rgb in frames_rgb[:pemanasan]:
+            engine.submit(rgb)
+            time.sleep(0.03)
+        time.sleep(0.5)
+        with kunci:
+            terkirim.clear()
+            latensi.clear()
+            wajah[0] = 0
+
+        blok = []
+        mulai_total = time.perf_counter()
+        berikut = mulai_total
+        for rgb in frames_rgb[pemanasan:]:
+            mulai = time.perf_counter()
+            with kunci:
+                t_ms = engine.timestamp()
+                terkirim[t_ms] = mulai
+            engine.landmarker.detect_async(mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb), t_ms)
+            blok.append(time.perf_counter() - mulai)
+            if fps:
+                berikut += 1 / fps
+                time.sleep(max(0.0, berikut - time.perf_counter()))
+        # tunggu callback terakhir
+        batas = time.perf_counter() + 2.0
+        while terkirim and time.perf_counter() < batas:
+            time.sleep(0.005)
+        total = time.perf_counter() - mulai_total
+        dilewati = len(terkirim)
+    return {"blok": ringkas(blok), "latensi": ringkas(latensi) if latensi else None,
+            "hasil_per_detik": len(latensi) / total, "frame_dengan_wajah": wajah[0], "dilewati": dilewati}
+
+
+def cetak(nama, hasil):
+    blok, lat = hasil["blok"], hasil["latensi"]
+    teks_lat = f"{lat['p50_ms']:8.2f} {lat['p95_ms']:8.2f}" if lat else f"{'-':>8} {'-':>8}"
+    print(f"{nama:<24} {blok['p50_ms']:8.2f} {blok['p95_ms']:8.2f} {teks_lat} "
+          f"{hasil['hasil_per_detik']:9.1f} {hasil['frame_dengan_wajah']:6d} {hasil.get('dilewati', 0):8d}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandingkan FaceMesh (mp.solutions) vs FaceLandmarker Tasks")
+    parser.add_argument("--video", help="frame dari video rekaman (sebaiknya berisi wajah), default frame sintetis")
+    parser.add_argument("--resolution", default="1280x720")
+    parser.add_argument("--frames", type=int, default=JUMLAH_FRAME)
+    parser.add_argument("--warmup", type=int, default=JUMLAH_PEMANASAN)
+    parser.add_argument("--fps", type=float, default=FPS_KAMERA, help="laju kiriman live stream (0 = secepat mungkin)")
+    parser.add_argument("--pose", action="store_true", help="minta facial transformation matrix (yaw/pitch)")
+    args = parser.parse_args()
+
+    w, h = map(int, args.resolution.split("x"))
+    jumlah = args.frames + args.warmup
+    frames = frame_rekaman(args.video, w, h, jumlah) if args.video else frame_sintetis(w, h, jumlah)
+    frames_rgb = [cv2.cvtColor(cv2.flip(f, 1), cv2.COLOR_BGR2RGB) for f in frames]
+
+    print(f"{args.frames} frame {w}x{h}, sumber: {args.video or 'sintetis'}, live stream {args.fps or 'maks'} FPS\n")
+    print(f"{'engine':<24} {'blok p50':>8} {'blok p95':>8} {'lat p50':>8} {'lat p95':>8} "
+          f"{'hasil/s':>9} {'wajah':>6} {'dilewati':>8}")
+    print("(blok = waktu loop tertahan per frame, lat = frame dikirim sampai hasil tersedia, dalam ms)")
+
+    with mp.solutions.face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True,
+                                         min_detection_confidence=0.5, min_tracking_confidence=0.5) as face_mesh:
+        cetak("face_mesh (sinkron)", bench_sinkron(face_mesh.process, frames_rgb, args.warmup))
+    with TasksFaceLandmarker(pose=args.pose, live_stream=False) as engine:
+        cetak("tasks VIDEO (sinkron)", bench_sinkron(engine.process, frames_rgb, args.warmup))
+    cetak("tasks LIVE_STREAM", bench_live_stream(frames_rgb, args.warmup, args.fps, args.pose))
@@ -0,0 +1,109 @@
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from event_store import SKEMA, EventStore, _baris
+
+# --- KONFIGURASI BENCHMARK ---
+JUMLAH_SESI = 64
+FPS = 30          # tiap sesi mensimulasikan loop frame; kasus terburuk: satu event per frame
+DETIK = 5
+JUMLAH_QUERY_EVENT = 200_000  # isi database untuk benchmark query
+ARAH = ("kanan", "kiri", "atas", "bawah")
+
+
+def event_sintetis(session_id, i):
+    return {"session": session_id, "t": 1000.0 + i * 0.5, "type": "violation",
+            "direction": ARAH[i % 4], "magnitude": 20 + i % 60, "count": i % 5 + 1}
+
+
+def ukur_penulis(tulis, jumlah_sesi, fps, detik):
+    """Setiap sesi di thread sendiri memanggil `tulis(event)` sekali per frame; kembalikan latensi per panggilan (ms)."""
+    latensi = [None] * jumlah_sesi
+    jumlah_frame = int(fps * detik)
+
+    def sesi(k):
+        waktu = np.empty(jumlah_frame)
+        berikut = time.perf_counter()
+        for i in range(jumlah_frame):
+            mulai = time.perf_counter()
+            tulis(event_sintetis(f"peserta-{k}", i))
+            waktu[i] = time.perf_counter() - mulai
+            berikut += 1 / fps
+            time.sleep(max(0.0, berikut - time.perf_counter()))
+        latensi[k] = waktu
+
+    threads = [threading.Thread(target=sesi, args=(k,)) for k in range(jumlah_sesi)]
+    mulai = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return np.concatenate(latensi) * 1000, time.perf_counter() - mulai
+
+
+def penulis_langsung(path):
+    """Pembanding: INSERT + COMMIT langsung di thread pemanggil (tanpa antrian & batch)."""
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=60)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SKEMA)
+    kunci = threading.Lock()
+
+    def tulis(event):
+        with kunci:
+            conn.execute("INSERT INTO events (session_id, t, type, direction, magnitude, data) "
+                         "VALUES (?, ?, ?, ?, ?, ?)", _baris(event))
+            conn.commit()
+    return tulis, conn
+
+
+def cetak(nama, ms, durasi, jumlah):
+    p50, p99 = np.percentile(ms, [50, 99])
+    tanda = "  > 1 frame" if ms.max() > 1000 / FPS else ""
+    print(f"{nama:<22} {p50 * 1000:9.1f} {p99 * 1000:9.1f} {ms.max():9.2f} {jumlah / durasi:12.0f}{tanda}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark EventStore: latensi record() di thread sesi & query")
+    parser.add_argument("--sessions", type=int, default=JUMLAH_SESI)
+    parser.add_argument("--seconds", type=float, default=DETIK)
+    parser.add_argument("--query-events", type=int, default=JUMLAH_QUERY_EVENT)
+    args = parser.parse_args()
+    jumlah = int(args.sessions * FPS * args.seconds)
+
+    with tempfile.TemporaryDirectory() as folder:
+        print(f"{args.sessions} sesi x {FPS} event/s x {args.seconds:.0f} s = {jumlah} event\n")
+        print(f"{'penulis':<22} {'p50 (us)':>9} {'p99 (us)':>9} {'maks (ms)':>9} {'event/s':>12}")
+
+        tulis, conn = penulis_langsung(os.path.join(folder, "langsung.db"))
+        ms, durasi = ukur_penulis(tulis, args.sessions, FPS, args.seconds)
+        conn.close()
+        cetak("langsung (commit)", ms, durasi, jumlah)
+
+        store = EventStore(os.path.join(folder, "store.db"))
+        ms, durasi = ukur_penulis(store.record, args.sessions, FPS, args.seconds)
+        cetak("EventStore.record", ms, durasi, jumlah)
+        store.flush()
+        print(f"\n{store.ringkasan()}")
+
+        # --- QUERY (database lebih besar) ---
+        per_sesi = args.query_events // args.sessions
+        for k in range(args.sessions):
+            for i in range(per_sesi):
+                store.record(event_sintetis(f"q-{k}", i))
+        store.flush()
+        print(f"query pada {per_sesi * args.sessions} event tambahan:")
+        sesi_acak = [f"q-{k}" for k in np.random.default_rng(0).integers(0, args.sessions, 200)]
+        for nama, query in (
+                ("count_window 60 s", lambda s: store.count_window(s, 1500.0, 1560.0)),
+                ("summary", store.summary)):
+            mulai = time.perf_counter()
+            for s in sesi_acak:
+                query(s)
+            print(f"{nama:<22} {(time.perf_counter() - mulai) / len(sesi_acak) * 1000:.3f} ms/query")
+        store.close()
@@ -0,0 +1,77 @@
+import argparse
+import time
+
+import cv2
+import mediapipe as mp
+
+from face_count import FACE_COUNT_MODES, FaceCountScheduler
+
+mp_face_mesh = mp.solutions.face_mesh
+mp_face_detection = mp.solutions.face_detection
+
+
+def jalankan_mode(path_video, mode, interval, wajah_kedua):
+    """Putar video secepat mungkin dengan satu mode penghitung wajah, kembalikan FPS & delay deteksi."""
+    cap = cv2.VideoCapture(path_video)
+    fps_video = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    detector = None
+    if mode != "mesh":
+        detector = mp_face_detection.FaceDetection(min_detection_confidence=0.7)
+    penghitung = FaceCountScheduler(mode, interval, detector)
+    face_mesh = mp_face_mesh.FaceMesh(max_num_faces=penghitung.mesh_max_faces, refine_landmarks=True,
+                                      min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+    frame_idx = 0
+    waktu_terdeteksi = None
+    mulai = time.perf_counter()
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        rgb = cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB)
+        mesh_results = face_mesh.process(rgb)
+        jumlah = penghitung.count(rgb, mesh_results)
+
+        t_video = frame_idx / fps_video
+        if (wajah_kedua is not None and waktu_terdeteksi is None
+                and t_video >= wajah_kedua and jumlah > 1):
+            waktu_terdeteksi = t_video
+        frame_idx += 1
+    durasi = time.perf_counter() - mulai
+
+    cap.release()
+    face_mesh.close()
+    if detector is not None:
+        detector.close()
+
+    delay_ms = None
+    if waktu_terdeteksi is not None:
+        delay_ms = (waktu_terdeteksi - wajah_kedua) * 1000
+    return {
+        "mode": mode,
+        "fps": frame_idx / durasi if durasi > 0 else 0.0,
+        "detector_runs": penghitung.detector_runs,
+        "frames": frame_idx,
+        "delay_ms": delay_ms,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandingkan FPS & delay deteksi wajah kedua per mode")
+    parser.add_argument("video", help="rekaman ujian berisi wajah kedua yang masuk frame")
+    parser.add_argument("--wajah-kedua", type=float, default=None,
+                        help="detik saat wajah kedua mulai terlihat (ground truth) untuk mengukur delay")
+    parser.add_argument("--interval", type=int, default=15, help="frame antar FaceDetection")
+    parser.add_argument("--mode", nargs="+", default=list(FACE_COUNT_MODES), choices=FACE_COUNT_MODES)
+    args = parser.parse_args()
+
+    print(f"{'mode':<12} {'FPS':>7} {'FaceDet':>8} {'delay wajah ke-2':>18}")
+    for mode in args.mode:
+        hasil = jalankan_mode(args.video, mode, args.interval, args.wajah_kedua)
+        if hasil["delay_ms"] is not None:
+            delay = f"{hasil['delay_ms']:.0f} ms"
+        elif args.wajah_kedua is None:
+            delay = "-"
+        else:
+            delay = "tidak terdeteksi"
+        print(f"{hasil['mode']:<12} {hasil['fps']:7.1f} {hasil['detector_runs']:8d} {delay:>18}")
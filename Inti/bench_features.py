@@ -0,0 +1,89 @@
+import time
+
+import numpy as np
+
+from head_features import HeadFeatures, direction_percents
+
+# --- KONFIGURASI BENCHMARK ---
+JUMLAH_FRAME = 2000
+JUMLAH_LANDMARK = 478
+FRAME_W, FRAME_H = 1280, 720
+
+try:
+    from mediapipe.framework.formats import landmark_pb2
+
+    def buat_landmark(data):
+        hasil = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z in data:
+            hasil.landmark.add(x=x, y=y, z=z)
+        return hasil
+except ImportError:
+    # Tanpa mediapipe: objek sederhana dengan atribut .landmark[i].x/.y/.z
+    class _Titik:
+        __slots__ = ("x", "y", "z")
+
+        def __init__(self, x, y, z):
+            self.x, self.y, self.z = x, y, z
+
+    class _Wajah:
+        def __init__(self, titik):
+            self.landmark = titik
+
+    def buat_landmark(data):
+        return _Wajah([_Titik(float(x), float(y), float(z)) for x, y, z in data])
+
+
+def postproses_lama(face_landmarks, w, h):
+    """Salinan postprocessing asli di main.py (list comprehension per frame)."""
+    nose = face_landmarks.landmark[1]
+    x_n, y_n = int(nose.x * w), int(nose.y * h)
+    left_eye = face_landmarks.landmark[33]
+    right_eye = face_landmarks.landmark[263]
+    x_le = int(left_eye.x * w)
+    x_re = int(right_eye.x * w)
+    y_coords = [int(p.y * h) for p in face_landmarks.landmark]
+    y_min, y_max = min(y_coords), max(y_coords)
+
+    x_eye_center = (x_le + x_re) // 2
+    dx = x_n - x_eye_center
+    raw_percent_right = max(0, min(100, int((dx / (w*0.25)) * 100)))
+    raw_percent_left = max(0, min(100, int((-dx / (w*0.25)) * 100)))
+
+    y_face_center = (y_min + y_max) // 2
+    dy = y_n - y_face_center
+    raw_percent_up = max(0, min(100, int((-dy / (h*0.25)) * 100)))
+    raw_percent_down = max(0, min(100, int((dy / (h*0.25)) * 100)))
+    return [raw_percent_right, raw_percent_left, raw_percent_up, raw_percent_down]
+
+
+def postproses_baru(face_landmarks, w, h):
+    fitur = HeadFeatures(face_landmarks, w, h)
+    dx, dy = fitur.nose_offset
+    return direction_percents(dx, dy, w * 0.25, h * 0.25).tolist()
+
+
+def ukur(fungsi, daftar_wajah):
+    mulai = time.perf_counter()
+    for wajah in daftar_wajah:
+        fungsi(wajah, FRAME_W, FRAME_H)
+    return (time.perf_counter() - mulai) / len(daftar_wajah) * 1e6
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    daftar_wajah = []
+    for _ in range(JUMLAH_FRAME):
+        pusat = rng.uniform(0.3, 0.7, size=2)
+        data = np.empty((JUMLAH_LANDMARK, 3), dtype=np.float32)
+        data[:, :2] = pusat + rng.normal(0, 0.08, size=(JUMLAH_LANDMARK, 2))
+        data[:, 2] = rng.normal(0, 0.02, size=JUMLAH_LANDMARK)
+        daftar_wajah.append(buat_landmark(data))
+
+    # Pastikan hasil keduanya sama persis sebelum membandingkan waktu
+    beda = sum(postproses_lama(f, FRAME_W, FRAME_H) != postproses_baru(f, FRAME_W, FRAME_H) for f in daftar_wajah)
+    print(f"Frame dengan hasil berbeda: {beda} dari {JUMLAH_FRAME}")
+
+    lama = ukur(postproses_lama, daftar_wajah)
+    baru = ukur(postproses_baru, daftar_wajah)
+    print(f"Postprocessing lama : {lama:8.1f} us/frame")
+    print(f"Postprocessing baru : {baru:8.1f} us/frame  ({lama / baru:.1f}x lebih cepat)")
@@ -0,0 +1,120 @@
+import argparse
+import multiprocessing as mproc
+import time
+import uuid
+
+import numpy as np
+
+from bench_stages import frame_sintetis
+from frame_bus import FrameBusReader, FrameBusWriter
+
+# --- KONFIGURASI BENCHMARK ---
+RESOLUSI = ["1280x720", "1920x1080"]
+JUMLAH_KONSUMEN = 3
+FPS = 30
+DURASI = 5.0
+
+
+def produsen_bus(nama, frames, fps, durasi, siap, mulai):
+    bus = FrameBusWriter(frames[0].shape, nama)
+    siap.set()
+    mulai.wait()  # semua konsumen sudah menempel ke bus
+    jeda = 1.0 / fps
+    berikut = time.perf_counter()
+    selesai = berikut + durasi
+    i = 0
+    while time.perf_counter() < selesai:
+        bus.write(frames[i % len(frames)])
+        i += 1
+        berikut += jeda
+        time.sleep(max(0.0, berikut - time.perf_counter()))
+    bus.close()
+
+
+def konsumen_bus(nama, hasil, mulai):
+    reader = FrameBusReader(nama)
+    mulai.wait()
+    latensi = []
+    cpu = time.process_time()
+    while (frame := reader.terbaru(timeout=2.0)) is not None:
+        latensi.append(time.perf_counter() - frame.t_capture)
+        float(frame.image[::64, ::64, 1].mean())  # sentuh data (tanpa salin)
+    hasil.put((latensi, time.process_time() - cpu, reader.diambil, reader.dilewati, reader.tertimpa))
+    reader.close()
+
+
+def produsen_queue(antrian, frames, fps, durasi, mulai):
+    mulai.wait()
+    jeda = 1.0 / fps
+    berikut = time.perf_counter()
+    selesai = berikut + durasi
+    i = 0
+    while time.perf_counter() < selesai:
+        t = time.perf_counter()
+        for q in antrian:  # tanpa bus: setiap konsumen menerima salinan frame sendiri (pickle lewat pipe)
+            q.put((t, frames[i % len(frames)]))
+        i += 1
+        berikut += jeda
+        time.sleep(max(0.0, berikut - time.perf_counter()))
+    for q in antrian:
+        q.put(None)
+
+
+def konsumen_queue(antrian, hasil, mulai):
+    mulai.wait()
+    latensi = []
+    n = 0
+    cpu = time.process_time()
+    while (item := antrian.get()) is not None:
+        latensi.append(time.perf_counter() - item[0])
+        float(item[1][::64, ::64, 1].mean())
+        n += 1
+    hasil.put((latensi, time.process_time() - cpu, n, 0, 0))
+
+
+def jalankan(mode, frames, konsumen, fps, durasi):
+    ctx = mproc.get_context("spawn")
+    hasil, mulai = ctx.Queue(), ctx.Barrier(konsumen + 1)  # produsen mulai setelah semua konsumen siap
+    if mode == "bus":
+        nama = f"bench_bus_{uuid.uuid4().hex[:8]}"
+        siap = ctx.Event()
+        produsen = ctx.Process(target=produsen_bus, args=(nama, frames, fps, durasi, siap, mulai))
+        produsen.start()
+        siap.wait()
+        anak = [ctx.Process(target=konsumen_bus, args=(nama, hasil, mulai)) for _ in range(konsumen)]
+    else:
+        antrian = [ctx.Queue(maxsize=4) for _ in range(konsumen)]
+        produsen = ctx.Process(target=produsen_queue, args=(antrian, frames, fps, durasi, mulai))
+        produsen.start()
+        anak = [ctx.Process(target=konsumen_queue, args=(q, hasil, mulai)) for q in antrian]
+    for p in anak:
+        p.start()
+    data = [hasil.get() for _ in anak]
+    for p in anak + [produsen]:
+        p.join()
+    latensi = np.concatenate([np.array(d[0]) for d in data]) * 1000
+    cpu = np.mean([d[1] for d in data]) / durasi * 100
+    return (np.percentile(latensi, [50, 99]), cpu, sum(d[2] for d in data),
+            sum(d[3] for d in data), sum(d[4] for d in data))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Satu kamera, banyak proses: frame bus shared memory vs salinan per proses")
+    parser.add_argument("--resolutions", nargs="+", default=RESOLUSI)
+    parser.add_argument("--consumers", type=int, default=JUMLAH_KONSUMEN)
+    parser.add_argument("--fps", type=float, default=FPS)
+    parser.add_argument("--duration", type=float, default=DURASI)
+    args = parser.parse_args()
+
+    print(f"{args.consumers} proses konsumen, produsen {args.fps:.0f} FPS selama {args.duration:.0f} s\n")
+    print(f"{'resolusi':<10} {'mode':<6} {'p50 ms':>7} {'p99 ms':>7} {'CPU/konsumen':>12} "
+          f"{'diambil':>8} {'dilewati':>8} {'tertimpa':>8}")
+    for resolusi in args.resolutions:
+        w, h = map(int, resolusi.split("x"))
+        frames = frame_sintetis(w, h, 8)
+        for mode in ("queue", "bus"):
+            (p50, p99), cpu, diambil, dilewati, tertimpa = jalankan(mode, frames, args.consumers, args.fps,
+                                                                   args.duration)
+            print(f"{resolusi:<10} {mode:<6} {p50:7.2f} {p99:7.2f} {cpu:11.1f}% {diambil:8d} {dilewati:8d} "
+                  f"{tertimpa:8d}")
+    print("\nqueue = frame dikirim (pickle) ke setiap proses; bus = satu salinan di shared memory, dibaca sebagai view")
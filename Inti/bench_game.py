@@ -0,0 +1,120 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+import temple_run_game
+from temple_run_game import LANES, TempleRunGame
+
+# --- KONFIGURASI BENCHMARK ---
+JUMLAH_ENTITAS = [10, 100, 500, 1000, 5000]
+JUMLAH_FRAME = 300
+TINGGI_LAYAR = 720
+BUDGET_MS = 1000 / 60  # satu frame pada 60 FPS
+
+
+class GameLama:
+    """Salinan update_objects/check_collisions lama (list [x, y, w, h]) sebagai pembanding."""
+
+    def __init__(self, obstacles, coins, jumlah_obstacle, jumlah_coin):
+        self.obstacles = obstacles
+        self.coins = coins
+        self.jumlah_obstacle = jumlah_obstacle
+        self.jumlah_coin = jumlah_coin
+        self.player_x, self.player_y = 400, TINGGI_LAYAR - 150
+        self.speed = 5
+        self.score = 0
+        self.game_over = False
+
+    def update_objects(self, h):
+        for obs in self.obstacles:
+            obs[1] += self.speed
+        for coin in self.coins:
+            coin[1] += self.speed
+
+        self.obstacles = [obs for obs in self.obstacles if obs[1] < h + 50]
+        self.coins = [coin for coin in self.coins if coin[1] < h + 50]
+
+        if len(self.obstacles) < self.jumlah_obstacle:
+            y = min([obs[1] for obs in self.obstacles] or [0]) - random.randint(200, 400)
+            lane = random.choice(LANES)
+            self.obstacles.append([lane, y, 80, 80])
+
+        if len(self.coins) < self.jumlah_coin:
+            y = min([coin[1] for coin in self.coins] or [0]) - random.randint(150, 300)
+            lane = random.choice(LANES)
+            coin_overlap = any(abs(obs[1] - y) < 100 and obs[0] == lane for obs in self.obstacles)
+            if not coin_overlap:
+                self.coins.append([lane, y, 30, 30])
+
+    def check_collisions(self):
+        player_rect = (self.player_x - 30, self.player_y - 30, 60, 60)
+        for obs in self.obstacles:
+            obs_rect = (obs[0] - obs[2]//2, obs[1] - obs[3]//2, obs[2], obs[3])
+            if (player_rect[0] < obs_rect[0] + obs_rect[2] and
+                    player_rect[0] + player_rect[2] > obs_rect[0] and
+                    player_rect[1] < obs_rect[1] + obs_rect[3] and
+                    player_rect[1] + player_rect[3] > obs_rect[1]):
+                self.game_over = True
+        for coin in self.coins[:]:
+            coin_rect = (coin[0] - coin[2]//2, coin[1] - coin[3]//2, coin[2], coin[3])
+            if (player_rect[0] < coin_rect[0] + coin_rect[2] and
+                    player_rect[0] + player_rect[2] > coin_rect[0] and
+                    player_rect[1] < coin_rect[1] + coin_rect[3] and
+                    player_rect[1] + player_rect[3] > coin_rect[1]):
+                self.coins.remove(coin)
+                self.score += 10
+
+
+def posisi_awal(n, seed):
+    """n entitas tersebar di lane, dari atas layar sampai bawah (banyak yang langsung terkena culling/koleksi)."""
+    rng = np.random.default_rng(seed)
+    xs = rng.choice(LANES, size=n).astype(np.float64)
+    ys = rng.uniform(-3 * TINGGI_LAYAR, TINGGI_LAYAR, size=n)
+    return xs, ys
+
+
+def ukur(game, frames):
+    waktu = []
+    for _ in range(frames):
+        mulai = time.perf_counter()
+        game.update_objects(TINGGI_LAYAR)
+        game.check_collisions()
+        waktu.append(time.perf_counter() - mulai)
+    ms = np.asarray(waktu) * 1000
+    return float(np.median(ms)), float(np.percentile(ms, 95))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark update_objects + check_collisions Temple Run (tanpa kamera)")
+    parser.add_argument("--counts", type=int, nargs="+", default=JUMLAH_ENTITAS, help="jumlah obstacle (= jumlah koin)")
+    parser.add_argument("--frames", type=int, default=JUMLAH_FRAME)
+    args = parser.parse_args()
+
+    print(f"{'entitas':>8} {'lama p50':>10} {'lama p95':>10} {'baru p50':>10} {'baru p95':>10} {'speedup':>8}")
+    for n in args.counts:
+        ox, oy = posisi_awal(n, 1)
+        cx, cy = posisi_awal(n, 2)
+
+        random.seed(0)
+        lama = GameLama([[x, y, 80, 80] for x, y in zip(ox, oy)], [[x, y, 30, 30] for x, y in zip(cx, cy)], n, n)
+        lama_p50, lama_p95 = ukur(lama, args.frames)
+
+        # Jumlah minimal entitas di layar ikut dinaikkan agar game terus menambah entitas baru
+        temple_run_game.JUMLAH_OBSTACLE = temple_run_game.JUMLAH_COIN = n
+        random.seed(0)
+        baru = TempleRunGame()
+        baru.obstacles.clear()
+        baru.coins.clear()
+        baru.obstacles.spawn_many(ox, oy, 80, 80)
+        baru.coins.spawn_many(cx, cy, 30, 30)
+        baru.player_y = TINGGI_LAYAR - 150
+        baru_p50, baru_p95 = ukur(baru, args.frames)
+
+        if (lama.score, lama.game_over) != (baru.score, baru.game_over):
+            print(f"PERINGATAN: hasil berbeda untuk {n} entitas (skor {lama.score} vs {baru.score})")
+        tanda = "  > budget 60 FPS" if lama_p95 > BUDGET_MS else ""
+        print(f"{2 * n:8d} {lama_p50:10.3f} {lama_p95:10.3f} {baru_p50:10.3f} {baru_p95:10.3f} "
+              f"{lama_p50 / baru_p50:7.1f}x{tanda}")
+    print("(waktu dalam ms per frame; entitas = obstacle + koin)")
@@ -0,0 +1,69 @@
+import argparse
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from bench_stages import frame_rekaman
+from head_features import landmarks_to_array
+from motion_gate import MAX_SKIP, MotionGate
+
+# --- KONFIGURASI BENCHMARK ---
+THRESHOLDS = [1.5, 2.5, 4.0]
+JUMLAH_FRAME = 600
+
+
+def buat_face_mesh():
+    return mp.solutions.face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True,
+                                           min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+
+def jalankan(process, frames_rgb):
+    """Proses semua frame; kembalikan (landmark wajah pertama atau None per frame, waktu total detik)."""
+    hasil = []
+    mulai = time.perf_counter()
+    for rgb in frames_rgb:
+        wajah = process(rgb).multi_face_landmarks
+        hasil.append(landmarks_to_array(wajah[0]) if wajah else None)
+    return hasil, time.perf_counter() - mulai
+
+
+def galat_px(a, b, w, h):
+    if a is None or b is None or a.shape != b.shape:
+        return None
+    return float(np.linalg.norm((a[:, :2] - b[:, :2]) * (w, h), axis=1).mean())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark motion gate: frame tanpa inferensi vs galat landmark")
+    parser.add_argument("--video", required=True, help="video rekaman berisi wajah (sebaiknya ada bagian diam)")
+    parser.add_argument("--resolution", default="1280x720")
+    parser.add_argument("--frames", type=int, default=JUMLAH_FRAME)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=THRESHOLDS)
+    parser.add_argument("--max-skip", type=int, default=MAX_SKIP)
+    args = parser.parse_args()
+
+    w, h = map(int, args.resolution.split("x"))
+    frames_rgb = [cv2.cvtColor(f, cv2.COLOR_BGR2RGB) for f in frame_rekaman(args.video, w, h, args.frames)]
+
+    # Acuan: inferensi di setiap frame
+    with buat_face_mesh() as face_mesh:
+        acuan, waktu_acuan = jalankan(face_mesh.process, frames_rgb)
+    ada_wajah = sum(a is not None for a in acuan)
+    print(f"{args.frames} frame {w}x{h} dari {args.video}, wajah di {ada_wajah} frame, "
+          f"acuan {waktu_acuan / len(frames_rgb) * 1000:.2f} ms/frame\n")
+    print(f"{'threshold':>9} {'dilewati':>9} {'ms/frame':>9} {'hemat':>6} "
+          f"{'galat rata':>10} {'galat p95':>9} {'galat maks':>10} {'audit':>7}")
+    print("(galat = jarak rata-rata landmark ke hasil inferensi setiap frame, piksel)")
+
+    for threshold in args.thresholds:
+        with buat_face_mesh() as face_mesh:
+            gate = MotionGate(face_mesh.process, threshold, args.max_skip)
+            hasil, waktu = jalankan(gate.process, frames_rgb)
+        galat = [g for g in (galat_px(a, b, w, h) for a, b in zip(hasil, acuan)) if g is not None]
+        galat = np.array(galat) if galat else np.zeros(1)
+        audit = f"{np.mean(gate.audit):.2f}" if gate.audit else "-"
+        print(f"{threshold:9.1f} {100 * gate.skip_rate:8.0f}% {waktu / len(frames_rgb) * 1000:9.2f} "
+              f"{100 * (1 - waktu / waktu_acuan):5.0f}% {galat.mean():10.2f} {np.percentile(galat, 95):9.2f} "
+              f"{galat.max():10.2f} {audit:>7}")
@@ -0,0 +1,110 @@
+import argparse
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from bench_stages import frame_sintetis, landmark_uji
+from head_features import landmarks_to_array
+from multi_face import RoomSession, TiledFaceMesh, linear_sum_assignment
+
+# --- KONFIGURASI BENCHMARK ---
+JUMLAH_WAJAH = [1, 2, 5, 10, 20, 30]
+JUMLAH_FRAME = 300
+GRID = ["1x1", "2x2", "3x2"]
+RESOLUSI = (1920, 1080)
+
+
+def ruang_sintetis(jumlah, frames, seed=0):
+    """
+    Landmark `jumlah` peserta duduk dalam baris 6 kursi yang bergoyang pelan, urutan wajah diacak tiap frame
+    (seperti urutan deteksi MediaPipe). Kembalikan daftar frame (list landmark) dan urutan asli per frame.
+    """
+    rng = np.random.default_rng(seed)
+    dasar = landmarks_to_array(landmark_uji(1)[0]).copy()
+    dasar[:, :2] = (dasar[:, :2] - 0.5) * 0.06  # wajah ~12% lebar frame
+    kursi = np.array([(0.1 + (i % 6) * 0.16, 0.12 + (i // 6) * 0.17) for i in range(jumlah)])
+    hasil, urutan = [], []
+    for t in range(frames):
+        goyang = 0.01 * np.sin(t / 10 + np.arange(jumlah))[:, None]
+        wajah = [dasar + (*(kursi[i] + goyang[i]), 0) for i in range(jumlah)]
+        acak = rng.permutation(jumlah)
+        hasil.append([wajah[i].astype(np.float32) for i in acak])
+        urutan.append(acak)
+    return hasil, urutan
+
+
+def ukur_ruang(jumlah, frames, hungarian):
+    """Durasi RoomSession.update per frame (pencocokan + state per identitas) dan jumlah identitas tertukar."""
+    data, urutan = ruang_sintetis(jumlah, frames)
+    ruang = RoomSession(max_identitas=max(32, jumlah), hungarian=hungarian)
+    durasi = []
+    identitas = None
+    tertukar = 0
+    for t, wajah in enumerate(data):
+        mulai = time.perf_counter()
+        ruang.update(wajah, *RESOLUSI, t / 30)
+        durasi.append(time.perf_counter() - mulai)
+        peta = dict(zip(urutan[t].tolist(), ruang.ids[ruang.slot_wajah].tolist()))
+        if identitas is not None:
+            tertukar += sum(peta[k] != identitas[k] for k in peta)
+        identitas = peta
+    return np.array(durasi[10:]) * 1000, tertukar
+
+
+def ukur_tile(frames, grid, ulang):
+    """ms per frame TiledFaceMesh untuk satu grid, beserta rata-rata wajah yang ditemukan."""
+    kolom, baris = map(int, grid.split("x"))
+    def buat():
+        return mp.solutions.face_mesh.FaceMesh(max_num_faces=10, refine_landmarks=False)
+
+    with TiledFaceMesh(buat, (kolom, baris)) as model:
+        durasi, wajah = [], []
+        for i in range(ulang):
+            rgb = cv2.cvtColor(frames[i % len(frames)], cv2.COLOR_BGR2RGB)
+            mulai = time.perf_counter()
+            hasil = model.process(rgb)
+            durasi.append(time.perf_counter() - mulai)
+            wajah.append(len(hasil.multi_face_landmarks))
+    return np.median(durasi[5:]) * 1000, np.mean(wajah)
+
+
+def baca_video(path, jumlah):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < jumlah:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput pelacakan multi-wajah menurut jumlah wajah & grid tile")
+    parser.add_argument("--faces", type=int, nargs="+", default=JUMLAH_WAJAH)
+    parser.add_argument("--frames", type=int, default=JUMLAH_FRAME)
+    parser.add_argument("--grids", nargs="+", default=GRID, help="grid tile KOLOMxBARIS untuk inferensi")
+    parser.add_argument("--video", help="rekaman ruang kelas untuk mengukur inferensi tile (default: frame sintetis)")
+    args = parser.parse_args()
+
+    print(f"Pencocokan identitas + state per identitas, {args.frames} frame, wajah diacak tiap frame")
+    print(f"{'wajah':>5} {'metode':<10} {'p50 ms':>7} {'p99 ms':>7} {'tertukar':>9}")
+    metode = [("hungarian", True), ("greedy", False)] if linear_sum_assignment is not None else [("greedy", False)]
+    for jumlah in args.faces:
+        for nama, hungarian in metode:
+            durasi, tertukar = ukur_ruang(jumlah, args.frames, hungarian)
+            p50, p99 = np.percentile(durasi, [50, 99])
+            print(f"{jumlah:>5} {nama:<10} {p50:7.3f} {p99:7.3f} {tertukar:>9}")
+
+    frames = baca_video(args.video, 60) if args.video else frame_sintetis(*RESOLUSI, 8)
+    h, w = frames[0].shape[:2]
+    print(f"\nInferensi FaceMesh per tile, {w}x{h} ({'video' if args.video else 'sintetis, tanpa wajah'})")
+    print(f"{'grid':<6} {'ms/frame':>9} {'FPS':>6} {'wajah':>6}")
+    for grid in args.grids:
+        ms, wajah = ukur_tile(frames, grid, min(args.frames, 60))
+        print(f"{grid:<6} {ms:9.1f} {1000 / ms:6.1f} {wajah:6.1f}")
+    print("\nDengan wajah nyata FaceMesh menjalankan model landmark sekali per wajah di setiap tile, jadi inferensi "
+          "naik kira-kira linear terhadap jumlah wajah; ukur dengan --video rekaman ruang kelas.")
@@ -0,0 +1,59 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from renderer import FullRedrawRenderer, GameRenderer
+from temple_run_game import TempleRunGame
+
+# --- KONFIGURASI BENCHMARK ---
+RESOLUSI = [(720, 1280), (1080, 1920), (2160, 3840)]
+JUMLAH_FRAME = 600
+BUDGET_MS = 1000 / 60  # satu frame pada 60 FPS
+
+
+def jalankan(renderer, h, w, frames, seed=0):
+    """Mainkan game tanpa kamera (player bergerak kiri-kanan) dan ukur waktu render per frame."""
+    random.seed(seed)
+    game = TempleRunGame()
+    waktu = []
+    hasil = []
+    for i in range(frames):
+        game.player_x = 400 + 250 * np.sin(i / 40)
+        game.player_y = h - 150
+        if not game.game_over:
+            game.update_objects(h)
+            game.check_collisions()
+        elif i % 120 == 0:
+            random.seed(i)
+            game = TempleRunGame()
+
+        mulai = time.perf_counter()
+        image = renderer.mulai(h, w)
+        renderer.render_game(game)
+        waktu.append(time.perf_counter() - mulai)
+        if i % 50 == 0:
+            hasil.append(image.copy())
+    ms = np.asarray(waktu) * 1000
+    return float(np.median(ms)), float(np.percentile(ms, 95)), hasil
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark render jendela game: gambar ulang penuh vs layer statis + dirty rect")
+    parser.add_argument("--frames", type=int, default=JUMLAH_FRAME)
+    args = parser.parse_args()
+
+    print(f"{'resolusi':>10} {'penuh p50':>10} {'penuh p95':>10} {'cache p50':>10} {'cache p95':>10} {'speedup':>8}")
+    for h, w in RESOLUSI:
+        penuh_p50, penuh_p95, gambar_penuh = jalankan(FullRedrawRenderer(), h, w, args.frames)
+        cache = GameRenderer()
+        cache_p50, cache_p95, gambar_cache = jalankan(cache, h, w, args.frames)
+
+        if any(not np.array_equal(a, b) for a, b in zip(gambar_penuh, gambar_cache)):
+            print(f"PERINGATAN: hasil render berbeda pada {w}x{h}")
+        tanda = "  > budget 60 FPS" if penuh_p95 > BUDGET_MS else ""
+        print(f"{f'{w}x{h}':>10} {penuh_p50:10.3f} {penuh_p95:10.3f} {cache_p50:10.3f} {cache_p95:10.3f} "
+              f"{penuh_p50 / cache_p50:7.1f}x{tanda}")
+        print(f"{'':>10} piksel dipulihkan/frame: {cache.piksel_dipulihkan / args.frames:,.0f} dari {w * h:,}")
+    print("(waktu dalam ms per frame, tanpa imshow)")
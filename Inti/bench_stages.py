@@ -0,0 +1,289 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from bench_features import buat_landmark
+from head_features import HeadFeatures, direction_percents
+from landmark_trace import TraceReader
+from proctoring import ProctorSession
+from tracking import HeadTracker
+
+# --- KONFIGURASI BENCHMARK ---
+RESOLUSI = ["640x480", "1280x720", "1920x1080"]
+JUMLAH_FRAME = 300
+JUMLAH_PEMANASAN = 20  # frame awal yang tidak dihitung (cache, alokasi, inisialisasi model)
+TOLERANSI = 0.15       # p95 boleh naik maksimal 15% dari baseline sebelum dianggap regresi
+JUMLAH_LANDMARK = 478
+UKURAN_RING = 16       # frame uji yang dipakai bergiliran, agar memori tidak tumbuh dengan --frames
+
+
+# --- DATA UJI DETERMINISTIK ---
+def frame_sintetis(w, h, jumlah, seed=0):
+    """Frame BGR buatan (gradien + noise + elips wajah yang bergeser) yang sama persis di setiap run."""
+    rng = np.random.default_rng(seed)
+    dasar = np.zeros((h, w, 3), dtype=np.uint8)
+    dasar[:] = np.linspace(40, 200, w, dtype=np.uint8)[None, :, None]
+    hasil = []
+    for i in range(jumlah):
+        frame = dasar.copy()
+        noise = rng.integers(0, 24, size=(h // 8, w // 8, 1), dtype=np.uint8)
+        frame += cv2.resize(noise, (w, h), interpolation=cv2.INTER_NEAREST)[..., None]
+        pusat = (int(w * (0.5 + 0.1 * np.sin(i / 15))), int(h * 0.5))
+        cv2.ellipse(frame, pusat, (w // 8, h // 5), 0, 0, 360, (150, 180, 220), -1)
+        hasil.append(frame)
+    return hasil
+
+
+def frame_rekaman(path, w, h, jumlah):
+    """Frame dari video rekaman, di-resize ke resolusi uji (diulang dari awal jika video lebih pendek)."""
+    cap = cv2.VideoCapture(path)
+    hasil = []
+    while len(hasil) < jumlah:
+        ret, frame = cap.read()
+        if not ret:
+            if not hasil:
+                raise ValueError(f"tidak bisa membaca frame dari {path}")
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            continue
+        hasil.append(cv2.resize(frame, (w, h)))
+    cap.release()
+    return hasil
+
+
+def landmark_uji(jumlah, path_trace=None, seed=0):
+    """Landmark untuk tahap postprocessing: dari trace rekaman jika ada, jika tidak dibuat acak (deterministik)."""
+    if path_trace:
+        trace = TraceReader(path_trace)
+        ada_wajah = np.flatnonzero(trace.records["n_faces"] > 0)[:jumlah]
+        if len(ada_wajah):
+            return [buat_landmark(trace.landmarks(i, i + 1)[0]) for i in ada_wajah]
+    rng = np.random.default_rng(seed)
+    hasil = []
+    for i in range(jumlah):
+        data = np.empty((JUMLAH_LANDMARK, 3), dtype=np.float32)
+        data[:, :2] = (0.5 + 0.05 * np.sin(i / 15), 0.5) + rng.normal(0, 0.08, size=(JUMLAH_LANDMARK, 2))
+        data[:, 2] = rng.normal(0, 0.02, size=JUMLAH_LANDMARK)
+        hasil.append(buat_landmark(data))
+    return hasil
+
+
+# --- STATISTIK ---
+def ringkas(durasi_detik):
+    ms = np.asarray(durasi_detik) * 1000
+    rata = float(ms.mean())
+    return {
+        "n": len(ms),
+        "mean_ms": rata,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+        "throughput_fps": 1000.0 / rata if rata > 0 else float("inf"),
+    }
+
+
+def ukur_tahap(fungsi, masukan, pemanasan, jumlah=None, simpan=False):
+    """
+    Jalankan fungsi(x) `jumlah` kali (default: sekali per masukan), masukan dipakai bergiliran seperti ring.
+    Catat waktu per panggilan (pemanasan dibuang). Keluaran hanya disimpan jika `simpan`, satu per masukan.
+    """
+    jumlah = len(masukan) if jumlah is None else jumlah
+    waktu = []
+    keluaran = []
+    for i in range(jumlah):
+        x = masukan[i % len(masukan)]
+        mulai = time.perf_counter()
+        hasil = fungsi(x)
+        selesai = time.perf_counter()
+        if simpan and i < len(masukan):
+            keluaran.append(hasil)
+        if i >= pemanasan:
+            waktu.append(selesai - mulai)
+    return waktu, keluaran
+
+
+# --- TAHAP-TAHAP LOOP ---
+def gambar_overlay(frame):
+    """Kurang lebih jumlah teks & kotak yang digambar per frame di main.py/branch.py."""
+    h, w, _ = frame.shape
+    cv2.putText(frame, "Kanan: 12% | Kiri: 0%", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+    cv2.putText(frame, "Atas: 0% | Bawah: 7%", (50, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+    cv2.putText(frame, "Pelanggaran (1 mnt): 1", (50, h - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+    cv2.putText(frame, "Latensi: 42 ms", (w - 200, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 1)
+    cv2.rectangle(frame, (int(w * 0.35), int(h * 0.3)), (int(w * 0.65), int(h * 0.7)), (0, 255, 0), 2)
+    return frame
+
+
+def bench_resolusi(w, h, args, face_mesh):
+    """
+    Ukur semua tahap untuk satu resolusi. Masukan tiap tahap = keluaran tahap sebelumnya, dari ring
+    UKURAN_RING frame yang dipakai bergiliran (1080p x 300 frame per tahap tidak muat di memori).
+    """
+    jumlah = args.frames + args.warmup
+    ring = min(jumlah, UKURAN_RING)
+    if args.video:
+        sumber = frame_rekaman(args.video, w, h, ring)
+    else:
+        sumber = frame_sintetis(w, h, ring)
+    hasil = {}
+
+    # capture: decode dari video rekaman, atau salin buffer kamera untuk frame sintetis
+    if args.video:
+        cap = cv2.VideoCapture(args.video)
+
+        def capture(_):
+            ret, frame = cap.read()
+            if not ret:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ret, frame = cap.read()
+            return frame
+        waktu, _ = ukur_tahap(capture, range(jumlah), args.warmup)
+        cap.release()
+    else:
+        waktu, _ = ukur_tahap(np.copy, sumber, args.warmup, jumlah)
+    hasil["capture"] = ringkas(waktu)
+
+    waktu, dibalik = ukur_tahap(lambda f: cv2.flip(f, 1), sumber, args.warmup, jumlah, simpan=True)
+    hasil["flip"] = ringkas(waktu)
+    waktu, rgb = ukur_tahap(lambda f: cv2.cvtColor(f, cv2.COLOR_BGR2RGB), dibalik, args.warmup, jumlah, simpan=True)
+    hasil["cvtColor"] = ringkas(waktu)
+
+    wajah_asli = []
+    if face_mesh is not None:
+        def mesh(frame):
+            # Hanya landmark wajah pertama yang disimpan, bukan seluruh hasil per frame
+            results = face_mesh.process(frame)
+            if results.multi_face_landmarks:
+                wajah_asli.append(results.multi_face_landmarks[0])
+        waktu, _ = ukur_tahap(mesh, rgb, args.warmup, jumlah)
+        hasil["face_mesh"] = ringkas(waktu)
+        hasil["face_mesh"]["face_rate"] = len(wajah_asli) / jumlah
+
+    # Postprocessing memakai landmark FaceMesh jika ada cukup wajah, jika tidak landmark trace/sintetis
+    if len(wajah_asli) < jumlah // 2:
+        wajah_asli = landmark_uji(jumlah, args.trace)
+    wajah = (wajah_asli * (jumlah // len(wajah_asli) + 1))[:jumlah]
+
+    def fitur_arah(face_landmarks):
+        fitur = HeadFeatures(face_landmarks, w, h)
+        dx, dy = fitur.nose_offset
+        return fitur, direction_percents(dx, dy, w * 0.25, h * 0.25)
+    waktu, fitur = ukur_tahap(fitur_arah, wajah, args.warmup, simpan=True)
+    hasil["postprocess"] = ringkas(waktu)
+
+    # State machine main.py (setelah kalibrasi) dan branch.py (pengawasan), waktu dibuat 30 FPS
+    tracker = HeadTracker(ready_seconds=0)
+    tracker.kalibrasi_selesai = True  # langsung ke mode tracking, posisi wajah uji tidak harus di dalam kotak
+    sesi = ProctorSession("bench")
+    sesi.start_calibration(-10.0)
+    sesi.update(fitur[0][0], w, h, -10.0)
+    sesi.update(fitur[0][0], w, h, 0.0)
+    langkah = list(enumerate(f for f, _ in fitur))
+    waktu, _ = ukur_tahap(lambda x: tracker.update(x[1], w, h, x[0] / 30), langkah, args.warmup)
+    hasil["tracker"] = ringkas(waktu)
+    waktu, _ = ukur_tahap(lambda x: sesi.update(x[1], w, h, x[0] / 30), langkah, args.warmup)
+    hasil["proctor"] = ringkas(waktu)
+
+    waktu, _ = ukur_tahap(gambar_overlay, dibalik, args.warmup, jumlah)
+    hasil["drawing"] = ringkas(waktu)
+
+    if args.gui:
+        nama_jendela = "bench"
+
+        def tampil(frame):
+            cv2.imshow(nama_jendela, frame)
+            return cv2.waitKey(1)
+        waktu, _ = ukur_tahap(tampil, dibalik, args.warmup, jumlah)
+        cv2.destroyWindow(nama_jendela)
+        hasil["imshow_waitKey"] = ringkas(waktu)
+    return hasil
+
+
+# --- BASELINE ---
+def info_lingkungan():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__,
+    }
+
+
+def bandingkan(sekarang, baseline, toleransi):
+    """Cetak perbandingan p50/p95 per tahap. Kembalikan daftar (resolusi, tahap) yang mengalami regresi."""
+    regresi = []
+    print(f"\n{'resolusi':<10} {'tahap':<16} {'p50 lama':>9} {'p50 baru':>9} {'p95 lama':>9} {'p95 baru':>9} {'delta':>8}")
+    for resolusi, tahap_baru in sekarang["results"].items():
+        tahap_lama = baseline["results"].get(resolusi, {})
+        for tahap, baru in tahap_baru.items():
+            lama = tahap_lama.get(tahap)
+            if lama is None:
+                print(f"{resolusi:<10} {tahap:<16} {'-':>9} {baru['p50_ms']:9.3f} {'-':>9} {baru['p95_ms']:9.3f}      baru")
+                continue
+            delta = baru["p95_ms"] / lama["p95_ms"] - 1 if lama["p95_ms"] > 0 else 0.0
+            tanda = ""
+            if delta > toleransi:
+                tanda = "  REGRESI"
+                regresi.append((resolusi, tahap))
+            print(f"{resolusi:<10} {tahap:<16} {lama['p50_ms']:9.3f} {baru['p50_ms']:9.3f} "
+                  f"{lama['p95_ms']:9.3f} {baru['p95_ms']:9.3f} {delta * 100:+7.1f}%{tanda}")
+    if baseline.get("environment") != sekarang["environment"]:
+        print("Catatan: lingkungan (CPU/versi library) berbeda dari baseline, perbandingan bisa tidak adil.")
+    return regresi
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark latensi per tahap loop head tracking")
+    parser.add_argument("--resolutions", nargs="+", default=RESOLUSI, help="mis. 640x480 1280x720")
+    parser.add_argument("--frames", type=int, default=JUMLAH_FRAME)
+    parser.add_argument("--warmup", type=int, default=JUMLAH_PEMANASAN)
+    parser.add_argument("--video", help="pakai frame dari video rekaman, bukan frame sintetis")
+    parser.add_argument("--trace", help="landmark dari file trace (RECORD_TRACE) untuk tahap postprocessing")
+    parser.add_argument("--no-mesh", action="store_true", help="lewati tahap face_mesh.process")
+    parser.add_argument("--gui", action="store_true", help="ukur juga imshow + waitKey (butuh layar)")
+    parser.add_argument("--save", help="simpan hasil sebagai baseline JSON")
+    parser.add_argument("--compare", help="bandingkan dengan baseline JSON, exit code 1 jika ada regresi")
+    parser.add_argument("--tolerance", type=float, default=TOLERANSI, help="kenaikan p95 yang masih diterima")
+    args = parser.parse_args()
+
+    face_mesh = None
+    if not args.no_mesh:
+        import mediapipe as mp
+        face_mesh = mp.solutions.face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True,
+                                                    min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+    laporan = {"environment": info_lingkungan(), "frames": args.frames,
+               "input": args.video or "sintetis", "results": {}}
+    for resolusi in args.resolutions:
+        w, h = (int(v) for v in resolusi.lower().split("x"))
+        hasil = bench_resolusi(w, h, args, face_mesh)
+        laporan["results"][resolusi] = hasil
+        print(f"\n===== {resolusi} =====")
+        print(f"{'tahap':<16} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'FPS':>10}")
+        for tahap, s in hasil.items():
+            print(f"{tahap:<16} {s['p50_ms']:9.3f} {s['p95_ms']:9.3f} {s['p99_ms']:9.3f} {s['throughput_fps']:10.1f}")
+        total = sum(s["mean_ms"] for s in hasil.values())
+        print(f"{'total (mean)':<16} {total:9.3f} ms  ->  {1000 / total:.1f} FPS maksimal tanpa pipeline")
+    if face_mesh is not None:
+        face_mesh.close()
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(laporan, f, indent=2)
+        print(f"\nBaseline disimpan ke {args.save}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regresi = bandingkan(laporan, baseline, args.tolerance)
+        if regresi:
+            print(f"\n{len(regresi)} tahap lebih lambat dari baseline (> {args.tolerance * 100:.0f}% di p95)")
+            sys.exit(1)
+        print("\nTidak ada regresi.")
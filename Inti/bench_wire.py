@@ -0,0 +1,99 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from wire_protocol import DeltaEncoder, decode, encode, encode_json
+
+# --- KONFIGURASI BENCHMARK ---
+JUMLAH_FRAME = 9000  # 5 menit pada 30 FPS
+FPS = 30
+OVERHEAD_WEBSOCKET = 6  # header frame klien->server: 2 byte + 4 byte masking key (payload < 126 byte)
+
+
+def gerakan_sintetis(jumlah, seed=0):
+    """Persentase [kanan, kiri, atas, bawah] seperti keluaran main.py: sering diam, sesekali menoleh/mengangguk."""
+    rng = np.random.default_rng(seed)
+    hasil = np.zeros((jumlah, 4), dtype=np.int64)
+    i = 0
+    while i < jumlah:
+        diam = int(rng.integers(30, 150))
+        i += diam  # kepala diam di tengah: semua 0 setelah deadzone
+        gerak = int(rng.integers(15, 60))
+        arah = int(rng.integers(0, 4))
+        puncak = rng.uniform(20, 90)
+        kurva = puncak * np.sin(np.linspace(0, np.pi, gerak)) + rng.normal(0, 1.5, gerak)
+        hasil[i:i + gerak, arah] = np.clip(kurva, 0, 100)[:max(0, min(gerak, jumlah - i))]
+        i += gerak
+    hasil[hasil <= 4] = 0  # deadzone seperti main.py
+    return hasil
+
+
+def gerakan_trace(path):
+    """Persentase dari trace rekaman (logika main.py lewat replay)."""
+    from landmark_trace import TraceReader
+    from replay import iterasi_fitur
+    from tracking import HeadTracker
+
+    tracker = HeadTracker()
+    hasil = []
+    for t, w, h, fitur, _, _ in iterasi_fitur(TraceReader(path)):
+        if tracker.update(fitur, w, h, t) == tracker.TRACKING:
+            hasil.append(tracker.percents)
+    return np.array(hasil, dtype=np.int64).reshape(-1, 4)
+
+
+def ukur_parse(fungsi, pesan, ulang=5):
+    terbaik = float("inf")
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        for p in pesan:
+            fungsi(p)
+        terbaik = min(terbaik, time.perf_counter() - mulai)
+    return terbaik / len(pesan) * 1e9
+
+
+def parse_json(p):
+    data = json.loads(p)
+    return data["kanan"], data["kiri"], data["atas"], data["bawah"]
+
+
+def parse_biner_indeks(p):
+    # Cara ESP32 membaca pesan biner: langsung indeks byte, tanpa parser
+    return p[1], p[2], p[3], p[4]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandingkan ukuran & biaya parse pesan JSON vs biner 11 byte")
+    parser.add_argument("--trace", help="pakai persentase dari file trace (RECORD_TRACE), bukan gerakan sintetis")
+    parser.add_argument("--frames", type=int, default=JUMLAH_FRAME)
+    parser.add_argument("--deadzone", type=int, default=4)
+    args = parser.parse_args()
+
+    persen = gerakan_trace(args.trace) if args.trace else gerakan_sintetis(args.frames)
+    daftar = [tuple(p) for p in persen.tolist()]
+    durasi = len(daftar) / FPS
+    print(f"{len(daftar)} frame ({durasi:.0f} s pada {FPS} FPS), sumber: {args.trace or 'sintetis'}\n")
+
+    pesan_json = [encode_json(p).encode() for p in daftar]
+    pesan_biner = [encode(p, i, i * 1000 // FPS) for i, p in enumerate(daftar)]
+    rata_json = np.mean([len(p) for p in pesan_json])
+    print(f"{'format':<10} {'byte/pesan':>11} {'+ framing WS':>13} {'parse Python':>14}")
+    print(f"{'JSON':<10} {rata_json:11.1f} {rata_json + OVERHEAD_WEBSOCKET:13.1f} "
+          f"{ukur_parse(parse_json, pesan_json):11.0f} ns")
+    print(f"{'biner':<10} {len(pesan_biner[0]):11d} {len(pesan_biner[0]) + OVERHEAD_WEBSOCKET:13d} "
+          f"{ukur_parse(decode, pesan_biner):11.0f} ns  (decode lengkap)")
+    print(f"{'':<10} {'':>11} {'':>13} {ukur_parse(parse_biner_indeks, pesan_biner):11.0f} ns  (indeks byte, seperti ESP32)")
+
+    print(f"\n{'mode':<22} {'pesan':>7} {'pesan/s':>8} {'byte/s':>9}")
+    for mode in ("every_frame", "delta"):
+        for binary in (False, True):
+            enc = DeltaEncoder(mode, args.deadzone, binary=binary)
+            total_byte = 0
+            for i, p in enumerate(daftar):
+                payload = enc.update(p, i / FPS)
+                if payload is not None:
+                    total_byte += len(payload) + OVERHEAD_WEBSOCKET
+            nama = f"{mode} {'biner' if binary else 'JSON'}"
+            print(f"{nama:<22} {enc.terkirim:7d} {enc.terkirim / durasi:8.1f} {total_byte / durasi:9.0f}")
@@ -1,13 +1,67 @@
 import cv2
 import mediapipe as mp
 import time
-from collections import deque
-import numpy as np
+from pipeline import buat_sumber
+from proctoring import ProctorConfig, ProctorSession, teks_pelanggaran
+from face_count import FaceCountScheduler, fitur_wajah_utama
+from roi_tracker import RoiFaceMesh, buat_model_cari
+from tasks_engine import TasksFaceLandmarker, TasksPipeline
+from adaptive_quality import AdaptiveFaceMesh
+from motion_gate import MotionGate
+from frame_bus import BusCapture
+from landmark_trace import PENANDA_KALIBRASI, TraceWriter
+from metrics import buat_metrics
+from event_store import EventStore
+from calibration import ProfileStore, kunci_profil
 
 # --- KONFIGURASI ---
 SMOOTHING_FRAMES = 7
+SMOOTHING_FILTER = "moving_average"  # atau "one_euro" / "kalman"
 DEADZONE_THRESHOLD = 5
 CALIBRATION_TIME = 3
+# Kalibrasi selesai lebih awal (paling cepat CALIBRATION_MIN_TIME detik) begitu rata-rata posisi sudah stabil
+CALIBRATION_MIN_TIME = 1.0
+# Engine inferensi: "face_mesh" (mp.solutions, sinkron) atau "tasks" (FaceLandmarker .task, LIVE_STREAM async).
+# Mode "tasks" tidak memakai ROI_MODE/PIPELINE_MODE (MediaPipe sendiri yang menjalankan inferensi di thread lain).
+ENGINE = "face_mesh"
+# Khusus "tasks": deviasi dihitung dari sudut yaw/pitch (facial transformation matrix) relatif ke kalibrasi.
+USE_POSE_ANGLES = False
+# Khusus "face_mesh": turunkan resolusi inferensi / iris / stride otomatis agar tetap di TARGET_FPS.
+ADAPTIVE_QUALITY = False
+TARGET_FPS = 30
+PIPELINE_MODE = True  # capture, inferensi & render di thread terpisah, frame basi dibuang
+# Penghitung wajah: "mesh" (tanpa model kedua), "on_loss", "interval" atau "every_frame"
+FACE_COUNT_MODE = "mesh"
+FACE_COUNT_INTERVAL = 15  # frame antar FaceDetection untuk mode "interval"/"on_loss"
+# ROI: inferensi mesh di crop sekitar wajah (aktifkan di laptop lemah dengan kamera 1080p).
+# Frame penuh tetap diperiksa tiap ROI_FULL_INTERVAL frame, jadi wajah kedua di luar crop
+# pada mode "mesh" terdeteksi paling lambat setelah interval itu.
+ROI_MODE = False
+ROI_SIZE = 256
+ROI_FULL_INTERVAL = 30
+# Motion gate: saat peserta diam, inferensi mesh dilewati dan landmark terakhir dipakai ulang (hemat CPU/baterai
+# untuk ujian panjang). Inferensi tetap dipaksa tiap MOTION_MAX_SKIP frame dan gerakan di seluruh frame ikut dicek.
+MOTION_GATE = False
+MOTION_THRESHOLD = 2.5
+MOTION_MAX_SKIP = 15
+# Kamera bersama: baca frame dari daemon `python frame_bus.py` (nama shared memory) agar perekam/tampilan
+# bisa jalan di proses lain dengan kamera yang sama. None = buka kamera sendiri.
+FRAME_BUS = None
+# Rekam landmark per frame ke file trace (mis. "ujian.htrace") untuk di-replay dengan replay.py, None = mati
+RECORD_TRACE = None
+# Instrumentasi: endpoint Prometheus di http://localhost:PORT/metrics dan/atau dump JSON berkala.
+# Keduanya None = mati (metrik diganti objek kosong, hampir tanpa overhead).
+METRICS_PORT = None          # mis. 9108
+METRICS_JSON = None          # mis. "metrics_stasiun.json"
+METRICS_JSON_INTERVAL = 10   # detik
+# Simpan semua event (kalibrasi, pelanggaran) ke SQLite agar tidak hilang saat program ditutup, None = mati.
+# Ringkasan: python event_store.py ujian.db
+EVENT_STORE = None           # mis. "ujian.db"
+SESSION_ID = "lokal"
+# Profil kalibrasi per peserta/komputer (JSON). Saat program dibuka ulang, posisi hanya dicek ~0.5 detik
+# lalu baseline profil dipakai, tanpa jeda kalibrasi. None = selalu tekan 'c' untuk kalibrasi.
+PROFILE_STORE = None         # mis. "calibration_profiles.json"
+PROFILE_USER = SESSION_ID
 
 # --- KONFIGURASI WARNING ---
 TURN_THRESHOLD_PERCENT = 17
@@ -21,64 +75,90 @@ mp_drawing = mp.solutions.drawing_utils
 mp_face_mesh = mp.solutions.face_mesh
 mp_face_detection = mp.solutions.face_detection
 
-# Inisialisasi model
-face_mesh = mp_face_mesh.FaceMesh(
-    max_num_faces=1,
-    refine_landmarks=True,
-    min_detection_confidence=0.5,
-    min_tracking_confidence=0.5
-)
-face_detector = mp_face_detection.FaceDetection(min_detection_confidence=0.7)
-
-cap = cv2.VideoCapture(0)
-
-# --- Variabel Status & Kalibrasi ---
-is_calibrating = False
-is_calibrated = False
-calibration_start_time = 0
-baseline_nose = (0, 0)
-baseline_face_center = (0, 0)
-
-# --- Deque untuk smoothing & history pelanggaran ---
-dx_hist = deque(maxlen=SMOOTHING_FRAMES)
-dy_hist = deque(maxlen=SMOOTHING_FRAMES)
-event_timestamps = deque()
-
-# --- Variabel untuk melacak durasi gerakan ---
-deviation_start_time = None
-violations_logged_this_deviation = 0
+# Inisialisasi model (FaceDetection hanya dibuat jika mode penghitung wajah membutuhkannya)
+face_detector = None
+if FACE_COUNT_MODE != "mesh":
+    face_detector = mp_face_detection.FaceDetection(min_detection_confidence=0.7)
+penghitung_wajah = FaceCountScheduler(FACE_COUNT_MODE, FACE_COUNT_INTERVAL, face_detector)
+
+if ENGINE == "tasks":
+    face_mesh = TasksFaceLandmarker(num_faces=penghitung_wajah.mesh_max_faces, pose=USE_POSE_ANGLES)
+elif ADAPTIVE_QUALITY:
+    face_mesh = AdaptiveFaceMesh(TARGET_FPS, max_num_faces=penghitung_wajah.mesh_max_faces)
+else:
+    face_mesh = mp_face_mesh.FaceMesh(
+        max_num_faces=penghitung_wajah.mesh_max_faces,
+        refine_landmarks=True,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+
+cap = BusCapture(FRAME_BUS) if FRAME_BUS else cv2.VideoCapture(0)
+
+# --- State pengawasan (kalibrasi, deviasi & history pelanggaran) ---
+sesi = ProctorSession(SESSION_ID, ProctorConfig(
+    smoothing_frames=SMOOTHING_FRAMES, smoothing_filter=SMOOTHING_FILTER, calibration_time=CALIBRATION_TIME,
+    turn_threshold_percent=TURN_THRESHOLD_PERCENT, nod_threshold_percent=NOD_THRESHOLD_PERCENT,
+    deviation_duration_seconds=DEVIATION_DURATION_SECONDS, warning_window_seconds=WARNING_WINDOW_SECONDS,
+    warning_count_threshold=WARNING_COUNT_THRESHOLD, use_pose=USE_POSE_ANGLES,
+    calibration_min_time=CALIBRATION_MIN_TIME))
+profil_store = ProfileStore(PROFILE_STORE) if PROFILE_STORE else None
+kunci = kunci_profil(PROFILE_USER)
+
+metrics = buat_metrics(METRICS_PORT, METRICS_JSON, METRICS_JSON_INTERVAL)
+event_store = EventStore(EVENT_STORE) if EVENT_STORE else None
+perekam = TraceWriter(RECORD_TRACE, max_faces=penghitung_wajah.mesh_max_faces) if RECORD_TRACE else None
+penanda = 0  # bit penanda untuk frame rekaman berikutnya
 
 # --- Fungsi untuk memulai kalibrasi ---
-def start_calibration():
-    global is_calibrating, is_calibrated, calibration_start_time, event_timestamps, violations_logged_this_deviation
-    is_calibrating, is_calibrated = True, False
-    calibration_start_time = time.time()
-    dx_hist.clear(); dy_hist.clear(); event_timestamps.clear()
-    violations_logged_this_deviation = 0
-    print("\n===== MEMULAI KALIBRASI BARU =====")
-
-while cap.isOpened():
-    ret, frame = cap.read()
-    if not ret: break
-
-    frame = cv2.flip(frame, 1)
+def start_calibration(profil=None):
+    global penanda
+    event = sesi.start_calibration(time.time(), profil)
+    if event_store is not None:
+        event_store.record(event)
+    penanda = PENANDA_KALIBRASI
+    print("\n===== MEMULAI KALIBRASI BARU =====" if profil is None else "\n===== MENCOCOKKAN PROFIL KALIBRASI =====")
+
+profil_awal = profil_store.load(kunci) if profil_store is not None else None
+if profil_awal is not None:
+    start_calibration(profil_awal)
+
+roi = None
+if ROI_MODE and ENGINE != "tasks":
+    roi = RoiFaceMesh(face_mesh.process, ROI_SIZE, full_interval=ROI_FULL_INTERVAL,
+                      search_process=buat_model_cari(penghitung_wajah.mesh_max_faces).process)
+
+proses_mesh = roi.process if roi is not None else face_mesh.process
+gate = None
+if MOTION_GATE and ENGINE != "tasks":
+    gate = MotionGate(proses_mesh, MOTION_THRESHOLD, MOTION_MAX_SKIP)
+    proses_mesh = gate.process
+
+def proses_frame(rgb_frame):
+    mesh_results = proses_mesh(rgb_frame)
+    return mesh_results, penghitung_wajah.count(rgb_frame, mesh_results)
+
+if ENGINE == "tasks":
+    sumber = TasksPipeline(cap, face_mesh, not FRAME_BUS, post=lambda rgb, hasil: (hasil, penghitung_wajah.count(rgb, hasil)))
+else:
+    sumber = buat_sumber(cap, proses_frame, PIPELINE_MODE, flip=not FRAME_BUS)
+
+for paket in sumber:
+    frame = paket.frame
     h, w, _ = frame.shape
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-    mesh_results = face_mesh.process(rgb_frame)
-    detection_results = face_detector.process(rgb_frame)
+    mesh_results, jumlah_wajah = paket.results
 
     # Peringatan Multi-Wajah (selalu aktif)
-    if detection_results.detections and len(detection_results.detections) > 1:
+    if jumlah_wajah > 1:
         cv2.putText(frame, "!!! LEBIH DARI 1 WAJAH !!!", (w // 2 - 300, h // 2 - 50),
                     cv2.FONT_HERSHEY_DUPLEX, 1.5, (0, 0, 255), 3)
 
-    if not is_calibrated and not is_calibrating:
+    if not sesi.is_calibrated and not sesi.is_calibrating:
         cv2.putText(frame, "Tekan 'c' untuk memulai kalibrasi", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
 
+    t_postproses = time.perf_counter()
+    fitur = None
     if mesh_results.multi_face_landmarks:
-        face_landmarks = mesh_results.multi_face_landmarks[0]
-        
         # --- [PERUBAHAN] BAGIAN INI DIJADIKAN KOMENTAR UNTUK MENGHILANGKAN JARING WAJAH ---
         # mp_drawing.draw_landmarks(
         #     image=frame, landmark_list=face_landmarks,
@@ -87,78 +167,77 @@ while cap.isOpened():
         #     connection_drawing_spec=mp_drawing.DrawingSpec(thickness=1, circle_radius=1, color=(0,255,0)))
         # ------------------------------------------------------------------------------
 
-        nose = face_landmarks.landmark[1]
-        x_n, y_n = int(nose.x * w), int(nose.y * h)
-        y_coords = [int(p.y * h) for p in face_landmarks.landmark]
-        y_face_center = (min(y_coords) + max(y_coords)) // 2
-
-        if is_calibrating:
-            elapsed_time = time.time() - calibration_start_time
-            cv2.putText(frame, f"Tahan Posisi... {CALIBRATION_TIME - int(elapsed_time)}", (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
-            
-            if elapsed_time <= CALIBRATION_TIME:
-                dx_hist.append(x_n); dy_hist.append(y_face_center)
-            else:
-                if dx_hist and dy_hist:
-                    baseline_nose = (int(np.mean(dx_hist)), 0)
-                    baseline_face_center = (0, int(np.mean(dy_hist)))
-                    is_calibrated = True
-                    print("===== KALIBRASI BERHASIL! =====")
-                is_calibrating = False
-                dx_hist.clear(); dy_hist.clear()
-
-        elif is_calibrated:
-            dx_smooth = np.mean(dx_hist) if dx_hist else 0
-            dy_smooth = np.mean(dy_hist) if dy_hist else 0
-            final_right = max(0, int(((x_n - baseline_nose[0]) / (w * 0.4)) * 100))
-            final_left = max(0, int((-(x_n - baseline_nose[0]) / (w * 0.4)) * 100))
-            final_up = max(0, int((-(y_face_center - baseline_face_center[1]) / (h * 0.4)) * 100))
-            final_down = max(0, int(((y_face_center - baseline_face_center[1]) / (h * 0.4)) * 100))
-
-            is_turning = final_right > TURN_THRESHOLD_PERCENT or final_left > TURN_THRESHOLD_PERCENT
-            is_nodding = final_up > NOD_THRESHOLD_PERCENT or final_down > NOD_THRESHOLD_PERCENT
-            is_deviating = is_turning or is_nodding
-
-            if is_deviating:
-                if deviation_start_time is None: deviation_start_time = time.time()
-                elapsed_time = time.time() - deviation_start_time
-                completed_intervals = int(elapsed_time / DEVIATION_DURATION_SECONDS)
-                if completed_intervals > violations_logged_this_deviation:
-                    event_timestamps.append(time.time())
-                    violations_logged_this_deviation = completed_intervals
-                    
-                    # --- LOG DI TERMINAL ---
-                    direction = ""
-                    if is_turning: direction = f"Menoleh ke {'KANAN' if final_right > final_left else 'KIRI'}"
-                    elif is_nodding: direction = f"Menunduk ke {'ATAS' if final_up > final_down else 'BAWAH'}"
-                    print(f"--> PELANGGARAN #{len(event_timestamps)} terdeteksi: {direction}")
-            else:
-                deviation_start_time = None; violations_logged_this_deviation = 0
-
-            current_time = time.time()
-            while event_timestamps and event_timestamps[0] < current_time - WARNING_WINDOW_SECONDS:
-                event_timestamps.popleft()
-            if len(event_timestamps) >= WARNING_COUNT_THRESHOLD:
-                cv2.putText(frame, "!!! WARNING !!!", (w // 2 - 200, h // 2), cv2.FONT_HERSHEY_TRIPLEX, 2, (0, 0, 255), 3)
-
-            cv2.putText(frame, f"Kanan: {final_right}% | Kiri: {final_left}%", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
-            cv2.putText(frame, f"Atas: {final_up}% | Bawah: {final_down}%", (50, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
-            cv2.putText(frame, f"Pelanggaran (1 mnt): {len(event_timestamps)}", (50, h-30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-            cv2.putText(frame, "Tekan 'c' untuk re-kalibrasi", (w - 350, h - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-
-    else:
+        fitur = fitur_wajah_utama(mesh_results, w, h)  # wajah terbesar (+ pose kepala jika engine "tasks")
+
+    now = time.time()
+    if perekam is not None:
+        perekam.write(now, w, h, mesh_results.multi_face_landmarks, penanda)
+        penanda = 0
+    if fitur is not None and sesi.is_calibrating:
+        cv2.putText(frame, f"Tahan Posisi... {sesi.calibration_remaining(now)}", (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
+
+    for event in sesi.update(fitur, w, h, now):
+        metrics.event(event)
+        if event_store is not None:
+            event_store.record(event)  # hanya masuk antrian, ditulis di thread lain
+        # --- LOG DI TERMINAL ---
+        if event["type"] == "calibrated":
+            print("===== KALIBRASI BERHASIL! =====" if event["source"] == "calibration"
+                  else "===== PROFIL KALIBRASI DIPAKAI =====")
+            if profil_store is not None and event["source"] == "calibration":
+                profil_store.save(kunci, sesi.calibration_profile(w, h))
+        elif event["type"] == "calibration_drift":
+            print("Posisi berubah dari profil tersimpan, lanjut kalibrasi penuh...")
+        elif event["type"] == "violation":
+            print(teks_pelanggaran(event))
+    metrics.stage("postprocess", time.perf_counter() - t_postproses)
+    metrics.wajah(fitur is not None, jumlah_wajah)
+    metrics.sesi(sesi)
+
+    if fitur is not None and sesi.is_calibrated:
+        final_right, final_left, final_up, final_down = sesi.percents
+        if sesi.warning:
+            cv2.putText(frame, "!!! WARNING !!!", (w // 2 - 200, h // 2), cv2.FONT_HERSHEY_TRIPLEX, 2, (0, 0, 255), 3)
+
+        cv2.putText(frame, f"Kanan: {final_right}% | Kiri: {final_left}%", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+        cv2.putText(frame, f"Atas: {final_up}% | Bawah: {final_down}%", (50, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+        cv2.putText(frame, f"Pelanggaran (1 mnt): {sesi.violations_in_window}", (50, h-30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+        cv2.putText(frame, "Tekan 'c' untuk re-kalibrasi", (w - 350, h - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+
+    elif fitur is None:
         # --- PERINGATAN WAJAH HILANG ---
-        if is_calibrated: # Hanya munculkan jika kalibrasi sudah selesai
+        if sesi.is_calibrated: # Hanya munculkan jika kalibrasi sudah selesai
             cv2.putText(frame, "!!! WAJAH HILANG !!!", (w // 2 - 250, h // 2),
                         cv2.FONT_HERSHEY_DUPLEX, 1.5, (0, 165, 255), 3)
 
+    cv2.putText(frame, f"Latensi: {sumber.latency.last_ms:.0f} ms", (w - 200, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 1)
     cv2.imshow("Sistem Pengawasan Ujian Pro", frame)
+    sumber.selesai(paket)
+    metrics.frame(paket, sumber.dropped_frames)
 
+    t_waitkey = time.perf_counter()
     key = cv2.waitKey(5) & 0xFF
+    metrics.stage("waitkey", time.perf_counter() - t_waitkey)
     if key == ord('q'): break
     if key == ord('c'): start_calibration()
 
+sumber.stop()
+metrics.tutup()
+print(sumber.latency.ringkasan())
+print(penghitung_wajah.ringkasan())
+if roi is not None:
+    print(roi.ringkasan())
+if ADAPTIVE_QUALITY and ENGINE != "tasks":
+    print(face_mesh.ringkasan())
+if gate is not None:
+    print(gate.ringkasan())
+if perekam is not None:
+    perekam.close()
+if event_store is not None:
+    event_store.close()
+    print(event_store.ringkasan())
 cap.release()
 face_mesh.close()
-face_detector.close()
+if face_detector is not None:
+    face_detector.close()
 cv2.destroyAllWindows()
\ No newline at end of file
@@ -0,0 +1,241 @@
+import argparse
+import asyncio
+import json
+import socket
+import time
+
+from websockets.asyncio.client import connect
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed, WebSocketException
+
+from wire_protocol import is_binary_message
+
+# --- KONFIGURASI DEFAULT ---
+HOST = "0.0.0.0"
+PORT = 8765
+ESP_URL = "ws://192.168.4.1:81"  # alamat default hotspot ESP32 (lihat compis.ino)
+SEND_TIMEOUT = 1.0         # detik; kirim ke ESP yang macet lebih lama dari ini -> putus & sambung ulang
+MAX_RATE_HZ = 60           # batas pesan per detik ke tiap ESP (0 = tanpa batas)
+SEND_BUFFER_BYTES = 2048   # buffer kirim kecil: ESP lambat cepat memberi backpressure, bukan antrian basi
+RECONNECT_MIN = 0.5        # detik, jeda awal sambung ulang (naik 2x sampai RECONNECT_MAX)
+RECONNECT_MAX = 10.0
+STATS_INTERVAL = 10.0      # detik antar log statistik, 0 = mati
+MAX_MESSAGE_BYTES = 1024
+
+ARAH = ("kanan", "kiri", "atas", "bawah")
+# Format lama di README: aplikasi mengirim sinyal teks "UP"/"DOWN"/"LEFT"/"RIGHT"
+SINYAL_LAMA = {"UP": "atas", "DOWN": "bawah", "LEFT": "kiri", "RIGHT": "kanan"}
+
+
+def parse_gerakan(pesan):
+    """
+    Validasi pesan dari aplikasi. Kembalikan payload yang akan diteruskan ke ESP32,
+    atau None jika pesan tidak dikenali. Pesan JSON atau biner (wire_protocol) yang valid
+    diteruskan apa adanya (tanpa serialisasi ulang).
+    """
+    if is_binary_message(pesan):
+        return pesan
+    if isinstance(pesan, bytes):
+        try:
+            pesan = pesan.decode()
+        except UnicodeDecodeError:
+            return None
+    teks = pesan.strip()
+    if teks.upper() in SINYAL_LAMA:
+        data = dict.fromkeys(ARAH, 0)
+        data[SINYAL_LAMA[teks.upper()]] = 100
+        return json.dumps(data)
+    try:
+        data = json.loads(teks)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or not all(isinstance(data.get(a), (int, float)) for a in ARAH):
+        return None
+    return teks
+
+
+class DeviceLink:
+    """
+    Koneksi keluar ke satu ESP32 dengan coalescing nilai terbaru:
+    hanya pesan paling baru yang disimpan, jadi ESP yang lambat tidak pernah membuat antrian menumpuk.
+    """
+
+    def __init__(self, nama, url, send_timeout=SEND_TIMEOUT, max_rate=MAX_RATE_HZ):
+        self.nama = nama
+        self.url = url
+        self.send_timeout = send_timeout
+        self.jeda_min = 1.0 / max_rate if max_rate else 0.0
+        self._terbaru = None
+        self._terakhir_terkirim = None  # dikirim ulang setelah sambung ulang (ESP32 reboot tidak ingat posisi)
+        self._ada_baru = asyncio.Event()
+        self.terhubung = False
+        # Statistik
+        self.diterima = 0      # pesan yang masuk untuk device ini
+        self.terkirim = 0      # pesan yang benar-benar dikirim
+        self.digabung = 0      # pesan yang ditimpa sebelum sempat dikirim
+        self.reconnects = 0
+        self.error_terakhir = None
+
+    def kirim(self, teks):
+        """Simpan nilai terbaru (tidak pernah menunggu). Nilai lama yang belum terkirim ditimpa."""
+        if self._terbaru is not None:
+            self.digabung += 1
+        self._terbaru = teks
+        self.diterima += 1
+        self._ada_baru.set()
+
+    async def jalan(self):
+        jeda = RECONNECT_MIN
+        while True:
+            try:
+                async with connect(self.url, open_timeout=5, ping_interval=5, ping_timeout=5,
+                                   max_size=MAX_MESSAGE_BYTES, compression=None,
+                                   write_limit=SEND_BUFFER_BYTES) as ws:
+                    sock = ws.transport.get_extra_info("socket")
+                    if sock is not None:
+                        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER_BYTES)
+                        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                    self.terhubung = True
+                    jeda = RECONNECT_MIN
+                    print(f"[{self.nama}] terhubung ke {self.url}")
+                    await self._loop_kirim(ws)
+            except asyncio.CancelledError:
+                raise
+            except (OSError, WebSocketException, asyncio.TimeoutError) as e:
+                self.error_terakhir = repr(e)
+            finally:
+                self.terhubung = False
+            self.reconnects += 1
+            print(f"[{self.nama}] terputus ({self.error_terakhir}), sambung ulang dalam {jeda:.1f} s")
+            await asyncio.sleep(jeda)
+            jeda = min(jeda * 2, RECONNECT_MAX)
+
+    async def _loop_kirim(self, ws):
+        # Setelah sambung ulang nilai terakhir langsung dikirim agar LED sesuai posisi kepala tanpa menunggu
+        # aplikasi mengirim lagi: nilai yang belum terkirim jika ada, jika tidak nilai terakhir yang sudah terkirim
+        if self._terbaru is not None:
+            self._ada_baru.set()
+        elif self._terakhir_terkirim is not None:
+            await asyncio.wait_for(ws.send(self._terakhir_terkirim), self.send_timeout)
+            self.terkirim += 1
+        # Koneksi yang ditutup device (reboot, ping timeout) harus terdeteksi walau tidak ada pesan baru
+        tutup = asyncio.ensure_future(ws.wait_closed())
+        try:
+            while True:
+                baru = asyncio.ensure_future(self._ada_baru.wait())
+                await asyncio.wait((baru, tutup), return_when=asyncio.FIRST_COMPLETED)
+                if not baru.done():
+                    baru.cancel()
+                    self.error_terakhir = "koneksi ditutup device"
+                    return
+                self._ada_baru.clear()
+                teks, self._terbaru = self._terbaru, None
+                if teks is None:
+                    continue
+                try:
+                    # Backpressure: send menunggu buffer TCP kosong; selama itu pesan baru hanya menimpa _terbaru
+                    await asyncio.wait_for(ws.send(teks), self.send_timeout)
+                except (OSError, WebSocketException, asyncio.TimeoutError):
+                    if self._terbaru is None:
+                        self._terbaru = teks  # belum terkirim: dikirim setelah sambung ulang
+                    raise
+                self.terkirim += 1
+                self._terakhir_terkirim = teks
+                if self.jeda_min:
+                    # Batasi laju: pesan yang datang selama jeda ini digabung jadi satu nilai terbaru
+                    await asyncio.sleep(self.jeda_min)
+        finally:
+            tutup.cancel()
+
+    def ringkasan(self):
+        status = "terhubung" if self.terhubung else "terputus"
+        return (f"[{self.nama}] {status}: {self.diterima} masuk, {self.terkirim} terkirim, "
+                f"{self.digabung} digabung, {self.reconnects} sambung ulang")
+
+
+class BridgeServer:
+    """Terima banyak klien aplikasi (Flutter) dan teruskan gerakan kepala ke satu atau lebih ESP32."""
+
+    def __init__(self, devices, host=HOST, port=PORT):
+        self.devices = {d.nama: d for d in devices}
+        self.host = host
+        self.port = port
+        self.klien = 0
+        self.pesan_invalid = 0
+
+    def tujuan(self, path):
+        """Path "/" -> semua device, "/<nama>" -> device tertentu saja."""
+        nama = path.strip("/").split("?")[0]
+        if not nama:
+            return list(self.devices.values())
+        return [self.devices[nama]] if nama in self.devices else []
+
+    async def _handler(self, ws):
+        tujuan = self.tujuan(ws.request.path)
+        if not tujuan:
+            await ws.close(1008, "device tidak dikenal")
+            return
+        self.klien += 1
+        try:
+            async for pesan in ws:
+                teks = parse_gerakan(pesan)
+                if teks is None:
+                    self.pesan_invalid += 1
+                    continue
+                for device in tujuan:
+                    device.kirim(teks)
+        except ConnectionClosed:
+            pass
+        finally:
+            self.klien -= 1
+
+    async def _log_statistik(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            print(f"--- {time.strftime('%H:%M:%S')} klien aplikasi: {self.klien}, pesan invalid: {self.pesan_invalid}")
+            for device in self.devices.values():
+                print(device.ringkasan())
+
+    async def jalan(self, stats_interval=STATS_INTERVAL, siap=None):
+        tugas = [asyncio.create_task(d.jalan()) for d in self.devices.values()]
+        if stats_interval:
+            tugas.append(asyncio.create_task(self._log_statistik(stats_interval)))
+        try:
+            async with serve(self._handler, self.host, self.port, max_size=MAX_MESSAGE_BYTES,
+                             compression=None) as server:
+                print(f"Bridge berjalan di ws://{self.host}:{self.port} -> "
+                      + ", ".join(f"{d.nama}={d.url}" for d in self.devices.values()))
+                if siap is not None:
+                    siap.set()
+                await server.serve_forever()
+        finally:
+            for t in tugas:
+                t.cancel()
+            await asyncio.gather(*tugas, return_exceptions=True)
+
+
+def parse_devices(daftar, max_rate=MAX_RATE_HZ):
+    """Argumen "URL" atau "NAMA=URL" -> daftar DeviceLink."""
+    devices = []
+    for i, item in enumerate(daftar):
+        nama, url = f"esp{i + 1}", item
+        if "=" in item and "://" not in item.split("=", 1)[0]:
+            nama, url = item.split("=", 1)
+        devices.append(DeviceLink(nama, url, max_rate=max_rate))
+    return devices
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Jembatan WebSocket aplikasi Flutter -> ESP32")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--esp", nargs="+", default=[ESP_URL], help="URL ESP32 (boleh NAMA=URL), bisa lebih dari satu")
+    parser.add_argument("--max-rate", type=float, default=MAX_RATE_HZ, help="pesan/detik maksimal ke tiap ESP (0 = tanpa batas)")
+    parser.add_argument("--stats-interval", type=float, default=STATS_INTERVAL)
+    args = parser.parse_args()
+
+    bridge = BridgeServer(parse_devices(args.esp, args.max_rate), args.host, args.port)
+    try:
+        asyncio.run(bridge.jalan(args.stats_interval))
+    except KeyboardInterrupt:
+        pass
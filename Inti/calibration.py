@@ -0,0 +1,115 @@
+import json
+import os
+import socket
+import time
+
+import numpy as np
+
+# --- KONFIGURASI DEFAULT ---
+MIN_SAMPEL = 10               # kalibrasi tidak pernah dianggap stabil dengan sampel lebih sedikit
+TOLERANSI_RELATIF = 0.002     # standard error rata-rata posisi (bagian dari lebar/tinggi frame) yang dianggap stabil
+TOLERANSI_POSE = 0.5          # standard error rata-rata sudut (derajat) yang dianggap stabil
+DRIFT_SIGMA = 3.0             # profil masih cocok jika rata-rata baru dalam DRIFT_SIGMA x std profil ...
+DRIFT_MIN_RELATIF = 0.03      # ... atau dalam 3% lebar/tinggi frame (mana yang lebih besar)
+DRIFT_MIN_POSE = 3.0          # batas bawah yang sama untuk sudut (derajat)
+PROFILE_PATH = "calibration_profiles.json"
+
+
+class RunningStats:
+    """
+    Rata-rata & varians berjalan (Welford): O(1) per sampel tanpa menyimpan sampel,
+    stabil secara numerik. Semua channel (mis. [x, y]) diperbarui sekaligus.
+    """
+
+    def __init__(self, shape):
+        self.n = 0
+        self.mean = np.zeros(shape, dtype=np.float64)
+        self._m2 = np.zeros(shape, dtype=np.float64)
+
+    def update(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (x - self.mean)
+
+    @property
+    def variance(self):
+        """Varians sampel (n - 1); nol jika sampel < 2."""
+        if self.n < 2:
+            return np.zeros_like(self._m2)
+        return self._m2 / (self.n - 1)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    @property
+    def sem(self):
+        """Standard error rata-rata: seberapa jauh `mean` kira-kira dari nilai sebenarnya."""
+        if self.n < 2:
+            return np.full_like(self._m2, np.inf)
+        return np.sqrt(self.variance / self.n)
+
+    def stabil(self, toleransi, min_sampel=MIN_SAMPEL):
+        return self.n >= min_sampel and bool(np.all(self.sem <= toleransi))
+
+    def __len__(self):
+        return self.n
+
+    def reset(self):
+        self.n = 0
+        self.mean.fill(0)
+        self._m2.fill(0)
+
+    def to_dict(self, skala=1.0):
+        """Ringkasan untuk profil: mean & std dibagi `skala` (mis. (w, h) agar tidak bergantung resolusi)."""
+        return {"mean": (self.mean / skala).tolist(), "std": (self.std / skala).tolist(), "n": self.n}
+
+
+def cek_drift(tersimpan, stats, skala=1.0, sigma=DRIFT_SIGMA, minimum=DRIFT_MIN_RELATIF):
+    """
+    Bandingkan rata-rata singkat `stats` dengan channel profil `tersimpan` (hasil RunningStats.to_dict).
+    Kembalikan (cocok, selisih) dengan selisih dalam satuan profil (mis. bagian dari frame).
+    """
+    selisih = np.abs(stats.mean / skala - np.asarray(tersimpan["mean"]))
+    batas = np.maximum(sigma * np.asarray(tersimpan["std"]), minimum)
+    return bool(np.all(selisih <= batas)), selisih
+
+
+def kunci_profil(user, station=None):
+    """Kunci profil per pengguna & stasiun (default: hostname), mis. "budi@lab-3-pc07"."""
+    return f"{user}@{station or socket.gethostname()}"
+
+
+class ProfileStore:
+    """Profil kalibrasi tersimpan di satu file JSON; ditulis ke file sementara lalu di-rename (atomik)."""
+
+    def __init__(self, path=PROFILE_PATH):
+        self.path = path
+        self._profil = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._profil = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Profil kalibrasi {path} tidak bisa dibaca ({e}), mulai dari kosong")
+
+    def load(self, kunci):
+        return self._profil.get(kunci)
+
+    def save(self, kunci, profil):
+        if not profil:
+            return  # belum ada profil (kalibrasi belum selesai): jangan timpa file
+        # Digabung dengan profil lama: HeadTracker ("neutral") & ProctorSession ("position") berbagi satu kunci
+        self._profil[kunci] = dict(self._profil.get(kunci, {}), **profil, saved_at=time.time())
+        sementara = f"{self.path}.tmp"
+        with open(sementara, "w", encoding="utf-8") as f:
+            json.dump(self._profil, f, indent=1)
+        os.replace(sementara, self.path)
+
+    def __contains__(self, kunci):
+        return kunci in self._profil
+
+    def __len__(self):
+        return len(self._profil)
@@ -0,0 +1,116 @@
+import time
+
+import cv2
+import mediapipe as mp
+
+from frame_bus import BusCapture
+from multi_face import GRID_TILE, MAX_IDENTITAS, RoomSession, ThroughputPerWajah, TiledFaceMesh
+from pipeline import buat_sumber
+from proctoring import ProctorConfig, teks_pelanggaran
+
+# --- KONFIGURASI ---
+# Satu kamera wide-angle untuk satu ruang ujian: semua wajah dilacak, masing-masing dengan identitas sendiri.
+SESSION_ID = "kelas-1"
+CAMERA = 0
+RESOLUTION = (1920, 1080)  # minta resolusi tinggi agar wajah di bangku belakang masih cukup besar
+# Kamera bersama: baca frame dari daemon `python frame_bus.py --no-flip` (nama shared memory), None = buka kamera.
+FRAME_BUS = None
+# Tile: frame dibagi GRID kolom x baris dengan overlap, satu FaceMesh per tile. (1, 1) = frame penuh saja.
+GRID = GRID_TILE
+FACES_PER_TILE = 10
+MAX_PESERTA = MAX_IDENTITAS
+PIPELINE_MODE = True
+# Konstanta pengawasan per peserta (sama dengan branch.py)
+SMOOTHING_FRAMES = 7
+CALIBRATION_TIME = 3
+TURN_THRESHOLD_PERCENT = 17
+NOD_THRESHOLD_PERCENT = 9
+DEVIATION_DURATION_SECONDS = 2
+WARNING_WINDOW_SECONDS = 60
+WARNING_COUNT_THRESHOLD = 3
+WINDOW_NAME = "Pengawasan Ruang Ujian"
+LEBAR_TAMPILAN = 1280  # frame diperkecil untuk ditampilkan
+
+
+def buat_model():
+    return mp.solutions.face_mesh.FaceMesh(max_num_faces=FACES_PER_TILE, refine_landmarks=False,
+                                           min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+
+if FRAME_BUS:
+    cap = BusCapture(FRAME_BUS)
+else:
+    cap = cv2.VideoCapture(CAMERA)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, RESOLUTION[0])
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, RESOLUTION[1])
+
+ruang = RoomSession(SESSION_ID, ProctorConfig(
+    smoothing_frames=SMOOTHING_FRAMES, calibration_time=CALIBRATION_TIME,
+    turn_threshold_percent=TURN_THRESHOLD_PERCENT, nod_threshold_percent=NOD_THRESHOLD_PERCENT,
+    deviation_duration_seconds=DEVIATION_DURATION_SECONDS, warning_window_seconds=WARNING_WINDOW_SECONDS,
+    warning_count_threshold=WARNING_COUNT_THRESHOLD), max_identitas=MAX_PESERTA)
+throughput = ThroughputPerWajah()
+
+with TiledFaceMesh(buat_model, GRID) as model:
+    def proses(rgb):
+        mulai = time.perf_counter()
+        hasil = model.process(rgb)
+        throughput.update(len(hasil.multi_face_landmarks), time.perf_counter() - mulai)
+        return hasil
+
+    # Kamera ruang kelas tidak di-mirror
+    sumber = buat_sumber(cap, proses, PIPELINE_MODE, flip=False)
+    for paket in sumber:
+        frame = paket.frame
+        h, w, _ = frame.shape
+        now = time.time()
+
+        for event in ruang.update(paket.results.multi_face_landmarks, w, h, now):
+            if event["type"] == "violation":
+                print(f"[ID {event['identity']}] {teks_pelanggaran(event)}")
+            elif event["type"] in ("identity_new", "identity_lost", "calibrated"):
+                print(f"[ID {event['identity']}] {event['type']}")
+
+        # --- GAMBAR KOTAK & STATUS SETIAP PESERTA ---
+        warning = ruang.warning(now)
+        jumlah_pelanggaran = ruang.violations_in_window(now)
+        for slot in ruang.slot_wajah[ruang.slot_wajah >= 0]:
+            x1, y1, x2, y2 = (ruang.kotak[slot] * (w, h, w, h)).astype(int)
+            if warning[slot]:
+                warna = (0, 0, 255)
+            elif ruang.terkalibrasi[slot]:
+                warna = (0, 255, 0)
+            else:
+                warna = (0, 255, 255)  # masih kalibrasi
+            cv2.rectangle(frame, (x1, y1), (x2, y2), warna, 2)
+            kanan, kiri, atas, bawah = ruang.percents[slot]
+            cv2.putText(frame, f"ID {ruang.ids[slot]}  P:{jumlah_pelanggaran[slot]}", (x1, y1 - 8),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, warna, 2)
+            cv2.putText(frame, f"{max(kanan, kiri)}/{max(atas, bawah)}%", (x1, y2 + 18),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, warna, 1)
+
+        cv2.putText(frame, f"Peserta: {int(ruang.aktif.sum())}  Warning: {int(warning.sum())}", (20, 40),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 0), 2)
+        cv2.putText(frame, f"Latensi: {sumber.latency.last_ms:.0f} ms", (w - 260, h - 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (200, 200, 200), 2)
+        if w > LEBAR_TAMPILAN:
+            frame = cv2.resize(frame, (LEBAR_TAMPILAN, h * LEBAR_TAMPILAN // w), interpolation=cv2.INTER_AREA)
+        cv2.imshow(WINDOW_NAME, frame)
+        sumber.selesai(paket)
+
+        # --- KONTROL KEYBOARD ---
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'):
+            break
+        if key == ord('c'):  # kalibrasi ulang semua peserta
+            ruang.start_calibration(time.time())
+            print("\n===== KALIBRASI ULANG SEMUA PESERTA =====")
+
+    sumber.stop()
+
+print(sumber.latency.ringkasan())
+print(model.ringkasan())
+print(ruang.ringkasan())
+print(throughput.ringkasan())
+cap.release()
+cv2.destroyAllWindows()
@@ -0,0 +1,103 @@
+import numpy as np
+
+
+class EntityPool:
+    """
+    Penyimpanan entitas game (obstacle, koin, ...) sebagai struct-of-arrays NumPy.
+    Kapasitas dialokasikan di awal dan slot yang kosong dipakai ulang, jadi tidak ada
+    list baru per frame. Posisi (x, y) adalah titik tengah, w/h ukuran kotak.
+    """
+
+    def __init__(self, capacity=64):
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        self.w = np.zeros(capacity, dtype=np.int64)
+        self.h = np.zeros(capacity, dtype=np.int64)
+        self.aktif = np.zeros(capacity, dtype=bool)
+        self._bebas = list(range(capacity - 1, -1, -1))  # stack slot kosong, slot terkecil dipakai dulu
+        self.count = 0
+
+    @property
+    def capacity(self):
+        return len(self.aktif)
+
+    def _perbesar(self, minimal):
+        lama = self.capacity
+        baru = max(lama * 2, minimal, 16)
+        for nama in ("x", "y", "w", "h", "aktif"):
+            arr = getattr(self, nama)
+            besar = np.zeros(baru, dtype=arr.dtype)
+            besar[:lama] = arr
+            setattr(self, nama, besar)
+        self._bebas = list(range(baru - 1, lama - 1, -1)) + self._bebas
+
+    def spawn(self, x, y, w, h):
+        """Tambah satu entitas, kembalikan indeks slotnya."""
+        if not self._bebas:
+            self._perbesar(self.capacity + 1)
+        i = self._bebas.pop()
+        self.x[i], self.y[i], self.w[i], self.h[i] = x, y, w, h
+        self.aktif[i] = True
+        self.count += 1
+        return i
+
+    def spawn_many(self, xs, ys, w, h):
+        """Tambah banyak entitas sekaligus (w/h skalar atau array)."""
+        n = len(xs)
+        if n > len(self._bebas):
+            self._perbesar(self.count + n)
+        idx = np.array([self._bebas.pop() for _ in range(n)], dtype=np.int64)
+        self.x[idx], self.y[idx], self.w[idx], self.h[idx] = xs, ys, w, h
+        self.aktif[idx] = True
+        self.count += n
+        return idx
+
+    def kill(self, mask):
+        """Nonaktifkan entitas berdasarkan mask boolean (panjang = kapasitas) atau array indeks."""
+        idx = np.flatnonzero(mask) if np.asarray(mask).dtype == bool else np.asarray(mask)
+        idx = idx[self.aktif[idx]]
+        self.aktif[idx] = False
+        self._bebas.extend(idx[::-1].tolist())
+        self.count -= len(idx)
+        return len(idx)
+
+    def clear(self):
+        self.aktif[:] = False
+        self._bebas = list(range(self.capacity - 1, -1, -1))
+        self.count = 0
+
+    # --- OPERASI VEKTOR ---
+    def move(self, dx=0.0, dy=0.0):
+        # Slot kosong ikut digeser: lebih murah daripada indexing dengan mask, nilainya diabaikan
+        if dx:
+            self.x += dx
+        if dy:
+            self.y += dy
+
+    def cull(self, max_y):
+        """Hapus entitas yang sudah melewati batas bawah layar (y >= max_y)."""
+        return self.kill(self.aktif & (self.y >= max_y))
+
+    def overlaps(self, x0, y0, w, h):
+        """Mask entitas aktif yang kotaknya beririsan dengan kotak (x0, y0, w, h) (pojok kiri atas + ukuran)."""
+        kiri = self.x - self.w // 2
+        atas = self.y - self.h // 2
+        return (self.aktif & (x0 < kiri + self.w) & (x0 + w > kiri)
+                & (y0 < atas + self.h) & (y0 + h > atas))
+
+    def near(self, x, y, jarak_y):
+        """True jika ada entitas aktif di x yang sama dengan selisih y < jarak_y."""
+        return bool((self.aktif & (self.x == x) & (np.abs(self.y - y) < jarak_y)).any())
+
+    def min_y(self, default=0):
+        if not self.count:
+            return default
+        return float(self.y[self.aktif].min())
+
+    def kotak(self):
+        """Array (n, 4) [x, y, w, h] entitas aktif, untuk digambar."""
+        aktif = self.aktif
+        return np.column_stack((self.x[aktif], self.y[aktif], self.w[aktif], self.h[aktif]))
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,194 @@
+import argparse
+import json
+import queue
+import sqlite3
+import threading
+import time
+
+# --- KONFIGURASI DEFAULT ---
+BATCH_SIZE = 256        # event maksimum per transaksi
+FLUSH_INTERVAL = 0.5    # detik; event ditulis paling lambat setelah selang ini
+MAX_ANTRIAN = 100_000   # event yang menunggu ditulis; jika penuh event dibuang (loop frame tidak pernah menunggu)
+
+KOLOM_UTAMA = ("session", "t", "type", "direction", "magnitude")
+
+SKEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    t REAL NOT NULL,
+    type TEXT NOT NULL,
+    direction TEXT,
+    magnitude INTEGER,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_sesi ON events (session_id, type, t);
+"""
+
+
+def _baris(event):
+    """Event dict (format ProctorSession) -> baris tabel; field lain disimpan sebagai JSON."""
+    sisa = {k: v for k, v in event.items() if k not in KOLOM_UTAMA}
+    return (event.get("session", ""), event.get("t", time.time()), event["type"],
+            event.get("direction"), event.get("magnitude"), json.dumps(sisa) if sisa else None)
+
+
+class EventStore:
+    """
+    Penyimpanan event pengawasan di SQLite (mode WAL) dengan satu thread penulis.
+    `record` hanya memasukkan event ke antrian lalu langsung kembali; thread penulis
+    mengumpulkan event menjadi batch dan menulisnya dalam satu transaksi. Query membaca
+    lewat koneksi terpisah, jadi tidak menghalangi penulisan.
+    """
+
+    def __init__(self, path, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL, max_antrian=MAX_ANTRIAN):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._antrian = queue.Queue(max_antrian)
+        self._bangun = threading.Event()  # memotong jeda antar batch saat flush()/close()
+        self.ditulis = 0
+        self.dibuang = 0
+        self.batch = 0
+
+        with sqlite3.connect(path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SKEMA)
+        conn.close()
+        self._baca = sqlite3.connect(path, check_same_thread=False)
+        self._kunci_baca = threading.Lock()
+
+        self._thread = threading.Thread(target=self._loop_tulis, name="event-store", daemon=True)
+        self._thread.start()
+
+    # --- PENULISAN ---
+    def record(self, event):
+        """Simpan satu event tanpa menunggu. False jika antrian penuh dan event dibuang."""
+        try:
+            self._antrian.put_nowait(_baris(event))
+            return True
+        except queue.Full:
+            self.dibuang += 1
+            return False
+
+    def flush(self, timeout=None):
+        """Tunggu sampai semua event yang sudah di-record tertulis ke disk."""
+        selesai = threading.Event()
+        self._antrian.put(selesai)
+        self._bangun.set()
+        return selesai.wait(timeout)
+
+    def _loop_tulis(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA synchronous=NORMAL")  # aman di mode WAL, fsync hanya saat checkpoint
+        berjalan = True
+        while berjalan:
+            item = self._antrian.get()
+            mulai = time.perf_counter()
+
+            baris, penanda = [], []
+            while True:
+                if item is None:
+                    berjalan = False
+                elif isinstance(item, threading.Event):
+                    penanda.append(item)
+                else:
+                    baris.append(item)
+                if not berjalan or len(baris) >= self.batch_size:
+                    break
+                try:
+                    item = self._antrian.get_nowait()
+                except queue.Empty:
+                    break
+
+            if baris:
+                with conn:
+                    conn.executemany("INSERT INTO events (session_id, t, type, direction, magnitude, data) "
+                                     "VALUES (?, ?, ?, ?, ?, ?)", baris)
+                self.ditulis += len(baris)
+                self.batch += 1
+            for selesai in penanda:
+                selesai.set()
+
+            # Batch belum penuh: kumpulkan event berikutnya dulu agar satu transaksi berisi banyak event
+            if berjalan and len(baris) < self.batch_size:
+                self._bangun.wait(self.flush_interval - (time.perf_counter() - mulai))
+                self._bangun.clear()
+        conn.close()
+
+    def close(self):
+        self._antrian.put(None)
+        self._bangun.set()
+        self._thread.join()
+        self._baca.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- QUERY ---
+    def _query(self, sql, parameter=()):
+        with self._kunci_baca:
+            return self._baca.execute(sql, parameter).fetchall()
+
+    def count_window(self, session_id, t_awal, t_akhir=None, jenis="violation"):
+        """Jumlah event satu sesi dalam rentang [t_awal, t_akhir] (memakai indeks session_id, type, t)."""
+        if t_akhir is None:
+            t_akhir = float("inf")
+        return self._query("SELECT COUNT(*) FROM events WHERE session_id = ? AND type = ? AND t BETWEEN ? AND ?",
+                           (session_id, jenis, t_awal, t_akhir))[0][0]
+
+    def summary(self, session_id):
+        """Ringkasan satu sesi: jumlah & magnitude maksimum pelanggaran per arah, rentang waktu, jumlah per jenis event."""
+        per_arah = {arah: {"count": n, "max_magnitude": maks} for arah, n, maks in self._query(
+            "SELECT direction, COUNT(*), MAX(magnitude) FROM events "
+            "WHERE session_id = ? AND type = 'violation' GROUP BY direction", (session_id,))}
+        per_jenis = dict(self._query("SELECT type, COUNT(*) FROM events WHERE session_id = ? GROUP BY type",
+                                     (session_id,)))
+        awal, akhir = self._query("SELECT MIN(t), MAX(t) FROM events WHERE session_id = ?", (session_id,))[0]
+        return {"session": session_id, "first_t": awal, "last_t": akhir,
+                "violations": sum(d["count"] for d in per_arah.values()),
+                "per_direction": per_arah, "per_type": per_jenis}
+
+    def sessions(self):
+        return [s for (s,) in self._query("SELECT DISTINCT session_id FROM events ORDER BY session_id")]
+
+    def events(self, session_id, t_awal=0.0, t_akhir=None):
+        """Event satu sesi dalam rentang waktu, sebagai dict seperti yang di-record."""
+        if t_akhir is None:
+            t_akhir = float("inf")
+        hasil = []
+        for session, t, jenis, arah, besar, data in self._query(
+                "SELECT session_id, t, type, direction, magnitude, data FROM events "
+                "WHERE session_id = ? AND t BETWEEN ? AND ? ORDER BY t", (session_id, t_awal, t_akhir)):
+            event = {"session": session, "t": t, "type": jenis}
+            if arah is not None:
+                event["direction"], event["magnitude"] = arah, besar
+            if data:
+                event.update(json.loads(data))
+            hasil.append(event)
+        return hasil
+
+    def ringkasan(self):
+        return (f"Event store {self.path}: {self.ditulis} event dalam {self.batch} batch"
+                + (f", {self.dibuang} dibuang (antrian penuh)" if self.dibuang else ""))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tampilkan ringkasan pelanggaran dari database event pengawasan")
+    parser.add_argument("db", help="file SQLite (EVENT_STORE di branch.py / --db di proctor_server.py)")
+    parser.add_argument("--session", help="hanya sesi ini")
+    parser.add_argument("--events", action="store_true", help="tampilkan semua event sesi")
+    args = parser.parse_args()
+
+    with EventStore(args.db) as store:
+        for session_id in ([args.session] if args.session else store.sessions()):
+            s = store.summary(session_id)
+            arah = ", ".join(f"{a}: {d['count']} (maks {d['max_magnitude']}%)" for a, d in sorted(s["per_direction"].items()))
+            durasi = (s["last_t"] or 0) - (s["first_t"] or 0)
+            print(f"{session_id:<20} {s['violations']:5d} pelanggaran  {durasi:8.1f} s  {arah}")
+            if args.events:
+                for event in store.events(session_id):
+                    print("   ", json.dumps(event))
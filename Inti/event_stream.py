@@ -0,0 +1,178 @@
+import json
+import queue
+import socket
+import threading
+
+# --- KONFIGURASI DEFAULT ---
+MAX_ANTRIAN = 10_000       # baris yang menunggu ditulis ke stdout/file; jika penuh baris dibuang
+MAX_ANTRIAN_KLIEN = 1_000  # per klien TCP; klien lambat kehilangan baris, loop tracking tidak pernah menunggu
+
+
+def encode_event(event):
+    """Satu event dict -> satu baris JSON Lines (bytes)."""
+    return (json.dumps(event, separators=(",", ":")) + "\n").encode()
+
+
+class JsonlStream:
+    """
+    Tulis event sebagai JSON Lines ke stdout atau file dari thread sendiri.
+    `publish` hanya memasukkan baris ke antrian, jadi pipe yang lambat/penuh tidak menahan loop frame.
+    """
+
+    def __init__(self, keluaran, max_antrian=MAX_ANTRIAN):
+        self.keluaran = keluaran  # objek file biner, mis. sys.stdout.buffer
+        self._antrian = queue.Queue(max_antrian)
+        self.ditulis = 0
+        self.dibuang = 0
+        self._thread = threading.Thread(target=self._loop, name="jsonl", daemon=True)
+        self._thread.start()
+
+    def publish(self, event, baris=None):
+        try:
+            self._antrian.put_nowait(baris or encode_event(event))
+            return True
+        except queue.Full:
+            self.dibuang += 1
+            return False
+
+    def _loop(self):
+        while True:
+            baris = self._antrian.get()
+            if baris is None:
+                break
+            try:
+                self.keluaran.write(baris)
+                if self._antrian.empty():
+                    self.keluaran.flush()
+            except (BrokenPipeError, ValueError):
+                break  # pembaca (mis. `| head`) sudah menutup pipe
+            self.ditulis += 1
+
+    def close(self):
+        try:
+            self._antrian.put(None, timeout=1.0)
+        except queue.Full:
+            pass  # thread penulis sudah berhenti (pipe ditutup)
+        self._thread.join(timeout=2.0)
+
+    def ringkasan(self):
+        return f"JSONL: {self.ditulis} baris" + (f", {self.dibuang} dibuang" if self.dibuang else "")
+
+
+class _Klien:
+    """Satu koneksi TCP: thread pengirim dari antrian sendiri dan thread pembaca perintah."""
+
+    def __init__(self, conn, alamat, perintah, max_antrian):
+        self.conn = conn
+        self.alamat = alamat
+        self.perintah = perintah
+        self.antrian = queue.Queue(max_antrian)
+        self.dibuang = 0
+        self.hidup = True
+        threading.Thread(target=self._kirim, name=f"klien-kirim-{alamat[1]}", daemon=True).start()
+        threading.Thread(target=self._baca, name=f"klien-baca-{alamat[1]}", daemon=True).start()
+
+    def kirim(self, baris):
+        try:
+            self.antrian.put_nowait(baris)
+        except queue.Full:
+            self.dibuang += 1
+
+    def _kirim(self):
+        while self.hidup:
+            baris = self.antrian.get()
+            if baris is None:
+                break
+            try:
+                self.conn.sendall(baris)
+            except OSError:
+                break
+        self.tutup()
+
+    def _baca(self):
+        try:
+            with self.conn.makefile("r", encoding="utf-8", errors="replace") as f:
+                for baris in f:
+                    baris = baris.strip()
+                    if baris and self.perintah is not None:
+                        self.perintah(baris, f"tcp:{self.alamat[0]}:{self.alamat[1]}")
+        except (OSError, ValueError):
+            pass
+        self.tutup()
+
+    def tutup(self):
+        if not self.hidup:
+            return
+        self.hidup = False
+        try:
+            self.antrian.put_nowait(None)  # bangunkan thread pengirim
+        except queue.Full:
+            pass
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.conn.close()
+
+
+class EventServer:
+    """
+    Server TCP lokal untuk stream event: setiap klien menerima semua event sebagai JSON Lines
+    dan boleh mengirim perintah satu per baris (mis. "calibrate" atau {"cmd": "reset"}).
+    `perintah(teks, sumber)` dipanggil dari thread klien; simpan ke antrian, jangan ubah state tracking langsung.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, perintah=None, max_antrian=MAX_ANTRIAN_KLIEN):
+        self.perintah = perintah
+        self.max_antrian = max_antrian
+        self._klien = []
+        self._kunci = threading.Lock()
+        self.terkirim = 0
+        self.total_klien = 0
+        self._server = socket.create_server((host, port))
+        self.alamat = self._server.getsockname()[:2]
+        self._thread = threading.Thread(target=self._terima, name="event-server", daemon=True)
+        self._thread.start()
+
+    @property
+    def jumlah_klien(self):
+        with self._kunci:
+            return sum(k.hidup for k in self._klien)
+
+    def _terima(self):
+        while True:
+            try:
+                conn, alamat = self._server.accept()
+            except OSError:
+                break  # server ditutup
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._kunci:
+                self._klien = [k for k in self._klien if k.hidup]
+                self._klien.append(_Klien(conn, alamat, self.perintah, self.max_antrian))
+                self.total_klien += 1
+
+    def publish(self, event, baris=None):
+        baris = baris or encode_event(event)
+        with self._kunci:
+            klien = [k for k in self._klien if k.hidup]
+        for k in klien:
+            k.kirim(baris)
+        self.terkirim += 1
+        return bool(klien)
+
+    def close(self):
+        try:
+            self._server.shutdown(socket.SHUT_RDWR)  # membangunkan accept() yang sedang menunggu
+        except OSError:
+            pass
+        self._server.close()
+        with self._kunci:
+            for k in self._klien:
+                k.tutup()
+        self._thread.join(timeout=1.0)
+
+    def ringkasan(self):
+        with self._kunci:
+            dibuang = sum(k.dibuang for k in self._klien)
+        return (f"Event server {self.alamat[0]}:{self.alamat[1]}: {self.terkirim} event, "
+                f"{self.total_klien} klien pernah terhubung" + (f", {dibuang} baris dibuang" if dibuang else ""))
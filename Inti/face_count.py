@@ -0,0 +1,86 @@
+from head_features import HeadFeatures, landmarks_to_array
+
+# --- MODE PENGHITUNG WAJAH ---
+# "every_frame": FaceDetection di setiap frame (perilaku lama, paling mahal)
+# "interval"   : FaceDetection tiap N frame, hasil terakhir dipakai di antaranya
+# "on_loss"    : FaceDetection hanya saat mesh kehilangan wajah / masih ada >1 wajah (+ tiap N frame)
+# "mesh"       : tanpa FaceDetection, jumlah wajah diambil dari FaceMesh max_num_faces=2
+FACE_COUNT_MODES = ("every_frame", "interval", "on_loss", "mesh")
+
+
+class FaceCountScheduler:
+    """Menentukan kapan model kedua (FaceDetection) perlu dijalankan untuk menghitung wajah."""
+
+    def __init__(self, mode="mesh", interval=15, detector=None):
+        if mode not in FACE_COUNT_MODES:
+            raise ValueError(f"Mode penghitung wajah tidak dikenal: {mode}")
+        if mode != "mesh" and detector is None:
+            raise ValueError(f"Mode '{mode}' butuh FaceDetection")
+        self.mode = mode
+        self.interval = interval
+        self.detector = detector
+        self.last_count = 0
+        self.frames = 0
+        self.detector_runs = 0
+        self._frame_sejak_deteksi = 0
+
+    @property
+    def mesh_max_faces(self):
+        """Jumlah wajah maksimum yang perlu diminta ke FaceMesh untuk mode ini."""
+        return 2 if self.mode == "mesh" else 1
+
+    def _perlu_detektor(self, mesh_results):
+        if self.mode == "every_frame":
+            return True
+        if self.interval and self._frame_sejak_deteksi >= self.interval:
+            return True
+        if self.mode == "on_loss":
+            return not mesh_results.multi_face_landmarks or self.last_count > 1
+        return False
+
+    def count(self, rgb_frame, mesh_results):
+        """Jumlah wajah di frame ini (bisa hasil deteksi terakhir jika detektor dilewati)."""
+        self.frames += 1
+        self._frame_sejak_deteksi += 1
+        if self.mode == "mesh":
+            self.last_count = len(mesh_results.multi_face_landmarks or [])
+        elif self._perlu_detektor(mesh_results):
+            detections = self.detector.process(rgb_frame).detections
+            self.last_count = len(detections) if detections else 0
+            self.detector_runs += 1
+            self._frame_sejak_deteksi = 0
+        return self.last_count
+
+    def ringkasan(self):
+        if self.mode == "mesh":
+            return f"Penghitung wajah (mesh): {self.frames} frame, FaceDetection tidak dipakai"
+        persen = 100 * self.detector_runs / max(self.frames, 1)
+        return (f"Penghitung wajah ({self.mode}): FaceDetection jalan {self.detector_runs}x "
+                f"dari {self.frames} frame ({persen:.0f}%)")
+
+
+def indeks_wajah_utama(multi_face_landmarks):
+    """Indeks wajah terbesar (paling dekat ke kamera) di `multi_face_landmarks`."""
+    if len(multi_face_landmarks) == 1:
+        return 0
+    semua = [landmarks_to_array(face_landmarks) for face_landmarks in multi_face_landmarks]
+    rentang = [lm[:, :2].max(axis=0) - lm[:, :2].min(axis=0) for lm in semua]
+    return max(range(len(semua)), key=lambda i: rentang[i][0] * rentang[i][1])
+
+
+def wajah_utama(multi_face_landmarks):
+    """
+    Pilih wajah terbesar (paling dekat ke kamera) sebagai peserta yang dilacak.
+    Dibutuhkan saat FaceMesh diminta mengembalikan lebih dari satu wajah.
+    """
+    return multi_face_landmarks[indeks_wajah_utama(multi_face_landmarks)]
+
+
+def fitur_wajah_utama(results, w, h):
+    """HeadFeatures wajah terbesar (beserta pose kepala jika engine memberikannya), atau None tanpa wajah."""
+    multi = results.multi_face_landmarks
+    if not multi:
+        return None
+    i = indeks_wajah_utama(multi)
+    poses = getattr(results, "head_poses", None)
+    return HeadFeatures(multi[i], w, h, poses[i] if poses else None)
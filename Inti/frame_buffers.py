@@ -0,0 +1,82 @@
+import threading
+
+import cv2
+import numpy as np
+
+# --- KONFIGURASI DEFAULT ---
+CADANGAN = 4  # set buffer yang dialokasikan di frame pertama (capture, slot, inferensi, render)
+
+
+class FrameSet:
+    """Satu set buffer untuk satu frame kamera: hasil baca kamera, BGR (sudah di-flip) dan RGB untuk inferensi."""
+
+    __slots__ = ("mentah", "bgr", "rgb")
+
+    def __init__(self, shape, flip=True):
+        self.mentah = np.empty(shape, dtype=np.uint8)
+        self.bgr = np.empty(shape, dtype=np.uint8) if flip else self.mentah
+        self.rgb = np.empty(shape, dtype=np.uint8)
+
+
+class FrameBuffers:
+    """
+    Kumpulan FrameSet yang dipakai ulang antar frame: kamera membaca langsung ke buffer, flip dan
+    konversi warna menulis ke buffer tujuan (parameter `dst=` OpenCV), jadi hot path tidak mengalokasikan
+    array frame baru. Set dikembalikan ke kumpulan setelah frame selesai ditampilkan atau dibuang.
+    Jika semua set sedang dipakai, set baru dibuat (dihitung di `dialokasi`) lalu ikut dipakai ulang.
+    Aman dipakai dari beberapa thread (capture mengambil, render/slot mengembalikan).
+    """
+
+    def __init__(self, flip=True, cadangan=CADANGAN):
+        self.flip = flip
+        self.cadangan = cadangan
+        self.shape = None
+        self.dialokasi = 0  # jumlah FrameSet yang pernah dibuat
+        self._bebas = []
+        self._kunci = threading.Lock()
+
+    def _ambil(self, shape):
+        with self._kunci:
+            if shape != self.shape:
+                # Resolusi kamera berubah (atau frame pertama): buang semua set lama
+                self.shape = shape
+                self._bebas = [FrameSet(shape, self.flip) for _ in range(self.cadangan)]
+                self.dialokasi += self.cadangan
+            if self._bebas:
+                return self._bebas.pop()
+            self.dialokasi += 1
+        return FrameSet(shape, self.flip)
+
+    def kembalikan(self, buf):
+        if buf is None:
+            return
+        with self._kunci:
+            if buf.mentah.shape == self.shape:
+                self._bebas.append(buf)
+
+    def baca(self, cap):
+        """Baca satu frame kamera ke set buffer (belum di-flip). None jika kamera habis."""
+        buf = self._ambil(self.shape) if self.shape is not None else None
+        ret, frame = cap.read(buf.mentah if buf is not None else None)
+        if not ret:
+            self.kembalikan(buf)
+            return None
+        if buf is None or frame is not buf.mentah:
+            # Frame pertama, resolusi berubah, atau backend kamera tidak memakai buffer yang diberikan
+            self.kembalikan(buf)
+            buf = self._ambil(frame.shape)
+            np.copyto(buf.mentah, frame)
+        return buf
+
+    def balik(self, buf):
+        """Flip horizontal (efek cermin) ke buffer BGR milik set; tanpa flip buffer BGR = hasil baca kamera."""
+        if self.flip:
+            cv2.flip(buf.mentah, 1, dst=buf.bgr)
+        return buf.bgr
+
+    def ke_rgb(self, buf):
+        """Konversi BGR -> RGB sekali per frame, ditulis ke buffer RGB milik set."""
+        return cv2.cvtColor(buf.bgr, cv2.COLOR_BGR2RGB, dst=buf.rgb)
+
+    def ringkasan(self):
+        return f"Buffer frame: {self.dialokasi} set dialokasikan, {len(self._bebas)} menganggur"
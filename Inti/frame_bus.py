@@ -0,0 +1,346 @@
+import argparse
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import cv2
+import numpy as np
+
+# --- KONFIGURASI DEFAULT ---
+NAMA_BUS = "headtrack_cam"
+JUMLAH_SLOT = 8        # frame yang tersimpan di ring; konsumen yang tertinggal lebih dari ini "terlewati" (lapped)
+POLL_DETIK = 0.0005    # jeda cek frame baru di sisi konsumen
+MAGIC = 0x48544642     # "HTFB"
+VERSI = 1
+UKURAN_HEADER = 4096
+
+# Header di awal shared memory, diikuti tabel slot lalu data frame
+_HEADER = np.dtype([("magic", "<u4"), ("versi", "<u4"), ("n_slot", "<u4"), ("h", "<u4"), ("w", "<u4"),
+                    ("c", "<u4"), ("selesai", "<u4"), ("_pad", "<u4"), ("seq", "<u8")])
+# Per slot: nomor urut x 2 (ganjil = sedang ditulis, seqlock) dan waktu capture (perf_counter)
+_SLOT = np.dtype([("versi", "<u8"), ("t", "<f8")])
+
+
+def _buka_shm(name):
+    """Lampirkan shared memory yang sudah ada tanpa didaftarkan ke resource tracker konsumen."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    # Python < 3.13: tracker akan meng-unlink segmen saat konsumen keluar, padahal milik daemon capture.
+    # unregister() setelahnya tidak cukup: proses anak (spawn) berbagi tracker dengan induknya.
+    daftar = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = daftar
+
+
+def _tutup_shm(shm):
+    try:
+        shm.close()
+    except BufferError:
+        pass  # masih ada view frame yang dipegang pemanggil; mapping dilepas saat view itu dibuang
+
+
+class _Tata:
+    """View NumPy (tanpa salin) ke header, tabel slot dan data frame di dalam satu buffer shared memory."""
+
+    def __init__(self, buf, n_slot, shape):
+        self.header = np.ndarray((), dtype=_HEADER, buffer=buf)
+        self.slot = np.ndarray((n_slot,), dtype=_SLOT, buffer=buf, offset=_HEADER.itemsize)
+        self.frames = np.ndarray((n_slot,) + shape, dtype=np.uint8, buffer=buf, offset=UKURAN_HEADER)
+
+    @staticmethod
+    def ukuran(n_slot, shape):
+        return UKURAN_HEADER + n_slot * int(np.prod(shape))
+
+
+class FrameBusWriter:
+    """
+    Sisi produsen: ring buffer frame di `multiprocessing.shared_memory`.
+    Setiap slot dilindungi seqlock: versi slot ganjil selama ditulis, lalu 2 x nomor urut frame.
+    Frame bisa ditulis langsung ke slot (`slot_berikut` + `terbitkan`, mis. cap.read/flip dengan dst=)
+    sehingga tidak ada salinan tambahan di daemon.
+    """
+
+    def __init__(self, shape, name=NAMA_BUS, n_slot=JUMLAH_SLOT):
+        if UKURAN_HEADER < _HEADER.itemsize + n_slot * _SLOT.itemsize:
+            raise ValueError(f"terlalu banyak slot untuk header ({n_slot})")
+        self.shape = tuple(shape)
+        self.n_slot = n_slot
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=_Tata.ukuran(n_slot, self.shape))
+        self.name = self.shm.name
+        self._tata = _Tata(self.shm.buf, n_slot, self.shape)
+        h, w, c = self.shape
+        self._tata.slot[:] = 0
+        self._tata.header[()] = (MAGIC, VERSI, n_slot, h, w, c, 0, 0, 0)
+        self.seq = 0
+
+    def slot_berikut(self):
+        """Tandai slot berikutnya sedang ditulis dan kembalikan view-nya (tulis frame langsung ke sini)."""
+        nomor = self.seq + 1
+        i = nomor % self.n_slot
+        self._tata.slot["versi"][i] = 2 * nomor + 1
+        return self._tata.frames[i]
+
+    def terbitkan(self, t_capture):
+        """Selesaikan slot dari `slot_berikut`: konsumen sekarang boleh membacanya."""
+        nomor = self.seq + 1
+        i = nomor % self.n_slot
+        self._tata.slot["t"][i] = t_capture
+        self._tata.slot["versi"][i] = 2 * nomor
+        self._tata.header["seq"] = nomor
+        self.seq = nomor
+        return nomor
+
+    def write(self, frame, t_capture=None):
+        np.copyto(self.slot_berikut(), frame)
+        return self.terbitkan(time.perf_counter() if t_capture is None else t_capture)
+
+    def close(self):
+        self._tata.header["selesai"] = 1  # konsumen berhenti setelah frame terakhir
+        self._tata = None
+        self.shm.unlink()
+        _tutup_shm(self.shm)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BusFrame:
+    """Satu frame dari bus: `image` adalah view ke slot shared memory (tanpa salin)."""
+
+    __slots__ = ("seq", "image", "t_capture")
+
+    def __init__(self, seq, image, t_capture):
+        self.seq = seq
+        self.image = image
+        self.t_capture = t_capture
+
+
+class FrameBusReader:
+    """
+    Sisi konsumen. `terbaru()` mengambil frame paling baru (frame di antaranya dihitung `dilewati`),
+    `berikut()` membaca berurutan (untuk perekam) dan melompat jika sudah tertinggal satu putaran ring.
+    View yang dikembalikan hanya aman selama produsen belum memutari ring; cek dengan `valid(frame)`
+    setelah selesai memakai data, atau salin dengan `read(image)` seperti cv2.VideoCapture.
+    """
+
+    def __init__(self, name=NAMA_BUS, timeout=5.0):
+        batas = time.perf_counter() + timeout
+        while True:
+            try:
+                self.shm = _buka_shm(name)
+                break
+            except FileNotFoundError:
+                if time.perf_counter() > batas:
+                    raise
+                time.sleep(0.05)  # daemon capture belum jalan
+        header = np.ndarray((), dtype=_HEADER, buffer=self.shm.buf)
+        while header["magic"] == 0 and time.perf_counter() < batas:
+            time.sleep(0.01)  # segmen baru dibuat, header belum diisi produsen
+        if header["magic"] != MAGIC or header["versi"] != VERSI:
+            raise ValueError(f"shared memory {name} bukan frame bus versi {VERSI}")
+        self.n_slot = int(header["n_slot"])
+        self.shape = (int(header["h"]), int(header["w"]), int(header["c"]))
+        self._tata = _Tata(self.shm.buf, self.n_slot, self.shape)
+        self.seq = 0         # nomor frame terakhir yang diambil
+        self.diambil = 0
+        self.dilewati = 0    # frame yang tidak pernah diambil konsumen ini (tertinggal)
+        self.tertimpa = 0    # frame yang berubah saat dibaca/dipakai (lapped), diulang atau dibuang
+
+    @property
+    def selesai(self):
+        return bool(self._tata.header["selesai"]) and self._tata.header["seq"] <= self.seq
+
+    def _tunggu(self, timeout):
+        batas = None if timeout is None else time.perf_counter() + timeout
+        while self._tata.header["seq"] <= self.seq:
+            if self._tata.header["selesai"] or (batas is not None and time.perf_counter() > batas):
+                return False
+            time.sleep(POLL_DETIK)
+        return True
+
+    def _ambil(self, nomor):
+        i = nomor % self.n_slot
+        if self._tata.slot["versi"][i] != 2 * nomor:
+            return None  # sudah ditimpa (atau sedang ditulis) frame yang lebih baru
+        frame = BusFrame(nomor, self._tata.frames[i], float(self._tata.slot["t"][i]))
+        self.dilewati += nomor - self.seq - 1
+        self.seq = nomor
+        self.diambil += 1
+        return frame
+
+    def terbaru(self, timeout=None):
+        """Frame terbaru yang belum diambil (None jika timeout atau produsen selesai)."""
+        while self._tunggu(timeout):
+            frame = self._ambil(int(self._tata.header["seq"]))
+            if frame is not None:
+                return frame
+            self.tertimpa += 1
+        return None
+
+    def berikut(self, timeout=None):
+        """Frame berikutnya secara berurutan; jika sudah tertinggal satu putaran ring, lompat ke tengah ring."""
+        while self._tunggu(timeout):
+            terakhir = int(self._tata.header["seq"])
+            nomor = self.seq + 1
+            if terakhir - nomor >= self.n_slot - 1:
+                # Slot tertua segera ditimpa; sisakan setengah ring agar sempat membaca tanpa dilewati lagi
+                nomor = terakhir - self.n_slot // 2 + 1
+            frame = self._ambil(nomor)
+            if frame is not None:
+                return frame
+            self.tertimpa += 1  # produsen memutari ring saat dicek: hitung ulang dari seq terbaru
+        return None
+
+    def valid(self, frame):
+        """True jika slot frame belum ditimpa sejak diambil (seqlock), jadi data yang baru dipakai konsisten."""
+        return self._tata.slot["versi"][frame.seq % self.n_slot] == 2 * frame.seq
+
+    def read(self, image=None, timeout=None):
+        """Seperti cv2.VideoCapture.read: salin frame terbaru ke `image` (atau array baru). (ret, image)."""
+        while True:
+            frame = self.terbaru(timeout)
+            if frame is None:
+                return False, None
+            if image is None or image.shape != self.shape:
+                image = np.empty(self.shape, dtype=np.uint8)
+            np.copyto(image, frame.image)
+            if self.valid(frame):
+                return True, image
+            self.tertimpa += 1  # slot ditimpa saat disalin: ambil frame yang lebih baru
+
+    def ringkasan(self):
+        return (f"Frame bus: {self.diambil} frame diambil, {self.dilewati} dilewati, "
+                f"{self.tertimpa} tertimpa saat dibaca")
+
+    def close(self):
+        self._tata = None
+        _tutup_shm(self.shm)
+
+
+class BusCapture:
+    """Pengganti cv2.VideoCapture untuk skrip yang ada: `cap = BusCapture(FRAME_BUS)` (daemon sudah melakukan flip)."""
+
+    def __init__(self, name=NAMA_BUS, timeout=5.0):
+        self.reader = FrameBusReader(name, timeout)
+        self.timeout = timeout
+        self._terbuka = True
+
+    def isOpened(self):
+        return self._terbuka and not self.reader.selesai
+
+    def read(self, image=None):
+        ret, image = self.reader.read(image, self.timeout)
+        if not ret:
+            self._terbuka = False
+        return ret, image
+
+    def release(self):
+        if self._terbuka:
+            self._terbuka = False
+            self.reader.close()
+
+
+def jalankan_daemon(source, name=NAMA_BUS, n_slot=JUMLAH_SLOT, flip=True, lebar=None, tinggi=None):
+    """Buka kamera sekali lalu terbitkan setiap frame ke bus sampai kamera habis / Ctrl+C."""
+    cap = cv2.VideoCapture(source)
+    if lebar and tinggi:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, lebar)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, tinggi)
+    ret, frame = cap.read()
+    if not ret:
+        raise RuntimeError(f"tidak bisa membaca kamera {source!r}")
+    bus = FrameBusWriter(frame.shape, name, n_slot)
+    print(f"Frame bus {bus.name}: {frame.shape[1]}x{frame.shape[0]}, {n_slot} slot, "
+          f"{bus.shm.size / 1e6:.1f} MB shared memory")
+    bus.write(cv2.flip(frame, 1) if flip else frame)
+    mentah = frame  # buffer baca kamera, dipakai ulang jika flip
+    mulai = t_lapor = time.perf_counter()
+    try:
+        while True:
+            slot = bus.slot_berikut()
+            if flip:
+                ret, mentah = cap.read(mentah)
+                t_capture = time.perf_counter()
+                if ret:
+                    cv2.flip(mentah, 1, dst=slot)
+            else:
+                # Tanpa flip kamera men-decode langsung ke slot shared memory
+                ret, hasil = cap.read(slot)
+                t_capture = time.perf_counter()
+                if ret and hasil is not slot:
+                    np.copyto(slot, hasil)  # backend tidak memakai buffer yang diberikan
+            if not ret:
+                break
+            bus.terbitkan(t_capture)
+            if t_capture - t_lapor >= 10:
+                t_lapor = t_capture
+                print(f"{bus.seq} frame, {bus.seq / (t_lapor - mulai):.1f} FPS")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cap.release()
+        bus.close()
+    print(f"Selesai: {bus.seq} frame diterbitkan")
+
+
+def rekam(name, path, fps=30.0):
+    """Konsumen perekam: tulis setiap frame bus (berurutan) ke file video langsung dari slot shared memory."""
+    reader = FrameBusReader(name)
+    h, w, _ = reader.shape
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (w, h))
+    try:
+        while (frame := reader.berikut(timeout=1.0)) is not None or not reader.selesai:
+            if frame is None:
+                continue
+            writer.write(frame.image)
+            if not reader.valid(frame):
+                reader.tertimpa += 1  # encoder terlalu lambat: frame ini mungkin sudah tercampur frame baru
+    except KeyboardInterrupt:
+        pass
+    finally:
+        writer.release()
+        print(reader.ringkasan())
+        reader.close()
+
+
+def tampilkan(name, window="Frame Bus"):
+    """Konsumen tampilan: frame terbaru saja, tanpa salin."""
+    reader = FrameBusReader(name)
+    while (frame := reader.terbaru(timeout=1.0)) is not None or not reader.selesai:
+        if frame is not None:
+            cv2.imshow(window, frame.image)
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            break
+    cv2.destroyAllWindows()
+    print(reader.ringkasan())
+    reader.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Daemon capture: satu kamera -> ring buffer shared memory untuk banyak proses konsumen")
+    parser.add_argument("--source", default="0", help="indeks kamera, file video atau URL stream")
+    parser.add_argument("--name", default=NAMA_BUS, help="nama shared memory (FRAME_BUS di skrip konsumen)")
+    parser.add_argument("--slots", type=int, default=JUMLAH_SLOT)
+    parser.add_argument("--no-flip", action="store_true", help="jangan mirror frame (konsumen flip sendiri)")
+    parser.add_argument("--resolution", help="minta resolusi kamera, mis. 1280x720")
+    parser.add_argument("--record", metavar="FILE", help="jalan sebagai konsumen: rekam bus ke file video (.avi)")
+    parser.add_argument("--view", action="store_true", help="jalan sebagai konsumen: tampilkan frame bus")
+    args = parser.parse_args()
+
+    if args.record:
+        rekam(args.name, args.record)
+        raise SystemExit
+    if args.view:
+        tampilkan(args.name)
+        raise SystemExit
+    lebar, tinggi = map(int, args.resolution.split("x")) if args.resolution else (None, None)
+    jalankan_daemon(int(args.source) if args.source.isdigit() else args.source, args.name, args.slots,
+                    not args.no_flip, lebar, tinggi)
@@ -0,0 +1,53 @@
+import time
+
+
+class FixedTimestep:
+    """
+    Akumulator waktu untuk simulasi dengan langkah tetap (fixed timestep).
+    Waktu nyata ditambahkan ke akumulator, lalu dipotong per `dt`; sisanya (alpha) dipakai
+    render untuk interpolasi di antara dua tick. Kecepatan game jadi tidak bergantung
+    pada FPS kamera maupun FPS render.
+    """
+
+    def __init__(self, hz=60, maks_langkah=5):
+        self.hz = hz
+        self.dt = 1.0 / hz
+        self.maks_langkah = maks_langkah  # batas tick per panggilan agar tidak terjebak mengejar (spiral of death)
+        self.reset()
+
+    def reset(self):
+        self._akumulator = 0.0
+        self._t_terakhir = None
+        self.tick = 0
+        self.dilewati = 0  # tick yang dibuang karena loop tertinggal terlalu jauh
+
+    def maju(self, now=None):
+        """Tambahkan waktu yang berlalu sejak panggilan terakhir; kembalikan jumlah tick yang harus dijalankan."""
+        now = time.perf_counter() if now is None else now
+        if self._t_terakhir is None:
+            self._t_terakhir = now
+            return 0
+        self._akumulator += now - self._t_terakhir
+        self._t_terakhir = now
+
+        n = int(self._akumulator / self.dt)
+        if n > self.maks_langkah:
+            self.dilewati += n - self.maks_langkah
+            n = self.maks_langkah
+            self._akumulator = 0.0
+        else:
+            self._akumulator -= n * self.dt
+        self.tick += n
+        return n
+
+    @property
+    def alpha(self):
+        """Posisi render di antara tick sebelumnya (0) dan tick terbaru (1)."""
+        return min(self._akumulator / self.dt, 1.0)
+
+    def sisa(self, now=None):
+        """Detik sampai tick berikutnya jatuh tempo."""
+        if self._t_terakhir is None:
+            return 0.0
+        now = time.perf_counter() if now is None else now
+        return max(0.0, self.dt - self._akumulator - (now - self._t_terakhir))
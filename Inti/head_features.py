@@ -0,0 +1,155 @@
+import itertools
+import math
+
+import numpy as np
+
+# --- INDEKS LANDMARK FACE MESH ---
+NOSE_TIP = 1
+LEFT_EYE = 33
+RIGHT_EYE = 263
+
+
+class LandmarkResult:
+    """Hasil landmark dalam bentuk array, meniru atribut `multi_face_landmarks` milik MediaPipe."""
+
+    def __init__(self, multi_face_landmarks=None, head_poses=None):
+        self.multi_face_landmarks = multi_face_landmarks or []
+        # (yaw, pitch, roll) derajat per wajah dari facial transformation matrix (engine Tasks), bisa kosong
+        self.head_poses = head_poses or []
+
+
+def pose_from_matrix(matrix):
+    """
+    (yaw, pitch, roll) dalam derajat dari facial transformation matrix 4x4 MediaPipe.
+    Sumbu model wajah kanonik: x ke kanan, y ke atas, z keluar dari wajah ke arah kamera, jadi
+    yaw > 0 = wajah menghadap ke kanan gambar (tanda sama dengan dx nose_offset), pitch > 0 = menengadah.
+    Tanda pitch berlawanan dengan dy nose_offset (y gambar bertambah ke bawah), karena itu pose_offset
+    mengembalikan (yaw, -pitch).
+    """
+    r = np.asarray(matrix, dtype=np.float64)[:3, :3]
+    r = r / np.linalg.norm(r, axis=0)  # buang skala model
+    depan = r[:, 2]  # arah hadap wajah di ruang kamera
+    yaw = math.degrees(math.atan2(depan[0], depan[2]))
+    pitch = math.degrees(math.asin(max(-1.0, min(1.0, depan[1]))))
+    roll = math.degrees(math.atan2(r[1, 0], r[0, 0]))
+    return yaw, pitch, roll
+
+
+# Satu NormalizedLandmark hasil serialisasi protobuf (17 byte):
+# [0x0A, 15] lalu [0x0D, x], [0x15, y], [0x1D, z] dengan x/y/z float32 little-endian
+_PROTO_REKAMAN = 17
+_PROTO_TAG = ((0, 0x0A), (1, 15), (2, 0x0D), (7, 0x15), (12, 0x1D))
+
+
+def _parse_proto(face_landmarks, n):
+    """Baca semua landmark langsung dari byte protobuf (tanpa loop Python). None jika format beda."""
+    serialize = getattr(face_landmarks, "SerializeToString", None)
+    if serialize is None:
+        return None
+    data = serialize()
+    if len(data) != n * _PROTO_REKAMAN:
+        return None  # ada field lain (visibility/presence), pakai jalur biasa
+    for posisi, tag in _PROTO_TAG:
+        if data[posisi::_PROTO_REKAMAN] != bytes((tag,)) * n:
+            return None
+    # x, y, z berjarak 5 byte di tiap rekaman: baca sebagai view bertingkat lalu salin sekali
+    return np.ndarray((n, 3), dtype="<f4", buffer=data, offset=3, strides=(_PROTO_REKAMAN, 5)).copy()
+
+
+def landmarks_to_array(face_landmarks):
+    """Ubah landmark satu wajah (protobuf MediaPipe atau array) menjadi array (N, 3) ternormalisasi."""
+    if isinstance(face_landmarks, np.ndarray):
+        return face_landmarks
+    titik = face_landmarks.landmark
+    hasil = _parse_proto(face_landmarks, len(titik))
+    if hasil is not None:
+        return hasil
+    data = np.fromiter(itertools.chain.from_iterable((p.x, p.y, p.z) for p in titik),
+                       dtype=np.float32, count=3 * len(titik))
+    return data.reshape(-1, 3)
+
+
+class HeadFeatures:
+    """
+    Fitur kepala dari satu wajah, dihitung sekali per frame.
+    Koordinat piksel dibulatkan ke bawah seperti int(p.x * w) di loop aslinya.
+    """
+
+    __slots__ = ("landmarks", "x_n", "y_n", "x_eye_center", "y_min", "y_max", "y_face_center", "pose")
+
+    def __init__(self, face_landmarks, w, h, pose=None):
+        self.pose = pose  # (yaw, pitch, roll) derajat jika engine memberikannya, selain itu None
+        self.landmarks = lm = landmarks_to_array(face_landmarks)
+        # int() memotong ke arah nol dan monoton, jadi min/max bisa diambil sebelum dikali h
+        ys = lm[:, 1]
+        self.x_n, self.y_n = int(float(lm[NOSE_TIP, 0]) * w), int(float(lm[NOSE_TIP, 1]) * h)
+        self.x_eye_center = (int(float(lm[LEFT_EYE, 0]) * w) + int(float(lm[RIGHT_EYE, 0]) * w)) // 2
+        self.y_min, self.y_max = int(float(ys.min()) * h), int(float(ys.max()) * h)
+        self.y_face_center = (self.y_min + self.y_max) // 2
+
+    @classmethod
+    def from_values(cls, x_n, y_n, x_eye_center, y_min, y_max, landmarks=None):
+        """Buat fitur dari nilai piksel yang sudah dihitung (mis. hasil batch_features)."""
+        fitur = cls.__new__(cls)
+        fitur.landmarks = landmarks
+        fitur.pose = None
+        fitur.x_n, fitur.y_n = int(x_n), int(y_n)
+        fitur.x_eye_center = int(x_eye_center)
+        fitur.y_min, fitur.y_max = int(y_min), int(y_max)
+        fitur.y_face_center = (fitur.y_min + fitur.y_max) // 2
+        return fitur
+
+    @property
+    def nose_offset(self):
+        """(dx, dy): hidung relatif ke tengah mata (horizontal) dan tengah wajah (vertikal)."""
+        return self.x_n - self.x_eye_center, self.y_n - self.y_face_center
+
+    @property
+    def pose_offset(self):
+        """(yaw, -pitch) dalam derajat dengan arah tanda seperti nose_offset; None jika tidak ada pose."""
+        if self.pose is None:
+            return None
+        return self.pose[0], -self.pose[1]
+
+
+def batch_features(landmarks, w, h):
+    """
+    Versi HeadFeatures untuk banyak frame sekaligus: landmarks (T, N, 3), w/h skalar atau (T,).
+    Mengembalikan dict array int64: x_n, y_n, x_eye_center, y_min, y_max (hasil sama dengan HeadFeatures).
+    """
+    w = np.asarray(w, dtype=np.float64)
+    h = np.asarray(h, dtype=np.float64)
+
+    def piksel(nilai, skala):
+        return (nilai.astype(np.float64) * skala).astype(np.int64)
+
+    return {
+        "x_n": piksel(landmarks[:, NOSE_TIP, 0], w),
+        "y_n": piksel(landmarks[:, NOSE_TIP, 1], h),
+        "x_eye_center": (piksel(landmarks[:, LEFT_EYE, 0], w) + piksel(landmarks[:, RIGHT_EYE, 0], w)) // 2,
+        "y_min": piksel(landmarks[:, :, 1].min(axis=1), h),
+        "y_max": piksel(landmarks[:, :, 1].max(axis=1), h),
+    }
+
+
+_ARAH_INDEKS = np.array([0, 0, 1, 1])
+_ARAH_TANDA = np.array([1.0, -1.0, -1.0, 1.0])
+
+
+def direction_percents(dx, dy, scale_x, scale_y, max_percent=100):
+    """
+    Hitung persentase [kanan, kiri, atas, bawah] sekaligus.
+    dx/dy boleh skalar atau array 1-D (mis. satu nilai per wajah); hasil berbentuk (4,) atau (F, 4).
+    """
+    q = np.array((dx, dy), dtype=np.float64).T / (scale_x, scale_y) * 100
+    persen = (q[..., _ARAH_INDEKS] * _ARAH_TANDA).astype(np.int64)
+    np.maximum(persen, 0, out=persen)
+    if max_percent is not None:
+        np.minimum(persen, max_percent, out=persen)
+    return persen
+
+
+def apply_deadzone(values, threshold):
+    """Nilai di bawah/sama dengan threshold dianggap 0."""
+    values = np.asarray(values)
+    return np.where(values > threshold, values, 0)
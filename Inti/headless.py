@@ -0,0 +1,309 @@
+import argparse
+import json
+import queue
+import signal
+import sys
+import threading
+import time
+
+import cv2
+import mediapipe as mp
+
+from calibration import ProfileStore, kunci_profil
+from event_store import EventStore
+from event_stream import EventServer, JsonlStream, encode_event
+from face_count import FaceCountScheduler, fitur_wajah_utama
+from frame_bus import BusCapture
+from motion_gate import MotionGate
+from pipeline import TrackingPipeline
+from proctoring import ProctorConfig, ProctorSession
+from roi_tracker import RoiFaceMesh, buat_model_cari
+from tasks_engine import TasksFaceLandmarker, TasksPipeline
+from tracking import HeadTracker
+from wire_protocol import DeltaEncoder
+
+# --- KONFIGURASI DEFAULT ---
+# Sama dengan main.py (mode "tracking") dan branch.py (mode "proctor")
+SMOOTHING_FRAMES = 7
+SMOOTHING_FILTER = "moving_average"
+DEADZONE_TRACKING = 4
+DEADZONE_PROCTOR = 5
+ROI_SIZE = 256
+STATS_INTERVAL = 10.0   # detik antar event "stats" (0 = hanya jika diminta)
+POLL_TIMEOUT = 0.1      # detik menunggu frame sebelum memeriksa perintah lagi
+PERINTAH = ("calibrate", "reset", "stats", "quit")
+
+
+def baca_perintah(teks):
+    """Teks perintah ("calibrate") atau JSON ({"cmd": "calibrate"}) -> nama perintah, None jika tidak dikenal."""
+    teks = teks.strip()
+    if teks.startswith("{"):
+        try:
+            teks = str(json.loads(teks).get("cmd", ""))
+        except (ValueError, AttributeError):
+            return None
+    teks = teks.lower()
+    return teks if teks in PERINTAH else None
+
+
+class HeadlessTracker:
+    """
+    Logika tracking (HeadTracker, mode "tracking") atau pengawasan (ProctorSession, mode "proctor") tanpa jendela
+    dan tanpa cv2.waitKey. Setiap hasil diterbitkan sebagai event terstruktur ke semua `keluaran`
+    (JsonlStream/EventServer). Perintah (kalibrasi, reset, ...) dari sinyal atau socket masuk lewat
+    `perintah()` yang aman dipanggil dari thread mana pun dan dijalankan di thread loop di antara frame.
+    """
+
+    def __init__(self, mode, keluaran, session_id="lokal", pose_mode="every_frame", auto_calibrate=True,
+                 event_store=None, stats_interval=STATS_INTERVAL, profiles=None, user=None):
+        if mode not in ("tracking", "proctor"):
+            raise ValueError(f"mode headless tidak dikenal: {mode!r}")
+        self.mode = mode
+        self.keluaran = keluaran
+        self.session_id = session_id
+        self.event_store = event_store
+        self.stats_interval = stats_interval
+        self.auto_calibrate = auto_calibrate
+        # Profil kalibrasi tersimpan (ProfileStore): dipakai setelah cek drift singkat, disimpan setelah kalibrasi penuh
+        self.profiles = profiles
+        self.kunci_profil = kunci_profil(user or session_id)
+        self._profil_disimpan = False
+        deadzone = DEADZONE_TRACKING if mode == "tracking" else DEADZONE_PROCTOR
+        # DeltaEncoder hanya dipakai untuk memutuskan kapan pose dikirim (mode "delta" = hanya jika berubah)
+        self.encoder = DeltaEncoder(pose_mode, deadzone, binary=False)
+        self.tracker = HeadTracker(SMOOTHING_FRAMES, SMOOTHING_FILTER, DEADZONE_TRACKING, profile=self._profil())
+        self.sesi = self._sesi_baru()
+        self._perintah = queue.SimpleQueue()
+        self.status = None
+        self.multi_wajah = False
+        self.frames = 0
+        self.events = 0
+        self.berhenti = False
+        self._t_mulai = time.perf_counter()
+        self._t_stats = self._t_mulai
+
+    def _profil(self):
+        self._profil_disimpan = False
+        return self.profiles.load(self.kunci_profil) if self.profiles is not None else None
+
+    def _simpan_profil(self, profil, now):
+        if self.profiles is None or profil is None or self._profil_disimpan:
+            return
+        self.profiles.save(self.kunci_profil, profil)
+        self._profil_disimpan = True
+        self.terbitkan(self._event("profile_saved", now, key=self.kunci_profil))
+
+    def _sesi_baru(self):
+        config = ProctorConfig(smoothing_frames=SMOOTHING_FRAMES, smoothing_filter=SMOOTHING_FILTER)
+        return ProctorSession(self.session_id, config)
+
+    # --- KELUARAN ---
+    def terbitkan(self, event):
+        baris = encode_event(event)  # di-encode sekali untuk semua keluaran
+        for k in self.keluaran:
+            k.publish(event, baris)
+        self.events += 1
+        if self.event_store is not None and event["type"] != "pose":
+            self.event_store.record(event)
+
+    def _event(self, jenis, now, **data):
+        event = {"session": self.session_id, "t": now, "type": jenis}
+        event.update(data)
+        return event
+
+    # --- PERINTAH ---
+    def perintah(self, teks, sumber="api"):
+        """Antrekan perintah dari thread lain (socket, sinyal, stdin)."""
+        nama = baca_perintah(teks)
+        if nama is None:
+            self.terbitkan(self._event("error", time.time(), message=f"perintah tidak dikenal: {teks[:80]}",
+                                       source=sumber))
+            return False
+        self._perintah.put((nama, sumber))
+        return True
+
+    def jalankan_perintah(self, sumber_frame, now):
+        while True:
+            try:
+                nama, sumber = self._perintah.get_nowait()
+            except queue.Empty:
+                return
+            self.terbitkan(self._event("command", now, command=nama, source=sumber))
+            if nama == "calibrate":
+                # Kalibrasi eksplisit selalu penuh (tanpa profil), hasilnya menggantikan profil tersimpan
+                self._profil_disimpan = False
+                if self.mode == "proctor":
+                    self.terbitkan(self.sesi.start_calibration(now))
+                else:
+                    self.tracker.reset()
+            elif nama == "reset":
+                # Proctor: sesi baru (riwayat pelanggaran dikosongkan), lalu kalibrasi ulang dari profil jika ada
+                profil = self._profil()
+                self.tracker.reset(profil)
+                self.sesi = self._sesi_baru()
+                if self.mode == "proctor" and self.auto_calibrate:
+                    self.terbitkan(self.sesi.start_calibration(now, profil))
+            elif nama == "stats":
+                self.terbitkan(self.stats(sumber_frame, now))
+            elif nama == "quit":
+                self.berhenti = True
+
+    # --- PER FRAME ---
+    def frame(self, paket, now):
+        """Proses satu FramePacket (results = hasil mesh atau (hasil mesh, jumlah wajah) di mode proctor)."""
+        h, w = paket.frame.shape[:2]
+        if self.mode == "proctor":
+            results, jumlah_wajah = paket.results
+        else:
+            results, jumlah_wajah = paket.results, None
+        fitur = fitur_wajah_utama(results, w, h)
+        self.frames += 1
+
+        if self.mode == "tracking":
+            status = self.tracker.update(fitur, w, h, now)
+            percents, aktif = self.tracker.percents, status == HeadTracker.TRACKING
+            if aktif and self.tracker.profile_used is None:
+                self._simpan_profil(self.tracker.calibration_profile(w, h), now)
+            extra = {}
+        else:
+            if self.frames == 1 and self.auto_calibrate:
+                self.terbitkan(self.sesi.start_calibration(now, self._profil()))
+            multi = jumlah_wajah > 1
+            if multi and not self.multi_wajah:
+                self.terbitkan(self._event("multiple_faces", now, count=jumlah_wajah))
+            self.multi_wajah = multi
+            for event in self.sesi.update(fitur, w, h, now):
+                self.terbitkan(event)
+                if event["type"] == "calibrated" and event["source"] == "calibration":
+                    self._simpan_profil(self.sesi.calibration_profile(w, h), now)
+            status = ("calibrating" if self.sesi.is_calibrating else "no_face" if fitur is None
+                      else "monitoring" if self.sesi.is_calibrated else "uncalibrated")
+            percents, aktif = self.sesi.percents, fitur is not None and self.sesi.is_calibrated
+            extra = {"warning": self.sesi.warning, "violations_in_window": self.sesi.violations_in_window,
+                     "faces": jumlah_wajah}
+
+        if status != self.status:
+            self.terbitkan(self._event("status", now, status=status))
+            self.status = status
+        if aktif and self.encoder.update(percents, now) is not None:
+            kanan, kiri, atas, bawah = percents
+            self.terbitkan(self._event("pose", now, seq=paket.seq, kanan=kanan, kiri=kiri, atas=atas, bawah=bawah,
+                                       latency_ms=round((time.perf_counter() - paket.t_capture) * 1000, 1),
+                                       **extra))
+
+    def stats(self, sumber, now):
+        durasi = time.perf_counter() - self._t_mulai
+        lat = list(sumber.latency.history)
+        lat.sort()
+        return self._event("stats", now, frames=self.frames, fps=round(self.frames / max(durasi, 1e-9), 1),
+                           dropped=sumber.dropped_frames, events=self.events,
+                           latency_p50_ms=round(lat[len(lat) // 2], 1) if lat else None,
+                           latency_p95_ms=round(lat[int(len(lat) * 0.95)], 1) if lat else None,
+                           violations_total=self.sesi.violations_total if self.mode == "proctor" else None)
+
+    def jalan(self, sumber):
+        """Loop utama: tunggu frame tanpa jendela, jalankan perintah di antara frame, terbitkan hasil."""
+        paket = sumber.poll(timeout=5.0)
+        while not self.berhenti and (paket is not None or sumber.aktif):
+            now = time.time()
+            self.jalankan_perintah(sumber, now)
+            if paket is not None:
+                self.frame(paket, now)
+                sumber.selesai(paket)
+            if self.stats_interval and time.perf_counter() - self._t_stats >= self.stats_interval:
+                self._t_stats = time.perf_counter()
+                self.terbitkan(self.stats(sumber, now))
+            paket = sumber.poll(timeout=POLL_TIMEOUT)
+        self.terbitkan(self.stats(sumber, time.time()))
+
+
+def pasang_sinyal(tracker):
+    """SIGUSR1 = kalibrasi, SIGUSR2 = reset, SIGINT/SIGTERM = berhenti (SIGUSR* tidak ada di Windows)."""
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda *_: tracker.perintah("calibrate", "SIGUSR1"))
+        signal.signal(signal.SIGUSR2, lambda *_: tracker.perintah("reset", "SIGUSR2"))
+    signal.signal(signal.SIGINT, lambda *_: tracker.perintah("quit", "SIGINT"))
+    signal.signal(signal.SIGTERM, lambda *_: tracker.perintah("quit", "SIGTERM"))
+
+
+def baca_stdin(tracker):
+    for baris in sys.stdin:
+        if baris.strip():
+            tracker.perintah(baris, "stdin")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Tracking/pengawasan tanpa jendela: hasil distream sebagai event JSON Lines (stdout/TCP)")
+    parser.add_argument("--mode", choices=("tracking", "proctor"), default="tracking")
+    parser.add_argument("--source", default="0", help="indeks kamera, file video atau URL stream")
+    parser.add_argument("--bus", metavar="NAMA", help="ambil frame dari daemon frame_bus.py, bukan membuka kamera")
+    parser.add_argument("--session", default="lokal", help="session_id di setiap event")
+    parser.add_argument("--engine", choices=("face_mesh", "tasks"), default="face_mesh")
+    parser.add_argument("--roi", action="store_true", help="inferensi di crop sekitar wajah (engine face_mesh)")
+    parser.add_argument("--motion-gate", action="store_true", help="lewati inferensi saat gambar diam")
+    parser.add_argument("--listen", help="HOST:PORT server TCP untuk stream event & perintah, mis. 127.0.0.1:8765")
+    parser.add_argument("--stdout", action="store_true", help="tulis event ke stdout (default jika tanpa --listen)")
+    parser.add_argument("--stdin", action="store_true", help="baca perintah dari stdin, satu per baris")
+    parser.add_argument("--pose", choices=("every_frame", "delta"), default="every_frame",
+                        help="kirim pose setiap frame atau hanya jika berubah melebihi deadzone")
+    parser.add_argument("--no-auto-calibrate", action="store_true", help="mode proctor: tunggu perintah calibrate")
+    parser.add_argument("--stats-interval", type=float, default=STATS_INTERVAL)
+    parser.add_argument("--db", help="simpan event (selain pose) ke SQLite, lihat event_store.py")
+    parser.add_argument("--profiles", metavar="FILE", help="profil kalibrasi JSON: dipakai ulang saat start/reset")
+    parser.add_argument("--user", help="kunci profil kalibrasi (default: --session), digabung dengan hostname")
+    args = parser.parse_args()
+
+    keluaran = []
+    if args.stdout or not args.listen:
+        keluaran.append(JsonlStream(sys.stdout.buffer))
+    tracker = HeadlessTracker(args.mode, keluaran, args.session, args.pose, not args.no_auto_calibrate,
+                              EventStore(args.db) if args.db else None, args.stats_interval,
+                              ProfileStore(args.profiles) if args.profiles else None, args.user)
+    if args.listen:
+        host, port = args.listen.rsplit(":", 1)
+        server = EventServer(host, int(port), tracker.perintah)
+        keluaran.append(server)
+        print(f"Stream event di tcp://{server.alamat[0]}:{server.alamat[1]}", file=sys.stderr)
+    pasang_sinyal(tracker)
+    if args.stdin:
+        threading.Thread(target=baca_stdin, args=(tracker,), name="stdin", daemon=True).start()
+
+    if args.bus:
+        cap = BusCapture(args.bus)  # frame dari bus sudah di-flip oleh daemon
+    else:
+        cap = cv2.VideoCapture(int(args.source) if args.source.isdigit() else args.source)
+    flip = not args.bus
+    penghitung = FaceCountScheduler("mesh") if args.mode == "proctor" else None
+    max_wajah = penghitung.mesh_max_faces if penghitung is not None else 1
+
+    if args.engine == "tasks":
+        model = TasksFaceLandmarker(num_faces=max_wajah)
+        post = (lambda rgb, hasil: (hasil, penghitung.count(rgb, hasil))) if penghitung is not None else None
+        sumber = TasksPipeline(cap, model, flip, post=post)
+    else:
+        model = mp.solutions.face_mesh.FaceMesh(max_num_faces=max_wajah, refine_landmarks=True,
+                                                min_detection_confidence=0.5, min_tracking_confidence=0.5)
+        proses = model.process
+        if args.roi:
+            proses = RoiFaceMesh(model.process, ROI_SIZE, search_process=buat_model_cari(max_wajah).process).process
+        proses = MotionGate(proses).process if args.motion_gate else proses
+        if penghitung is not None:
+            proses_mesh = proses
+
+            def proses(rgb):
+                hasil = proses_mesh(rgb)
+                return hasil, penghitung.count(rgb, hasil)
+        sumber = TrackingPipeline(cap, proses, flip)
+
+    tracker.jalan(sumber)
+    sumber.stop()
+    model.close()
+    cap.release()
+    for k in keluaran:
+        k.close()
+    if tracker.event_store is not None:
+        tracker.event_store.close()
+    print(sumber.latency.ringkasan(), file=sys.stderr)
+    for k in keluaran:
+        print(k.ringkasan(), file=sys.stderr)
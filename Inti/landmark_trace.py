@@ -0,0 +1,151 @@
+import struct
+
+import numpy as np
+
+from head_features import LandmarkResult, landmarks_to_array
+
+# --- FORMAT FILE ---
+# Header 64 byte, lalu record berukuran tetap per frame (bisa langsung di-memmap):
+#   t (f8, detik), w/h (u2), jumlah wajah (u1), penanda (u1), landmark (max_faces, n_landmarks, n_dims)
+# Landmark default disimpan sebagai int16 terkuantisasi (1/16384 koordinat ternormalisasi,
+# < 0.05 piksel di 640 px) tanpa z, sekitar 1.9 KB per frame untuk 1 wajah 478 titik.
+MAGIC = b"HTRACE1\0"
+VERSI = 1
+UKURAN_HEADER = 64
+_HEADER = struct.Struct("<8sHHHH2sd")
+
+SKALA_I2 = 1.0 / 16384
+DTYPE_LANDMARK = {"i2": "<i2", "f2": "<f2", "f4": "<f4"}
+
+# Bit penanda per frame
+PENANDA_KALIBRASI = 1  # kalibrasi dimulai/di-reset di frame ini (tombol 'c' / 'r')
+
+
+def dtype_record(n_landmarks, max_faces, n_dims, kode):
+    return np.dtype([
+        ("t", "<f8"),
+        ("w", "<u2"),
+        ("h", "<u2"),
+        ("n_faces", "u1"),
+        ("flags", "u1"),
+        ("landmarks", DTYPE_LANDMARK[kode], (max_faces, n_landmarks, n_dims)),
+    ])
+
+
+class TraceWriter:
+    """
+    Rekam landmark + timestamp per frame ke file trace.
+    Record ditampung di buffer dan ditulis per blok agar tidak membebani loop kamera.
+    """
+
+    def __init__(self, path, n_landmarks=478, max_faces=1, simpan_z=False, kode="i2", buffer_frames=256):
+        self.n_landmarks = n_landmarks
+        self.max_faces = max_faces
+        self.n_dims = 3 if simpan_z else 2
+        self.kode = kode
+        self.skala = SKALA_I2 if kode == "i2" else 1.0
+        self.dtype = dtype_record(n_landmarks, max_faces, self.n_dims, kode)
+        self._buffer = np.zeros(buffer_frames, dtype=self.dtype)
+        self._isi = 0
+        self.frames = 0
+
+        self._file = open(path, "wb")
+        header = _HEADER.pack(MAGIC, VERSI, n_landmarks, max_faces, self.n_dims, kode.encode(), self.skala)
+        self._file.write(header.ljust(UKURAN_HEADER, b"\0"))
+
+    def _ke_penyimpanan(self, lm):
+        """Potong/pad ke n_landmarks titik. Padding mengulang titik terakhir agar min/max wajah tidak berubah."""
+        lm = lm[:self.n_landmarks, :self.n_dims]
+        if len(lm) < self.n_landmarks:
+            lm = np.concatenate([lm, np.repeat(lm[-1:], self.n_landmarks - len(lm), axis=0)])
+        if self.kode == "i2":
+            return np.clip(np.rint(lm / self.skala), -32767, 32767)
+        return lm
+
+    def write(self, t, w, h, multi_face_landmarks, flags=0):
+        rec = self._buffer[self._isi]
+        rec["t"], rec["w"], rec["h"], rec["flags"] = t, w, h, flags
+        wajah = list(multi_face_landmarks or [])[:self.max_faces]
+        rec["n_faces"] = len(wajah)
+        for i, face_landmarks in enumerate(wajah):
+            rec["landmarks"][i] = self._ke_penyimpanan(landmarks_to_array(face_landmarks))
+
+        self._isi += 1
+        self.frames += 1
+        if self._isi == len(self._buffer):
+            self.flush()
+
+    def flush(self):
+        if self._isi:
+            self._file.write(self._buffer[:self._isi].tobytes())
+            self._buffer[:self._isi] = 0
+            self._isi = 0
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TraceReader:
+    """
+    Buka file trace sebagai memmap (tanpa membaca seluruh file ke memori).
+    Record terakhir yang terpotong (mis. program berhenti paksa) diabaikan.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, versi, n_landmarks, max_faces, n_dims, kode, skala = _HEADER.unpack(
+                f.read(UKURAN_HEADER)[:_HEADER.size])
+        if magic != MAGIC:
+            raise ValueError(f"{path} bukan file trace landmark")
+        if versi != VERSI:
+            raise ValueError(f"versi trace {versi} tidak didukung")
+
+        self.path = path
+        self.n_landmarks, self.max_faces, self.n_dims = n_landmarks, max_faces, n_dims
+        self.kode = kode.decode()
+        self.skala = skala
+        self.dtype = dtype_record(n_landmarks, max_faces, n_dims, self.kode)
+
+        with open(path, "rb") as f:
+            f.seek(0, 2)
+            jumlah = (f.tell() - UKURAN_HEADER) // self.dtype.itemsize
+        if jumlah > 0:
+            self.records = np.memmap(path, dtype=self.dtype, mode="r", offset=UKURAN_HEADER, shape=(jumlah,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def t(self):
+        return self.records["t"]
+
+    @property
+    def durasi(self):
+        return float(self.t[-1] - self.t[0]) if len(self) else 0.0
+
+    def landmarks(self, awal=0, akhir=None, wajah=0):
+        """Landmark satu wajah untuk frame [awal, akhir) sebagai float32 (T, n_landmarks, 3), z = 0 jika tidak disimpan."""
+        mentah = self.records["landmarks"][awal:akhir, wajah]
+        hasil = np.zeros(mentah.shape[:2] + (3,), dtype=np.float32)
+        hasil[..., :self.n_dims] = mentah
+        if self.kode == "i2":
+            hasil *= np.float32(self.skala)
+        return hasil
+
+    def __iter__(self):
+        """Hasilkan (t, w, h, LandmarkResult) per frame, seperti keluaran FaceMesh.process."""
+        for i, rec in enumerate(self.records):
+            n_faces = int(rec["n_faces"])
+            wajah = [self.landmarks(i, i + 1, j)[0] for j in range(n_faces)]
+            yield float(rec["t"]), int(rec["w"]), int(rec["h"]), LandmarkResult(wajah or None)
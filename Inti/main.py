@@ -1,134 +1,171 @@
 import cv2
 import mediapipe as mp
 import time
-from collections import deque
-import numpy as np
+from pipeline import buat_sumber
+from face_count import fitur_wajah_utama
+from tracking import HeadTracker
+from roi_tracker import RoiFaceMesh, buat_model_cari
+from tasks_engine import TasksFaceLandmarker, TasksPipeline
+from adaptive_quality import AdaptiveFaceMesh
+from motion_gate import MotionGate
+from frame_bus import BusCapture
+from landmark_trace import PENANDA_KALIBRASI, TraceWriter
+from wire_protocol import PosePublisher
+from calibration import ProfileStore, kunci_profil
 
 # --- KONFIGURASI ---
 # Untuk Smoothing: menyimpan N frame terakhir. Makin besar, makin mulus tapi ada sedikit delay.
 SMOOTHING_FRAMES = 7
+# Jenis filter: "moving_average" (rata-rata N frame), "one_euro" atau "kalman" (lag lebih kecil).
+SMOOTHING_FILTER = "moving_average"
 # Untuk Deadzone: gerakan di bawah threshold ini akan dianggap 0.
 DEADZONE_THRESHOLD = 4  # artinya 4%
+# Engine inferensi: "face_mesh" (mp.solutions, sinkron) atau "tasks" (FaceLandmarker .task, LIVE_STREAM async).
+ENGINE = "face_mesh"
+# Khusus "tasks": pakai sudut yaw/pitch dari facial transformation matrix, bukan selisih piksel hidung.
+USE_POSE_ANGLES = False
+# Khusus "face_mesh": turunkan resolusi inferensi / iris / stride otomatis agar tetap di TARGET_FPS.
+ADAPTIVE_QUALITY = False
+TARGET_FPS = 30
+# Untuk Pipeline: capture, inferensi & render di thread terpisah, frame basi dibuang.
+PIPELINE_MODE = True
+# Untuk ROI: inferensi di crop sekitar wajah (ROI_SIZE x ROI_SIZE), cari ulang di frame penuh jika hilang.
+ROI_MODE = False
+ROI_SIZE = 256
+# Untuk Motion gate: lewati inferensi jika area wajah & frame nyaris tidak berubah (hemat CPU/baterai),
+# landmark terakhir dipakai ulang. Selisih di bawah MOTION_THRESHOLD (0..255) dianggap diam.
+MOTION_GATE = False
+MOTION_THRESHOLD = 2.5
+# Untuk Kamera bersama: baca frame dari daemon `python frame_bus.py` (nama shared memory), None = buka kamera sendiri.
+FRAME_BUS = None            # mis. "headtrack_cam"
+# Untuk Profil kalibrasi: simpan posisi netral per pengguna/komputer ke file JSON. Saat start berikutnya posisi
+# hanya dicek sebentar; jika tidak bergeser, kotak kalibrasi & jeda siap dilewati. None = selalu kalibrasi.
+PROFILE_STORE = None        # mis. "calibration_profiles.json"
+PROFILE_USER = "default"
+# Untuk Rekaman: simpan landmark per frame ke file trace (mis. "sesi.htrace") untuk di-replay, None = mati.
+RECORD_TRACE = None
+# Untuk Publish: kirim persentase gerakan langsung ke ESP32 / bridge_server.py, None = mati.
+PUBLISH_URL = None          # mis. "ws://192.168.4.1:81"
+PUBLISH_BINARY = True       # True = pesan biner 11 byte, False = JSON seperti aplikasi Flutter
+PUBLISH_MODE = "delta"      # "delta" = kirim hanya jika berubah > deadzone, "every_frame" = tiap frame
 
 mp_face_mesh = mp_face_mesh = mp.solutions.face_mesh
-cap = cv2.VideoCapture(0)
-
-# --- Variabel untuk State Kalibrasi ---
-kalibrasi_selesai = False
-waktu_kalibrasi_selesai = 0
-
-# --- Deque untuk menyimpan data N frame terakhir (untuk smoothing) ---
-# deque adalah list spesial yang efisien untuk menambah/menghapus data dari ujung
-percent_right_hist = deque(maxlen=SMOOTHING_FRAMES)
-percent_left_hist = deque(maxlen=SMOOTHING_FRAMES)
-percent_up_hist = deque(maxlen=SMOOTHING_FRAMES)
-percent_down_hist = deque(maxlen=SMOOTHING_FRAMES)
-
-
-with mp_face_mesh.FaceMesh(
-    max_num_faces=1,
-    refine_landmarks=True,
-    min_detection_confidence=0.5,
-    min_tracking_confidence=0.5
-) as face_mesh:
-
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        frame = cv2.flip(frame, 1)
-        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = face_mesh.process(image)
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+cap = BusCapture(FRAME_BUS) if FRAME_BUS else cv2.VideoCapture(0)
+
+# --- State kalibrasi & smoothing 4 channel sekaligus: [kanan, kiri, atas, bawah] ---
+profil_store = ProfileStore(PROFILE_STORE) if PROFILE_STORE else None
+kunci = kunci_profil(PROFILE_USER)
+tracker = HeadTracker(SMOOTHING_FRAMES, SMOOTHING_FILTER, DEADZONE_THRESHOLD, use_pose=USE_POSE_ANGLES,
+                      profile=profil_store.load(kunci) if profil_store is not None else None)
+profil_disimpan = False
+perekam = TraceWriter(RECORD_TRACE) if RECORD_TRACE else None
+publisher = None
+if PUBLISH_URL:
+    publisher = PosePublisher(PUBLISH_URL, PUBLISH_MODE, PUBLISH_BINARY, DEADZONE_THRESHOLD)
+penanda = 0  # bit penanda untuk frame rekaman berikutnya (mis. reset kalibrasi)
+
+
+if ENGINE == "tasks":
+    model = TasksFaceLandmarker(num_faces=1, pose=USE_POSE_ANGLES)
+elif ADAPTIVE_QUALITY:
+    model = AdaptiveFaceMesh(TARGET_FPS, max_num_faces=1)
+else:
+    model = mp_face_mesh.FaceMesh(
+        max_num_faces=1,
+        refine_landmarks=True,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+
+with model:
+    roi = gate = None
+    if ENGINE == "tasks":
+        # LIVE_STREAM: frame dikirim tanpa menunggu inferensi, hasil datang lewat callback
+        sumber = TasksPipeline(cap, model, flip=not FRAME_BUS)
+    else:
+        roi = RoiFaceMesh(model.process, ROI_SIZE, search_process=buat_model_cari().process) if ROI_MODE else None
+        proses = roi.process if ROI_MODE else model.process
+        gate = MotionGate(proses, MOTION_THRESHOLD) if MOTION_GATE else None
+        proses = gate.process if MOTION_GATE else proses
+        sumber = buat_sumber(cap, proses, PIPELINE_MODE, flip=not FRAME_BUS)
+
+    for paket in sumber:
+        image = paket.frame
+        results = paket.results
         h, w, _ = image.shape
 
-        if results.multi_face_landmarks:
-            face_landmarks = results.multi_face_landmarks[0]
-            nose = face_landmarks.landmark[1]
-            x_n, y_n = int(nose.x * w), int(nose.y * h)
-
-            # --- JIKA KALIBRASI BELUM SELESAI ---
-            if not kalibrasi_selesai:
-                box_width, box_height = int(w * 0.3), int(h * 0.4)
-                x1, y1 = (w - box_width) // 2, (h - box_height) // 2
-                x2, y2 = x1 + box_width, y1 + box_height
-
-                cv2.rectangle(image, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                cv2.putText(image, "Posisikan wajah & tekan 'r' utk kalibrasi ulang", (x1 - 100, y1 - 20),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-
-                if x1 < x_n < x2 and y1 < y_n < y2:
-                    kalibrasi_selesai = True
-                    waktu_kalibrasi_selesai = time.time()
-
-            # --- JIKA KALIBRASI SUDAH SELESAI ---
-            else:
-                if time.time() - waktu_kalibrasi_selesai < 2.0:
-                    cv2.putText(image, "Kalibrasi Selesai! SIAP!", (50, 50),
-                                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                else:
-                    # 1. HITUNG PERSENTASE MENTAH
-                    left_eye = face_landmarks.landmark[33]
-                    right_eye = face_landmarks.landmark[263]
-                    x_le, y_le = int(left_eye.x * w), int(left_eye.y * h)
-                    x_re, y_re = int(right_eye.x * w), int(right_eye.y * h)
-                    y_coords = [int(p.y * h) for p in face_landmarks.landmark]
-                    y_min, y_max = min(y_coords), max(y_coords)
-
-                    x_eye_center = (x_le + x_re) // 2
-                    dx = x_n - x_eye_center
-                    raw_percent_right = max(0, min(100, int((dx / (w*0.25)) * 100)))
-                    raw_percent_left = max(0, min(100, int((-dx / (w*0.25)) * 100)))
-
-                    y_face_center = (y_min + y_max) // 2
-                    dy = y_n - y_face_center
-                    raw_percent_up = max(0, min(100, int((-dy / (h*0.25)) * 100)))
-                    raw_percent_down = max(0, min(100, int((dy / (h*0.25)) * 100)))
-
-                    # 2. LAKUKAN SMOOTHING
-                    percent_right_hist.append(raw_percent_right)
-                    percent_left_hist.append(raw_percent_left)
-                    percent_up_hist.append(raw_percent_up)
-                    percent_down_hist.append(raw_percent_down)
-
-                    smooth_percent_right = int(np.mean(percent_right_hist))
-                    smooth_percent_left = int(np.mean(percent_left_hist))
-                    smooth_percent_up = int(np.mean(percent_up_hist))
-                    smooth_percent_down = int(np.mean(percent_down_hist))
-
-                    # 3. TERAPKAN DEADZONE
-                    final_percent_right = smooth_percent_right if smooth_percent_right > DEADZONE_THRESHOLD else 0
-                    final_percent_left = smooth_percent_left if smooth_percent_left > DEADZONE_THRESHOLD else 0
-                    final_percent_up = smooth_percent_up if smooth_percent_up > DEADZONE_THRESHOLD else 0
-                    final_percent_down = smooth_percent_down if smooth_percent_down > DEADZONE_THRESHOLD else 0
-
-                    # 4. TAMPILKAN HASIL FINAL
-                    cv2.putText(image, f"Kanan: {final_percent_right}%  Kiri: {final_percent_left}%",
-                                (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
-                    cv2.putText(image, f"Atas: {final_percent_up}%  Bawah: {final_percent_down}%",
-                                (50, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+        fitur = fitur_wajah_utama(results, w, h)
+        if perekam is not None:
+            perekam.write(time.time(), w, h, results.multi_face_landmarks, penanda)
+            penanda = 0
+
+        status = tracker.update(fitur, w, h, time.time())
+
+        # --- JIKA KALIBRASI BELUM SELESAI ---
+        if status == tracker.KALIBRASI:
+            x1, y1, x2, y2 = tracker.calibration_box(w, h)
+            cv2.rectangle(image, (x1, y1), (x2, y2), (0, 255, 0), 2)
+            cv2.putText(image, "Posisikan wajah & tekan 'r' utk kalibrasi ulang", (x1 - 100, y1 - 20),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+
+        elif status == tracker.VERIFIKASI:
+            cv2.putText(image, "Mencocokkan profil kalibrasi...", (50, 50),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
+
+        # --- JIKA KALIBRASI SUDAH SELESAI ---
+        elif status == tracker.SIAP:
+            cv2.putText(image, "Kalibrasi Selesai! SIAP!", (50, 50),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+        elif status == tracker.TRACKING:
+            # Persentase mentah -> smoothing -> deadzone dihitung di HeadTracker
+            final_percent_right, final_percent_left, final_percent_up, final_percent_down = tracker.percents
+            if profil_store is not None and not profil_disimpan and tracker.profile_used is None:
+                # None selama jeda siap belum selesai / sampel netral belum cukup: coba lagi di frame berikutnya
+                profil = tracker.calibration_profile(w, h)
+                if profil is not None:
+                    profil_store.save(kunci, profil)
+                    profil_disimpan = True
+            if publisher is not None:
+                publisher.publish(tracker.percents, time.time())
+            cv2.putText(image, f"Kanan: {final_percent_right}%  Kiri: {final_percent_left}%",
+                        (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+            cv2.putText(image, f"Atas: {final_percent_up}%  Bawah: {final_percent_down}%",
+                        (50, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
 
         else:
             pesan = "Wajah tidak terdeteksi"
-            if not kalibrasi_selesai:
+            if not tracker.kalibrasi_selesai:
                 pesan = "Posisikan wajah di dalam kotak"
             cv2.putText(image, pesan, (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
 
+        cv2.putText(image, f"Latensi: {sumber.latency.last_ms:.0f} ms", (w - 200, h - 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 1)
         cv2.imshow("Deteksi Gerakan Kepala Pro", image)
+        sumber.selesai(paket)
 
         # --- KONTROL KEYBOARD ---
         key = cv2.waitKey(5) & 0xFF
         if key == ord('q'): # Tekan 'q' untuk keluar
             break
         if key == ord('r'): # Tekan 'r' untuk reset kalibrasi
-            kalibrasi_selesai = False
             # Mengosongkan history agar smoothing tidak terpengaruh data lama
-            percent_right_hist.clear()
-            percent_left_hist.clear()
-            percent_up_hist.clear()
-            percent_down_hist.clear()
-
-
+            tracker.reset()
+            profil_disimpan = False
+            penanda = PENANDA_KALIBRASI
+
+    sumber.stop()
+
+print(sumber.latency.ringkasan())
+if roi is not None:
+    print(roi.ringkasan())
+if ADAPTIVE_QUALITY and ENGINE != "tasks":
+    print(model.ringkasan())
+if gate is not None:
+    print(gate.ringkasan())
+if perekam is not None:
+    perekam.close()
+if publisher is not None:
+    publisher.stop()
+    print(publisher.ringkasan())
 cap.release()
 cv2.destroyAllWindows()
\ No newline at end of file
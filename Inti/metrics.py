@@ -0,0 +1,284 @@
+import bisect
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- KONFIGURASI DEFAULT ---
+# Batas bucket histogram latensi (detik), dipilih sekitar budget frame 30 FPS (33 ms)
+BUCKET_LATENSI = (0.001, 0.002, 0.005, 0.01, 0.02, 0.033, 0.05, 0.1, 0.2, 0.5, 1.0)
+PREFIX = "headtrack"
+
+
+def _label_teks(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+# --- JENIS METRIK ---
+class Counter:
+    """Nilai yang hanya naik (jumlah frame, pelanggaran, ...)."""
+
+    jenis = "counter"
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, n=1):
+        self.value += n
+
+    def baris(self, nama, labels):
+        return [f"{nama}{_label_teks(labels)} {self.value}"]
+
+    def snapshot(self):
+        return self.value
+
+
+class Gauge(Counter):
+    """Nilai yang bisa naik turun (FPS, status kalibrasi, ...)."""
+
+    jenis = "gauge"
+
+    def set(self, value):
+        self.value = value
+
+
+class Histogram:
+    """Histogram dengan bucket tetap (format kumulatif Prometheus saat diekspor)."""
+
+    jenis = "histogram"
+
+    def __init__(self, buckets=BUCKET_LATENSI):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def baris(self, nama, labels):
+        hasil = []
+        kumulatif = 0
+        counts = list(self.counts)
+        for batas, n in zip(self.buckets + (float("inf"),), counts):
+            kumulatif += n
+            le = "+Inf" if batas == float("inf") else repr(batas)
+            hasil.append(f"{nama}_bucket{_label_teks(labels + (('le', le),))} {kumulatif}")
+        hasil.append(f"{nama}_sum{_label_teks(labels)} {self.sum}")
+        hasil.append(f"{nama}_count{_label_teks(labels)} {kumulatif}")
+        return hasil
+
+    def snapshot(self):
+        return {"count": self.count, "sum": self.sum,
+                "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], self.counts))}
+
+
+class Registry:
+    """Kumpulan metrik bernama (boleh dengan label), bisa diekspor ke teks Prometheus atau dict JSON."""
+
+    def __init__(self, prefix=PREFIX):
+        self.prefix = prefix
+        self._metrik = {}  # nama -> (help, kelas, {labels: objek})
+
+    def _ambil(self, kelas, nama, help_teks, labels, **kwargs):
+        nama = f"{self.prefix}_{nama}"
+        if nama not in self._metrik:
+            self._metrik[nama] = (help_teks, kelas, {})
+        anggota = self._metrik[nama][2]
+        kunci = tuple(sorted(labels.items())) if labels else ()
+        if kunci not in anggota:
+            anggota[kunci] = kelas(**kwargs)
+        return anggota[kunci]
+
+    def counter(self, nama, help_teks="", **labels):
+        return self._ambil(Counter, nama, help_teks, labels)
+
+    def gauge(self, nama, help_teks="", **labels):
+        return self._ambil(Gauge, nama, help_teks, labels)
+
+    def histogram(self, nama, help_teks="", buckets=BUCKET_LATENSI, **labels):
+        return self._ambil(Histogram, nama, help_teks, labels, buckets=buckets)
+
+    def prometheus(self):
+        baris = []
+        for nama, (help_teks, kelas, anggota) in list(self._metrik.items()):
+            if help_teks:
+                baris.append(f"# HELP {nama} {help_teks}")
+            baris.append(f"# TYPE {nama} {kelas.jenis}")
+            for labels, metrik in list(anggota.items()):
+                baris.extend(metrik.baris(nama, labels))
+        return "\n".join(baris) + "\n"
+
+    def snapshot(self):
+        hasil = {}
+        for nama, (_, _, anggota) in list(self._metrik.items()):
+            for labels, metrik in list(anggota.items()):
+                hasil[nama + _label_teks(labels)] = metrik.snapshot()
+        return hasil
+
+
+# --- EKSPOR ---
+def jalankan_server(registry, port, host="0.0.0.0"):
+    """Endpoint pull Prometheus di http://host:port/metrics (thread daemon)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            isi = registry.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(isi)))
+            self.end_headers()
+            self.wfile.write(isi)
+
+        def log_message(self, *args):
+            pass  # jangan kotori terminal dengan log tiap scrape
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def jalankan_dump_json(registry, path, interval=10.0):
+    """Tulis snapshot JSON tiap `interval` detik (ganti file secara atomik). Kembalikan fungsi untuk berhenti."""
+    berhenti = threading.Event()
+
+    def tulis():
+        data = {"time": time.time(), "metrics": registry.snapshot()}
+        sementara = path + ".tmp"
+        with open(sementara, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(sementara, path)
+
+    def loop():
+        while not berhenti.wait(interval):
+            tulis()
+        tulis()  # snapshot terakhir saat program berhenti
+
+    thread = threading.Thread(target=loop, name="metrics-json", daemon=True)
+    thread.start()
+
+    def stop():
+        berhenti.set()
+        thread.join(timeout=2.0)
+    return stop
+
+
+# --- METRIK LOOP TRACKING ---
+class TrackerMetrics:
+    """
+    Metrik standar untuk loop tracking/pengawasan: latensi per tahap, FPS efektif,
+    frame yang dibuang pipeline, wajah hilang, kalibrasi dan pelanggaran.
+    """
+
+    enabled = True
+
+    def __init__(self, registry=None, alpha=0.1):
+        self.registry = registry or Registry()
+        r = self.registry
+        self._alpha = alpha
+        self._t_sebelum = None
+        self._wajah_sebelum = False
+        self._stage = {}
+        self._penutup = []  # fungsi untuk menghentikan server/dump saat tutup()
+        self.frames = r.counter("frames_total", "Frame yang selesai ditampilkan")
+        self.fps = r.gauge("fps", "FPS efektif (rata-rata eksponensial)")
+        self.dropped = r.counter("frames_dropped_total", "Frame basi yang dibuang pipeline")
+        self.face_missing = r.counter("face_missing_frames_total", "Frame tanpa wajah terdeteksi")
+        self.faces_lost = r.counter("faces_lost_total", "Berapa kali wajah hilang setelah sebelumnya terdeteksi")
+        self.multi_face = r.counter("multiple_faces_frames_total", "Frame dengan lebih dari satu wajah")
+        self.calibrations = r.counter("calibrations_total", "Kalibrasi yang selesai")
+        self.calibrated = r.gauge("calibrated", "1 jika sesi sudah terkalibrasi")
+        self.warning = r.gauge("warning", "1 jika warning pelanggaran sedang aktif")
+
+    def stage(self, nama, detik):
+        histogram = self._stage.get(nama)
+        if histogram is None:
+            histogram = self._stage[nama] = self.registry.histogram(
+                "stage_seconds", "Latensi per tahap loop", stage=nama)
+        histogram.observe(detik)
+
+    def frame(self, paket, dropped_frames=0):
+        """Catat satu frame dari pipeline.FramePacket (setelah sumber.selesai(paket))."""
+        self.frames.inc()
+        self.dropped.value = dropped_frames
+        if paket.t_process is not None:
+            self.stage("queue", paket.t_process - paket.t_capture)
+            self.stage("inference", paket.t_inference - paket.t_process)
+        if paket.t_render is not None:
+            self.stage("render", paket.t_render - paket.t_inference)
+            self.stage("end_to_end", paket.t_render - paket.t_capture)
+            if self._t_sebelum is not None and paket.t_render > self._t_sebelum:
+                fps = 1.0 / (paket.t_render - self._t_sebelum)
+                self.fps.set(fps if self.fps.value == 0 else self.fps.value + self._alpha * (fps - self.fps.value))
+            self._t_sebelum = paket.t_render
+
+    def wajah(self, ada_wajah, jumlah_wajah=1):
+        if not ada_wajah:
+            self.face_missing.inc()
+            if self._wajah_sebelum:
+                self.faces_lost.inc()
+        if jumlah_wajah > 1:
+            self.multi_face.inc()
+        self._wajah_sebelum = ada_wajah
+
+    def event(self, event):
+        """Catat event dari ProctorSession.update."""
+        if event["type"] == "calibrated":
+            self.calibrations.inc()
+        elif event["type"] == "violation":
+            self.registry.counter("violations_total", "Pelanggaran per arah", direction=event["direction"]).inc()
+
+    def sesi(self, sesi):
+        self.calibrated.set(int(sesi.is_calibrated))
+        self.warning.set(int(sesi.warning))
+
+    def tutup(self):
+        for penutup in self._penutup:
+            penutup()
+        self._penutup = []
+
+
+class NullMetrics:
+    """Pengganti TrackerMetrics saat instrumentasi dimatikan: semua method tidak melakukan apa-apa."""
+
+    enabled = False
+
+    def stage(self, nama, detik):
+        pass
+
+    def frame(self, paket, dropped_frames=0):
+        pass
+
+    def wajah(self, ada_wajah, jumlah_wajah=1):
+        pass
+
+    def event(self, event):
+        pass
+
+    def sesi(self, sesi):
+        pass
+
+    def tutup(self):
+        pass
+
+
+def buat_metrics(port=None, json_path=None, json_interval=10.0):
+    """TrackerMetrics + endpoint/dump yang diminta, atau NullMetrics jika keduanya None."""
+    if port is None and json_path is None:
+        return NullMetrics()
+    metrics = TrackerMetrics()
+    if port is not None:
+        server = jalankan_server(metrics.registry, port)
+        metrics._penutup.append(server.shutdown)
+    if json_path is not None:
+        metrics._penutup.append(jalankan_dump_json(metrics.registry, json_path, json_interval))
+    return metrics
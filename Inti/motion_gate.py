@@ -0,0 +1,120 @@
+import time
+
+import cv2
+import numpy as np
+
+from adaptive_quality import LandmarkExtrapolator
+from head_features import LandmarkResult, landmarks_to_array
+
+# --- KONFIGURASI DEFAULT ---
+MOTION_THRESHOLD = 2.5   # rata-rata selisih piksel (0..255) thumbnail; di bawah ini frame dianggap diam
+MAX_SKIP = 15            # inferensi dipaksa paling lambat tiap N frame walau tidak ada gerakan (sekaligus audit galat)
+UKURAN_THUMBNAIL = 32    # sisi thumbnail area wajah
+UKURAN_FRAME = (32, 24)  # thumbnail seluruh frame, menangkap wajah/gerakan baru di luar area wajah
+
+
+class MotionGate:
+    """
+    Pembungkus `face_mesh.process` (seperti RoiFaceMesh) yang melewati inferensi saat gambar diam.
+    Area wajah (kotak landmark terakhir) dan seluruh frame diperkecil menjadi thumbnail kanal hijau,
+    lalu dibandingkan dengan thumbnail saat inferensi terakhir. Jika selisihnya di bawah `threshold`,
+    landmark terakhir dipakai ulang (atau diekstrapolasi) dan tetap lewat smoothing/deadzone seperti biasa.
+    Pembanding selalu frame inferensi terakhir, jadi gerakan pelan yang menumpuk tetap memicu inferensi.
+    Inferensi paksa tiap `max_skip` frame diam sekaligus menjadi audit: landmark pakai-ulang dibandingkan
+    dengan hasil sebenarnya, galatnya dilaporkan di `ringkasan`.
+    """
+
+    def __init__(self, process, threshold=MOTION_THRESHOLD, max_skip=MAX_SKIP, ukuran=UKURAN_THUMBNAIL,
+                 padding=0.3, extrapolate=False):
+        self.inner = process
+        self.threshold = threshold
+        self.max_skip = max_skip
+        self.ukuran = ukuran
+        self.padding = padding
+        self.extrapolator = LandmarkExtrapolator() if extrapolate else None
+        self.frames = 0
+        self.dilewati = 0
+        self.audit = []  # galat rata-rata (piksel) landmark pakai-ulang vs inferensi sebenarnya
+        self.reset()
+
+    def reset(self):
+        self._hasil = None
+        self._kotak = None     # (x0, y0, x1, y1) piksel area wajah saat inferensi terakhir
+        self._referensi = None  # (thumbnail wajah, thumbnail frame) saat inferensi terakhir
+        self._beruntun = 0
+        self.selisih = 0.0
+
+    @property
+    def skip_rate(self):
+        return self.dilewati / self.frames if self.frames else 0.0
+
+    # --- THUMBNAIL ---
+    def _thumbnail(self, rgb):
+        # Piksel dikurangi dulu lewat slicing berlangkah (view, tanpa salin frame penuh), baru di-resize
+        x0, y0, x1, y1 = self._kotak
+        langkah = max(1, (x1 - x0) // (self.ukuran * 4))
+        wajah = cv2.resize(rgb[y0:y1:langkah, x0:x1:langkah, 1], (self.ukuran, self.ukuran),
+                           interpolation=cv2.INTER_AREA)
+        langkah = max(1, rgb.shape[1] // (UKURAN_FRAME[0] * 8))
+        frame = cv2.resize(rgb[::langkah, ::langkah, 1], UKURAN_FRAME, interpolation=cv2.INTER_AREA)
+        return wajah, frame
+
+    def _perbarui_kotak(self, wajah, w, h):
+        if not wajah:
+            self._kotak = None
+            return
+        semua = np.concatenate([lm[:, :2] for lm in wajah])
+        (x_min, y_min), (x_max, y_max) = semua.min(axis=0) * (w, h), semua.max(axis=0) * (w, h)
+        pad_x, pad_y = (x_max - x_min) * self.padding, (y_max - y_min) * self.padding
+        x0, y0 = int(max(0, x_min - pad_x)), int(max(0, y_min - pad_y))
+        x1, y1 = int(min(w, x_max + pad_x)), int(min(h, y_max + pad_y))
+        self._kotak = (x0, y0, x1, y1) if x1 - x0 >= 8 and y1 - y0 >= 8 else None
+
+    # --- INFERENSI ---
+    def process(self, rgb, now=None):
+        now = time.perf_counter() if now is None else now
+        self.frames += 1
+        if self._kotak is not None:
+            wajah, frame = self._thumbnail(rgb)
+            self.selisih = max(cv2.absdiff(wajah, self._referensi[0]).mean(),
+                               cv2.absdiff(frame, self._referensi[1]).mean())
+            if self.selisih < self.threshold:
+                pakai_ulang = self._pakai_ulang(now)
+                if self._beruntun < self.max_skip:
+                    self._beruntun += 1
+                    self.dilewati += 1
+                    return pakai_ulang
+                hasil = self._inferensi(rgb, now)
+                self._catat_audit(pakai_ulang, hasil, rgb.shape)
+                return hasil
+        return self._inferensi(rgb, now)
+
+    def _pakai_ulang(self, now):
+        if self.extrapolator is not None:
+            return LandmarkResult(self.extrapolator.predict(now), self._hasil.head_poses)
+        return self._hasil
+
+    def _inferensi(self, rgb, now):
+        results = self.inner(rgb)
+        h, w = rgb.shape[:2]
+        wajah = [landmarks_to_array(f) for f in (results.multi_face_landmarks or [])]
+        self._hasil = LandmarkResult(wajah, getattr(results, "head_poses", None))
+        self._beruntun = 0
+        self._perbarui_kotak(wajah, w, h)
+        self._referensi = self._thumbnail(rgb) if self._kotak is not None else None
+        if self.extrapolator is not None:
+            self.extrapolator.update(wajah, now)
+        return self._hasil
+
+    def _catat_audit(self, pakai_ulang, hasil, shape):
+        lama, baru = pakai_ulang.multi_face_landmarks, hasil.multi_face_landmarks
+        if lama and baru and lama[0].shape == baru[0].shape:
+            skala = np.array([shape[1], shape[0]], dtype=np.float32)
+            self.audit.append(float(np.linalg.norm((lama[0][:, :2] - baru[0][:, :2]) * skala, axis=1).mean()))
+
+    def ringkasan(self):
+        teks = f"Motion gate: {self.dilewati}/{self.frames} frame tanpa inferensi ({100 * self.skip_rate:.0f}%)"
+        if self.audit:
+            teks += (f", audit {len(self.audit)} frame: galat landmark rata-rata {np.mean(self.audit):.2f} px, "
+                     f"maks {np.max(self.audit):.2f} px")
+        return teks
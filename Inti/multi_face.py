@@ -0,0 +1,343 @@
+import cv2
+import numpy as np
+
+from head_features import LandmarkResult, batch_features, direction_percents, landmarks_to_array
+from proctoring import ProctorConfig
+from smoothing import MovingAverageRows
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # tanpa scipy: pencocokan greedy (hasil sama jika wajah tidak saling berdekatan)
+    linear_sum_assignment = None
+
+# --- KONFIGURASI DEFAULT ---
+MAX_IDENTITAS = 32          # slot identitas (baris array state); satu ruang kelas ~30 peserta
+MIN_IOU = 0.3               # kotak wajah frame ini & frame lalu dianggap orang yang sama jika IoU >= ini
+MAKS_HILANG_DETIK = 3.0     # identitas dilepas jika wajahnya tidak terlihat selama ini
+SKALA_WAJAH = 0.5           # offset hidung sebesar SKALA_WAJAH x tinggi wajah = 100%
+RIWAYAT_PELANGGARAN = 16    # timestamp pelanggaran yang disimpan per identitas (untuk jendela warning)
+GRID_TILE = (2, 2)          # kolom x baris tile untuk frame resolusi tinggi
+OVERLAP_TILE = 0.2          # tumpang tindih antar tile (bagian dari lebar/tinggi tile)
+LEBAR_TILE = 640            # tile lebih lebar dari ini diperkecil sebelum inferensi
+NMS_IOU = 0.4               # wajah dari dua tile dengan IoU di atas ini dianggap wajah yang sama
+
+
+# --- KOTAK & PENCOCOKAN ---
+def kotak_wajah(landmarks):
+    """Kotak (F, 4) [x1, y1, x2, y2] ternormalisasi dari landmark (F, N, 3)."""
+    xy = landmarks[:, :, :2]
+    return np.concatenate([xy.min(axis=1), xy.max(axis=1)], axis=1)
+
+
+def iou_matrix(a, b):
+    """IoU semua pasangan kotak a (M, 4) dan b (N, 4) sekaligus, hasil (M, N)."""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    irisan = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    luas_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    luas_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return irisan / np.maximum(luas_a[:, None] + luas_b[None, :] - irisan, 1e-12)
+
+
+def cocokkan(iou, min_iou=MIN_IOU, hungarian=True):
+    """
+    Pasangkan baris (identitas) dengan kolom (wajah frame ini) agar total IoU maksimal.
+    Hungarian (scipy) jika tersedia, jika tidak greedy dari IoU terbesar. Kembalikan (baris, kolom).
+    """
+    if iou.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    if hungarian and linear_sum_assignment is not None:
+        baris, kolom = linear_sum_assignment(iou, maximize=True)
+    else:
+        urutan = np.argsort(iou, axis=None)[::-1]
+        urutan = urutan[iou.ravel()[urutan] >= min_iou]
+        baris, kolom = [], []
+        dipakai_baris = np.zeros(iou.shape[0], dtype=bool)
+        dipakai_kolom = np.zeros(iou.shape[1], dtype=bool)
+        for b, k in zip(*np.unravel_index(urutan, iou.shape)):
+            if not dipakai_baris[b] and not dipakai_kolom[k]:
+                dipakai_baris[b] = dipakai_kolom[k] = True
+                baris.append(b)
+                kolom.append(k)
+        baris, kolom = np.array(baris, dtype=np.int64), np.array(kolom, dtype=np.int64)
+    cukup = iou[baris, kolom] >= min_iou
+    return baris[cukup], kolom[cukup]
+
+
+# --- INFERENSI PER TILE ---
+class TiledFaceMesh:
+    """
+    Inferensi FaceMesh di tile yang saling tumpang tindih untuk kamera ruang kelas resolusi tinggi:
+    wajah kecil di frame penuh menjadi cukup besar untuk detektor di dalam tile.
+    Setiap tile punya model sendiri (`buat_model()`), karena FaceMesh mode video melacak wajah antar panggilan.
+    Landmark dipetakan balik ke koordinat frame penuh; wajah ganda di daerah overlap dibuang (NMS IoU).
+    """
+
+    def __init__(self, buat_model, grid=GRID_TILE, overlap=OVERLAP_TILE, tile_width=LEBAR_TILE, nms_iou=NMS_IOU):
+        self.grid = grid
+        self.overlap = overlap
+        self.tile_width = tile_width
+        self.nms_iou = nms_iou
+        self.models = [buat_model() for _ in range(grid[0] * grid[1])]
+        self.frames = 0
+        self.duplikat = 0
+
+    def tiles(self, w, h):
+        """Daftar (x0, y0, x1, y1) piksel untuk setiap tile."""
+        kolom, baris = self.grid
+        tw = int(np.ceil(w / (kolom - (kolom - 1) * self.overlap)))
+        th = int(np.ceil(h / (baris - (baris - 1) * self.overlap)))
+        xs = np.linspace(0, w - tw, kolom).astype(int) if kolom > 1 else [0]
+        ys = np.linspace(0, h - th, baris).astype(int) if baris > 1 else [0]
+        return [(int(x), int(y), int(x) + min(tw, w), int(y) + min(th, h)) for y in ys for x in xs]
+
+    def process(self, rgb):
+        self.frames += 1
+        h, w = rgb.shape[:2]
+        wajah = []
+        for model, (x0, y0, x1, y1) in zip(self.models, self.tiles(w, h)):
+            tile = rgb[y0:y1, x0:x1]
+            tw, th = x1 - x0, y1 - y0
+            if self.tile_width and tw > self.tile_width:
+                tile = cv2.resize(tile, (self.tile_width, int(th * self.tile_width / tw)), interpolation=cv2.INTER_AREA)
+            for face_landmarks in model.process(np.ascontiguousarray(tile)).multi_face_landmarks or []:
+                lm = landmarks_to_array(face_landmarks).copy()
+                lm[:, 0] = (lm[:, 0] * tw + x0) / w
+                lm[:, 1] = (lm[:, 1] * th + y0) / h
+                lm[:, 2] *= tw / w  # z MediaPipe berskala lebar gambar
+                wajah.append(lm)
+        return LandmarkResult(self._buang_duplikat(wajah))
+
+    def _buang_duplikat(self, wajah):
+        if len(wajah) < 2:
+            return wajah
+        kotak = kotak_wajah(np.stack(wajah))
+        # Wajah yang terpotong tepi tile lebih kecil: simpan kotak terbesar lebih dulu
+        urutan = np.argsort(-(kotak[:, 2] - kotak[:, 0]) * (kotak[:, 3] - kotak[:, 1]))
+        iou = iou_matrix(kotak, kotak)
+        simpan = []
+        for i in urutan:
+            if not simpan or iou[i, simpan].max() < self.nms_iou:
+                simpan.append(i)
+        self.duplikat += len(wajah) - len(simpan)
+        return [wajah[i] for i in sorted(simpan)]
+
+    def ringkasan(self):
+        return (f"Tile {self.grid[0]}x{self.grid[1]}: {self.frames} frame, {len(self.models)} inferensi per frame, "
+                f"{self.duplikat} wajah ganda di overlap dibuang")
+
+    def close(self):
+        for model in self.models:
+            model.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --- STATE PER IDENTITAS ---
+class RoomSession:
+    """
+    Versi ruang kelas dari ProctorSession: banyak peserta di satu kamera.
+    Wajah dicocokkan ke identitas lewat IoU kotak frame sebelumnya; kalibrasi, smoothing,
+    deviasi & jendela pelanggaran disimpan sebagai array dengan satu baris per slot identitas.
+    Persentase dihitung dari offset hidung terhadap tengah mata / tengah wajah dibagi tinggi wajah,
+    jadi tidak bergantung pada jarak peserta ke kamera maupun posisinya di frame.
+    """
+
+    def __init__(self, session_id="kelas", config=None, max_identitas=MAX_IDENTITAS, min_iou=MIN_IOU,
+                 maks_hilang=MAKS_HILANG_DETIK, skala_wajah=SKALA_WAJAH, hungarian=True):
+        self.session_id = session_id
+        self.config = config or ProctorConfig()
+        self.min_iou = min_iou
+        self.maks_hilang = maks_hilang
+        self.skala_wajah = skala_wajah
+        self.hungarian = hungarian
+        k = max_identitas
+        self.ids = np.full(k, -1, dtype=np.int64)           # -1 = slot kosong
+        self.kotak = np.zeros((k, 4))
+        self.terakhir = np.zeros(k)                         # waktu wajah terakhir terlihat
+        self.mulai_kalibrasi = np.full(k, np.nan)           # NaN = tidak sedang kalibrasi
+        self.kalibrasi_sum = np.zeros((k, 2))
+        self.kalibrasi_n = np.zeros(k, dtype=np.int64)
+        self.baseline = np.zeros((k, 2))                    # offset hidung (dx, dy) saat kalibrasi
+        self.terkalibrasi = np.zeros(k, dtype=bool)
+        self.smoother = MovingAverageRows(k, 4, self.config.smoothing_frames)
+        self.percents = np.zeros((k, 4), dtype=np.int64)    # kanan, kiri, atas, bawah
+        self.mulai_deviasi = np.full(k, np.nan)
+        self.tercatat = np.zeros(k, dtype=np.int64)         # pelanggaran tercatat di deviasi saat ini
+        self.riwayat = np.full((k, RIWAYAT_PELANGGARAN), -np.inf)  # ring timestamp pelanggaran
+        self.riwayat_idx = np.zeros(k, dtype=np.int64)
+        self.violations_total = np.zeros(k, dtype=np.int64)
+        self.slot_wajah = np.empty(0, dtype=np.int64)       # slot identitas untuk setiap wajah frame terakhir
+        self._id_berikut = 1
+        self.tidak_tertampung = 0
+
+    # --- EVENT ---
+    def _event(self, jenis, now, slot, **data):
+        event = {"session": self.session_id, "t": now, "type": jenis, "identity": int(self.ids[slot])}
+        event.update(data)
+        return event
+
+    @property
+    def aktif(self):
+        return self.ids >= 0
+
+    # --- KALIBRASI ---
+    def start_calibration(self, now, slot=None):
+        """Kalibrasi ulang satu slot identitas, atau semua identitas aktif jika slot None."""
+        slots = np.flatnonzero(self.aktif) if slot is None else np.array([slot])
+        self.mulai_kalibrasi[slots] = now
+        self.kalibrasi_sum[slots] = 0
+        self.kalibrasi_n[slots] = 0
+        self.terkalibrasi[slots] = False
+        self.percents[slots] = 0
+        self.smoother.reset(slots)
+        self.mulai_deviasi[slots] = np.nan
+        self.tercatat[slots] = 0
+        self.riwayat[slots] = -np.inf
+        return [self._event("calibration_started", now, s) for s in slots]
+
+    # --- UPDATE PER FRAME ---
+    def update(self, wajah, w, h, now):
+        """Proses satu frame. `wajah` = daftar landmark (N, 3) per wajah. Kembalikan daftar event."""
+        events = []
+        if wajah:
+            landmarks = np.stack([landmarks_to_array(lm) for lm in wajah])
+            events += self._cocokkan(kotak_wajah(landmarks), now)
+            ada = self.slot_wajah >= 0
+            if ada.any():
+                events += self._perbarui(landmarks[ada], self.slot_wajah[ada], w, h, now)
+        else:
+            self.slot_wajah = np.empty(0, dtype=np.int64)
+
+        hilang = np.flatnonzero(self.aktif & (now - self.terakhir > self.maks_hilang))
+        for s in hilang:
+            events.append(self._event("identity_lost", now, s))
+        self.ids[hilang] = -1
+        return events
+
+    def _cocokkan(self, kotak, now):
+        slots = np.flatnonzero(self.aktif)
+        baris, kolom = cocokkan(iou_matrix(self.kotak[slots], kotak), self.min_iou, self.hungarian)
+        self.slot_wajah = np.full(len(kotak), -1, dtype=np.int64)
+        self.slot_wajah[kolom] = slots[baris]
+
+        events = []
+        baru = np.flatnonzero(self.slot_wajah < 0)
+        kosong = np.flatnonzero(~self.aktif)[:len(baru)]
+        self.tidak_tertampung += len(baru) - len(kosong)
+        baru = baru[:len(kosong)]
+        self.slot_wajah[baru] = kosong
+        for s in kosong:
+            self.ids[s] = self._id_berikut
+            self._id_berikut += 1
+            self.violations_total[s] = 0
+            events.append(self._event("identity_new", now, s))
+            events += self.start_calibration(now, s)
+
+        ada = self.slot_wajah >= 0
+        self.kotak[self.slot_wajah[ada]] = kotak[ada]
+        self.terakhir[self.slot_wajah[ada]] = now
+        return events
+
+    def _perbarui(self, landmarks, slots, w, h, now):
+        cfg = self.config
+        f = batch_features(landmarks, w, h)
+        skala = np.maximum(f["y_max"] - f["y_min"], 1) * self.skala_wajah
+        offset = np.stack([(f["x_n"] - f["x_eye_center"]) / skala,
+                           (f["y_n"] - (f["y_min"] + f["y_max"]) // 2) / skala], axis=1)
+        events = []
+
+        # Kalibrasi: rata-rata offset selama calibration_time detik sejak identitas muncul / perintah kalibrasi
+        kal = ~np.isnan(self.mulai_kalibrasi[slots])
+        if kal.any():
+            s_kal = slots[kal]
+            masih = now - self.mulai_kalibrasi[s_kal] <= cfg.calibration_time
+            self.kalibrasi_sum[s_kal[masih]] += offset[kal][masih]
+            self.kalibrasi_n[s_kal[masih]] += 1
+            selesai = s_kal[~masih & (self.kalibrasi_n[s_kal] > 0)]
+            self.baseline[selesai] = self.kalibrasi_sum[selesai] / self.kalibrasi_n[selesai, None]
+            self.terkalibrasi[selesai] = True
+            self.mulai_kalibrasi[s_kal[~masih]] = np.nan
+            for s in selesai:
+                events.append(self._event("calibrated", now, s, baseline=np.round(self.baseline[s], 3).tolist()))
+
+        # Pengawasan: identitas terkalibrasi yang tidak sedang kalibrasi ulang
+        awas = self.terkalibrasi[slots] & np.isnan(self.mulai_kalibrasi[slots])
+        if not awas.any():
+            return events
+        s_awas = slots[awas]
+        d = offset[awas] - self.baseline[s_awas]
+        raw_percent = direction_percents(d[:, 0], d[:, 1], 1.0, 1.0, max_percent=None)
+        persen = self.smoother.update(s_awas, raw_percent).astype(np.int64)
+        self.percents[s_awas] = persen
+
+        menoleh = np.maximum(persen[:, 0], persen[:, 1]) > cfg.turn_threshold_percent
+        menunduk = np.maximum(persen[:, 2], persen[:, 3]) > cfg.nod_threshold_percent
+        deviasi = menoleh | menunduk
+        normal = s_awas[~deviasi]
+        self.mulai_deviasi[normal] = np.nan
+        self.tercatat[normal] = 0
+
+        s_dev = s_awas[deviasi]
+        mulai = s_dev[np.isnan(self.mulai_deviasi[s_dev])]
+        self.mulai_deviasi[mulai] = now
+        interval = ((now - self.mulai_deviasi[s_dev]) // cfg.deviation_duration_seconds).astype(np.int64)
+        langgar = interval > self.tercatat[s_dev]
+        for s, n, p, turn in zip(s_dev[langgar], interval[langgar], persen[deviasi][langgar], menoleh[deviasi][langgar]):
+            self.riwayat[s, self.riwayat_idx[s]] = now
+            self.riwayat_idx[s] = (self.riwayat_idx[s] + 1) % RIWAYAT_PELANGGARAN
+            self.tercatat[s] = n
+            self.violations_total[s] += 1
+            if turn:
+                arah, besar = ("kanan", p[0]) if p[0] > p[1] else ("kiri", p[1])
+            else:
+                arah, besar = ("atas", p[2]) if p[2] > p[3] else ("bawah", p[3])
+            events.append(self._event("violation", now, s, direction=arah, magnitude=int(besar),
+                                      count=int(self.violations_in_window(now)[s])))
+        return events
+
+    def violations_in_window(self, now):
+        """Jumlah pelanggaran dalam warning_window_seconds terakhir, per slot identitas (K,)."""
+        return (self.riwayat >= now - self.config.warning_window_seconds).sum(axis=1)
+
+    def warning(self, now):
+        return self.aktif & self.terkalibrasi & (self.violations_in_window(now) >= self.config.warning_count_threshold)
+
+    def ringkasan(self):
+        return (f"Ruang {self.session_id}: {self._id_berikut - 1} identitas pernah terlihat, "
+                f"{int(self.aktif.sum())} aktif, {int(self.violations_total[self.aktif].sum())} pelanggaran (aktif)"
+                + (f", {self.tidak_tertampung} wajah tanpa slot" if self.tidak_tertampung else ""))
+
+
+class ThroughputPerWajah:
+    """Durasi proses per frame dikelompokkan menurut jumlah wajah, untuk laporan FPS vs jumlah peserta."""
+
+    def __init__(self, batas=(0, 1, 5, 10, 20, 30)):
+        self.batas = np.asarray(batas)
+        self.total = np.zeros(len(batas))
+        self.frames = np.zeros(len(batas), dtype=np.int64)
+
+    def update(self, jumlah_wajah, durasi):
+        i = int(np.searchsorted(self.batas, jumlah_wajah, side="right")) - 1
+        self.total[i] += durasi
+        self.frames[i] += 1
+
+    def ringkasan(self):
+        baris = ["Throughput per jumlah wajah:"]
+        for i in np.flatnonzero(self.frames):
+            if i + 1 == len(self.batas):
+                label = f"{self.batas[i]}+"
+            elif self.batas[i + 1] - 1 > self.batas[i]:
+                label = f"{self.batas[i]}-{self.batas[i + 1] - 1}"
+            else:
+                label = f"{self.batas[i]}"
+            rata = self.total[i] / self.frames[i]
+            baris.append(f"  {label} wajah: {self.frames[i]} frame, {rata * 1000:.1f} ms/frame "
+                         f"({1 / max(rata, 1e-9):.1f} FPS)")
+        return "\n".join(baris)
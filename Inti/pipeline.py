@@ -0,0 +1,244 @@
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from frame_buffers import FrameBuffers
+
+
+# --- ANTRIAN SATU SLOT ---
+class LatestSlot:
+    """Antrian satu slot: item baru menimpa item lama yang belum sempat diambil."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._ada_item = False
+        self._ditutup = False
+        self.dropped = 0  # jumlah item basi yang dibuang
+
+    def put(self, item):
+        """Simpan item; kembalikan item basi yang tertimpa (None jika slot kosong)."""
+        with self._cond:
+            basi = None
+            if self._ada_item:
+                self.dropped += 1
+                basi = self._item
+            self._item = item
+            self._ada_item = True
+            self._cond.notify()
+        return basi
+
+    def get(self, timeout=None):
+        """Ambil item terbaru. Kembalikan None jika timeout atau slot sudah ditutup & kosong."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._ada_item or self._ditutup, timeout)
+            if not self._ada_item:
+                return None
+            item = self._item
+            self._item = None
+            self._ada_item = False
+            return item
+
+    def close(self):
+        with self._cond:
+            self._ditutup = True
+            self._cond.notify_all()
+
+
+# --- DATA PER FRAME ---
+class FramePacket:
+    """Satu frame beserta hasil inferensi dan cap waktu tiap tahap."""
+
+    __slots__ = ("seq", "frame", "results", "t_capture", "t_process", "t_inference", "t_render", "buffer")
+
+    def __init__(self, seq, frame, t_capture):
+        self.seq = seq
+        self.frame = frame
+        self.results = None
+        self.t_capture = t_capture
+        self.t_process = None  # inferensi mulai (selisih dengan t_capture = waktu menunggu di slot)
+        self.t_inference = None
+        self.t_render = None
+        self.buffer = None  # FrameSet asal `frame`, dikembalikan ke FrameBuffers setelah selesai
+
+    def latency_ms(self):
+        """Latensi end-to-end: dari frame diambil kamera sampai selesai ditampilkan."""
+        akhir = self.t_render if self.t_render is not None else time.perf_counter()
+        return (akhir - self.t_capture) * 1000
+
+
+class LatencyStats:
+    """Menyimpan latensi N frame terakhir untuk laporan."""
+
+    def __init__(self, maxlen=300):
+        self.history = deque(maxlen=maxlen)
+        self.last_ms = 0.0
+        self.frames = 0
+
+    def add(self, latency_ms):
+        self.last_ms = latency_ms
+        self.history.append(latency_ms)
+        self.frames += 1
+
+    def ringkasan(self):
+        if not self.history:
+            return "Latensi: belum ada data"
+        data = np.asarray(self.history)
+        p50, p95 = np.percentile(data, [50, 95])
+        return (f"Latensi end-to-end ({self.frames} frame): rata-rata {data.mean():.1f} ms, "
+                f"p50 {p50:.1f} ms, p95 {p95:.1f} ms, maks {data.max():.1f} ms")
+
+
+# --- MODE SEKUENSIAL (perilaku lama) ---
+class SequentialSource:
+    """
+    Capture -> inferensi -> render berurutan di satu thread, seperti loop aslinya.
+    reuse_buffers=True: frame dibaca, di-flip dan dikonversi ke RGB di buffer yang dipakai ulang
+    (FrameBuffers), jadi `paket.frame` hanya valid sampai `selesai(paket)` dipanggil.
+    """
+
+    def __init__(self, cap, process, flip=True, reuse_buffers=True):
+        self.cap = cap
+        self.process = process
+        self.flip = flip
+        self.buffers = FrameBuffers(flip) if reuse_buffers else None
+        self.latency = LatencyStats()
+        self._seq = 0
+
+    @property
+    def dropped_frames(self):
+        return 0  # mode sekuensial tidak pernah membuang frame, tapi frame menumpuk di buffer kamera
+
+    # --- FRAME & BUFFER ---
+    def _baca(self, seq):
+        """Baca satu frame kamera (sudah di-flip) sebagai FramePacket; None jika kamera habis."""
+        if self.buffers is None:
+            ret, frame = self.cap.read()
+            t_capture = time.perf_counter()
+            if not ret:
+                return None
+            return FramePacket(seq, cv2.flip(frame, 1) if self.flip else frame, t_capture)
+        buf = self.buffers.baca(self.cap)
+        t_capture = time.perf_counter()
+        if buf is None:
+            return None
+        paket = FramePacket(seq, self.buffers.balik(buf), t_capture)
+        paket.buffer = buf
+        return paket
+
+    def _rgb(self, paket):
+        """Satu konversi BGR -> RGB per frame untuk inferensi."""
+        if paket.buffer is None:
+            return cv2.cvtColor(paket.frame, cv2.COLOR_BGR2RGB)
+        return self.buffers.ke_rgb(paket.buffer)
+
+    def _lepas(self, paket):
+        """Kembalikan buffer frame yang sudah selesai atau dibuang ke FrameBuffers."""
+        if paket is not None and paket.buffer is not None:
+            self.buffers.kembalikan(paket.buffer)
+            paket.buffer = None
+
+    def __iter__(self):
+        while self.cap.isOpened():
+            self._seq += 1
+            paket = self._baca(self._seq)
+            if paket is None:
+                break
+            paket.t_process = time.perf_counter()
+            paket.results = self.process(self._rgb(paket))
+            paket.t_inference = time.perf_counter()
+            yield paket
+
+    def selesai(self, paket):
+        """Panggil setelah frame ditampilkan untuk mencatat latensinya (buffer frame lalu dipakai ulang)."""
+        paket.t_render = time.perf_counter()
+        self.latency.add(paket.latency_ms())
+        self._lepas(paket)
+
+    def stop(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# --- MODE PIPELINE (capture / inferensi / render terpisah) ---
+class TrackingPipeline(SequentialSource):
+    """
+    Capture dan inferensi berjalan di thread masing-masing, dihubungkan slot tunggal.
+    Frame yang belum sempat diproses akan ditimpa frame terbaru (latest-frame-wins),
+    jadi render selalu memakai frame paling baru, bukan antrian frame basi.
+    """
+
+    def __init__(self, cap, process, flip=True, reuse_buffers=True):
+        super().__init__(cap, process, flip, reuse_buffers)
+        self._slot_frame = LatestSlot()
+        self._slot_hasil = LatestSlot()
+        self._berhenti = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._loop_capture, name="capture", daemon=True),
+            threading.Thread(target=self._loop_inferensi, name="inferensi", daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+
+    @property
+    def dropped_frames(self):
+        return self._slot_frame.dropped + self._slot_hasil.dropped
+
+    def _loop_capture(self):
+        seq = 0
+        while not self._berhenti.is_set() and self.cap.isOpened():
+            seq += 1
+            paket = self._baca(seq)
+            if paket is None:
+                break
+            self._lepas(self._slot_frame.put(paket))
+        self._slot_frame.close()
+
+    def _loop_inferensi(self):
+        while not self._berhenti.is_set():
+            paket = self._slot_frame.get()
+            if paket is None:
+                break
+            paket.t_process = time.perf_counter()
+            paket.results = self.process(self._rgb(paket))
+            paket.t_inference = time.perf_counter()
+            self._lepas(self._slot_hasil.put(paket))
+        self._slot_hasil.close()
+
+    def __iter__(self):
+        while True:
+            paket = self._slot_hasil.get()
+            if paket is None:
+                return
+            yield paket
+
+    def poll(self, timeout=0):
+        """Ambil hasil terbaru tanpa menunggu (None jika belum ada frame baru)."""
+        return self._slot_hasil.get(timeout=timeout)
+
+    @property
+    def aktif(self):
+        """False setelah kamera habis/ditutup dan thread inferensi berhenti."""
+        return self._threads[1].is_alive()
+
+    def stop(self):
+        self._berhenti.set()
+        self._slot_frame.close()
+        self._slot_hasil.close()
+        for t in self._threads:
+            t.join(timeout=1.0)
+
+
+def buat_sumber(cap, process, pipeline=True, flip=True, reuse_buffers=True):
+    """Pilih sumber frame: pipeline multi-thread atau loop sekuensial biasa."""
+    if pipeline:
+        return TrackingPipeline(cap, process, flip, reuse_buffers)
+    return SequentialSource(cap, process, flip, reuse_buffers)
@@ -0,0 +1,201 @@
+import argparse
+import json
+import multiprocessing as mproc
+import os
+import queue
+import sys
+import time
+
+import cv2
+import mediapipe as mp
+
+from face_count import FaceCountScheduler, wajah_utama
+from head_features import HeadFeatures
+from proctoring import ProctorSession
+from roi_tracker import RoiFaceMesh, buat_model_cari
+from event_store import EventStore
+
+# --- KONFIGURASI DEFAULT ---
+ROI_SIZE = 256
+STRIDE = 1  # proses 1 dari tiap N frame
+CEK_WORKER_DETIK = 1.0  # selang cek worker yang mati tanpa sempat mengirim penanda selesai
+
+
+def _buka_sesi(session_id, source, roi):
+    """Siapkan satu sesi di dalam worker: kamera/stream, FaceMesh sendiri, dan state pengawasan."""
+    cap = cv2.VideoCapture(source)
+    penghitung = FaceCountScheduler("mesh")
+    face_mesh = mp.solutions.face_mesh.FaceMesh(
+        max_num_faces=penghitung.mesh_max_faces, refine_landmarks=True,
+        min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    proses, model_cari = face_mesh.process, None
+    if roi:
+        # Pencarian di frame penuh memakai model kedua tanpa state (lihat RoiFaceMesh)
+        model_cari = buat_model_cari(penghitung.mesh_max_faces)
+        proses = RoiFaceMesh(face_mesh.process, ROI_SIZE, search_process=model_cari.process).process
+    return {
+        "id": session_id,
+        "cap": cap,
+        # File rekaman memakai timestamp video, stream memakai jam dinding
+        "pakai_waktu_video": os.path.exists(source),
+        "face_mesh": face_mesh,
+        "model_cari": model_cari,
+        "proses": proses,
+        "penghitung": penghitung,
+        "sesi": ProctorSession(session_id),
+        "frames": 0,
+        "multi_wajah": False,
+        "waktu_proses": 0.0,
+    }
+
+
+def _langkah_sesi(data, stride, antrian):
+    """Baca & proses satu frame dari satu sesi. False jika sumbernya sudah habis."""
+    cap = data["cap"]
+    for _ in range(stride - 1):
+        if not cap.grab():
+            return False
+    ret, frame = cap.read()
+    if not ret:
+        return False
+    mulai = time.perf_counter()
+    now = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0 if data["pakai_waktu_video"] else time.time()
+
+    frame = cv2.flip(frame, 1)
+    h, w, _ = frame.shape
+    results = data["proses"](cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    jumlah_wajah = data["penghitung"].count(None, results)
+
+    sesi = data["sesi"]
+    if data["frames"] == 0:
+        antrian.put(sesi.start_calibration(now))  # tanpa tombol 'c': kalibrasi otomatis di awal sesi
+
+    events = []
+    multi_wajah = jumlah_wajah > 1
+    if multi_wajah and not data["multi_wajah"]:
+        events.append({"session": data["id"], "t": now, "type": "multiple_faces", "count": jumlah_wajah})
+    data["multi_wajah"] = multi_wajah
+
+    fitur = None
+    if results.multi_face_landmarks:
+        fitur = HeadFeatures(wajah_utama(results.multi_face_landmarks), w, h)
+    events.extend(sesi.update(fitur, w, h, now))
+    for event in events:
+        antrian.put(event)
+
+    data["frames"] += 1
+    data["waktu_proses"] += time.perf_counter() - mulai
+    return True
+
+
+def worker(daftar_sesi, stride, roi, antrian):
+    """
+    Satu proses worker menangani beberapa sesi secara bergiliran (round-robin).
+    Penanda selesai (None) selalu dikirim, juga saat worker gagal, agar agregator tidak menunggu selamanya.
+    """
+    sekarang = ",".join(session_id for session_id, _ in daftar_sesi)  # sesi yang sedang diproses
+    try:
+        aktif = [_buka_sesi(session_id, source, roi) for session_id, source in daftar_sesi]
+        mulai = time.perf_counter()
+        while aktif:
+            for data in list(aktif):
+                sekarang = data["id"]
+                if not _langkah_sesi(data, stride, antrian):
+                    aktif.remove(data)
+                    data["cap"].release()
+                    data["face_mesh"].close()
+                    if data["model_cari"] is not None:
+                        data["model_cari"].close()
+                    antrian.put({"session": data["id"], "type": "stats", "frames": data["frames"],
+                                 "processing_seconds": data["waktu_proses"],
+                                 "wall_seconds": time.perf_counter() - mulai, "pid": os.getpid()})
+    except Exception as e:
+        antrian.put({"session": sekarang, "t": time.time(), "type": "error",
+                     "message": f"{type(e).__name__}: {e}", "pid": os.getpid()})
+        raise
+    finally:
+        antrian.put(None)
+
+
+def laporan_throughput(statistik, jumlah_worker, durasi):
+    print("\n===== LAPORAN THROUGHPUT =====")
+    total_frame = 0
+    for s in sorted(statistik, key=lambda s: s["session"]):
+        fps = s["frames"] / s["wall_seconds"] if s["wall_seconds"] else 0.0
+        total_frame += s["frames"]
+        print(f"{s['session']:<20} {s['frames']:7d} frame  {fps:7.1f} FPS  (worker pid {s['pid']})")
+    fps_total = total_frame / durasi if durasi else 0.0
+    print(f"Sesi: {len(statistik)}, worker: {jumlah_worker}, durasi: {durasi:.1f} s")
+    print(f"Throughput total: {fps_total:.1f} frame/s = {fps_total / max(jumlah_worker, 1):.1f} frame/s per core")
+    if statistik:
+        print(f"Rata-rata per sesi: {fps_total / len(statistik):.1f} FPS")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Server pengawasan ujian untuk banyak peserta sekaligus")
+    parser.add_argument("sources", nargs="+", help="file video atau URL stream, satu per peserta "
+                                                   "(boleh ID=SUMBER untuk memberi nama sesi)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="jumlah proses worker")
+    parser.add_argument("--stride", type=int, default=STRIDE, help="proses 1 dari tiap N frame")
+    parser.add_argument("--roi", action="store_true", help="inferensi di crop sekitar wajah")
+    parser.add_argument("--output", default="-", help="file JSONL untuk semua event (default stdout)")
+    parser.add_argument("--db", help="simpan juga semua event ke database SQLite (lihat event_store.py)")
+    args = parser.parse_args()
+
+    daftar_sesi = []
+    for i, item in enumerate(args.sources):
+        session_id, source = f"peserta-{i + 1}", item
+        if "=" in item and "://" not in item.split("=", 1)[0]:
+            session_id, source = item.split("=", 1)
+        daftar_sesi.append((session_id, source))
+
+    jumlah_worker = max(1, min(args.workers, len(daftar_sesi)))
+    pembagian = [daftar_sesi[i::jumlah_worker] for i in range(jumlah_worker)]
+
+    ctx = mproc.get_context("spawn")
+    antrian = ctx.Queue()
+    proses = [ctx.Process(target=worker, args=(bagian, args.stride, args.roi, antrian)) for bagian in pembagian]
+    mulai = time.perf_counter()
+    for p in proses:
+        p.start()
+
+    # --- AGREGASI EVENT DARI SEMUA SESI ---
+    keluaran = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    event_store = EventStore(args.db) if args.db else None
+    statistik = []
+    selesai = 0
+    semua_mati = False
+    while selesai < jumlah_worker:
+        try:
+            event = antrian.get(timeout=CEK_WORKER_DETIK)
+        except queue.Empty:
+            # Worker yang mati keras (segfault, dibunuh OOM) tidak sempat mengirim None;
+            # tunggu satu selang lagi agar event yang masih di pipe ikut terbaca
+            if any(p.is_alive() for p in proses):
+                continue
+            if semua_mati:
+                break
+            semua_mati = True
+            continue
+        if event is None:
+            selesai += 1
+            continue
+        if event["type"] == "stats":
+            statistik.append(event)
+            continue
+        keluaran.write(json.dumps(event) + "\n")
+        keluaran.flush()
+        if event_store is not None:
+            event_store.record(event)
+    durasi = time.perf_counter() - mulai
+
+    for p in proses:
+        p.join()
+        if p.exitcode != 0:
+            print(f"Worker pid {p.pid} berhenti dengan kode {p.exitcode}", file=sys.stderr)
+    if keluaran is not sys.stdout:
+        keluaran.close()
+    if event_store is not None:
+        event_store.close()
+        print(event_store.ringkasan())
+    laporan_throughput(statistik, jumlah_worker, durasi)
@@ -0,0 +1,232 @@
+from collections import deque
+
+from calibration import (DRIFT_MIN_POSE, DRIFT_MIN_RELATIF, TOLERANSI_POSE, TOLERANSI_RELATIF, RunningStats,
+                         cek_drift)
+from head_features import direction_percents
+from smoothing import buat_filter
+
+
+class ProctorConfig:
+    """Konstanta pengawasan ujian (nilai default sama dengan branch.py)."""
+
+    def __init__(self, smoothing_frames=7, smoothing_filter="moving_average", calibration_time=3,
+                 turn_threshold_percent=17, nod_threshold_percent=9, deviation_duration_seconds=2,
+                 warning_window_seconds=60, warning_count_threshold=3, use_pose=False, pose_scale=(60.0, 45.0),
+                 calibration_min_time=1.0, calibration_tolerance=TOLERANSI_RELATIF, drift_check_time=0.5):
+        self.smoothing_frames = smoothing_frames
+        self.smoothing_filter = smoothing_filter
+        # Kalibrasi berhenti lebih awal (setelah calibration_min_time) begitu standard error rata-rata posisi
+        # < calibration_tolerance x ukuran frame; paling lama calibration_time detik. None = selalu penuh.
+        self.calibration_time = calibration_time
+        self.calibration_min_time = calibration_min_time
+        self.calibration_tolerance = calibration_tolerance
+        # Profil tersimpan dicek selama drift_check_time detik sebelum dipakai
+        self.drift_check_time = drift_check_time
+        self.turn_threshold_percent = turn_threshold_percent
+        self.nod_threshold_percent = nod_threshold_percent
+        self.deviation_duration_seconds = deviation_duration_seconds
+        self.warning_window_seconds = warning_window_seconds
+        self.warning_count_threshold = warning_count_threshold
+        # Sudut yaw/pitch asli (engine Tasks) relatif ke baseline kalibrasi; pose_scale = derajat untuk 100%
+        self.use_pose = use_pose
+        self.pose_scale = pose_scale
+
+
+class ProctorSession:
+    """
+    State machine kalibrasi -> deviasi -> pelanggaran -> warning untuk satu peserta.
+    Waktu selalu diberikan dari luar (`now`), jadi bisa memakai jam dinding maupun timestamp video.
+    Setiap update mengembalikan daftar event (dict) yang terjadi di frame tersebut.
+    """
+
+    def __init__(self, session_id="lokal", config=None):
+        self.session_id = session_id
+        self.config = config or ProctorConfig()
+        cfg = self.config
+        self.calibration_stats = RunningStats(2)  # [x hidung, y tengah wajah]
+        self.calibration_pose = RunningStats(2)   # [yaw, pitch]
+        self.profile_check = None  # profil tersimpan yang sedang dicek drift-nya
+        self.profile_used = None   # profil yang menjadi baseline saat ini (None = hasil kalibrasi sendiri)
+        self.smoother = buat_filter(cfg.smoothing_filter, 4, window=cfg.smoothing_frames)
+        self.event_timestamps = deque()
+
+        self.is_calibrating = False
+        self.is_calibrated = False
+        self.calibration_start_time = 0
+        self.baseline_nose = (0, 0)
+        self.baseline_face_center = (0, 0)
+        self.baseline_pose = None  # (yaw, pitch) jika kalibrasi melihat pose kepala
+
+        self.deviation_start_time = None
+        self.violations_logged_this_deviation = 0
+
+        # Hasil frame terakhir (untuk ditampilkan)
+        self.percents = (0, 0, 0, 0)  # kanan, kiri, atas, bawah
+        self.face_present = False
+        self.violations_total = 0
+
+    # --- EVENT ---
+    def _event(self, jenis, now, **data):
+        event = {"session": self.session_id, "t": now, "type": jenis}
+        event.update(data)
+        return event
+
+    # --- KALIBRASI ---
+    def start_calibration(self, now, profile=None):
+        """
+        Mulai kalibrasi. Dengan `profile` (dari `calibration_profile()`, mis. dibaca dari ProfileStore)
+        posisi peserta hanya dicek sebentar; jika tidak bergeser, baseline profil langsung dipakai.
+        Jendela kalibrasi/cek dihitung dari frame pertama yang ada wajahnya, bukan dari panggilan ini.
+        """
+        if profile is not None and not profile.get("position"):
+            profile = None  # profil dari mode lain (mis. hanya "neutral" milik HeadTracker)
+        self.is_calibrating, self.is_calibrated = True, False
+        self.calibration_start_time = now
+        self.calibration_stats.reset()
+        self.calibration_pose.reset()
+        self.profile_check = profile
+        self.profile_used = None
+        self.smoother.reset()
+        self.event_timestamps.clear()
+        self.violations_logged_this_deviation = 0
+        return self._event("calibration_started", now, profile=profile is not None)
+
+    def calibration_remaining(self, now):
+        return self.config.calibration_time - int(now - self.calibration_start_time)
+
+    def calibration_profile(self, w, h):
+        """Baseline kalibrasi terakhir sebagai dict JSON (posisi dinormalisasi ke ukuran frame), None jika belum ada."""
+        if not self.is_calibrated or len(self.calibration_stats) == 0:
+            return None
+        if self.profile_used is not None:
+            return self.profile_used
+        return {"position": self.calibration_stats.to_dict((w, h)),
+                "pose": self.calibration_pose.to_dict() if len(self.calibration_pose) else None}
+
+    # --- UPDATE PER FRAME ---
+    def update(self, fitur, w, h, now):
+        """Proses satu frame. `fitur` adalah HeadFeatures atau None jika wajah tidak terdeteksi."""
+        self.face_present = fitur is not None
+        if fitur is None:
+            return []
+        if self.is_calibrating:
+            return self._update_kalibrasi(fitur, w, h, now)
+        if self.is_calibrated:
+            return self._update_pengawasan(fitur, w, h, now)
+        return []
+
+    def _update_kalibrasi(self, fitur, w, h, now):
+        cfg = self.config
+        if len(self.calibration_stats) == 0:
+            self.calibration_start_time = now  # jendela mulai saat wajah pertama kali terlihat (kamera/model warm-up)
+        lama = now - self.calibration_start_time
+        if self.profile_check is not None and lama > cfg.calibration_time and len(self.calibration_stats) < 2:
+            # Wajah hanya terlihat sekilas selama jendela: profil tidak bisa dicek, kalibrasi penuh dari awal
+            self.profile_check = None
+            self.calibration_stats.reset()
+            self.calibration_pose.reset()
+            self.calibration_start_time = now
+            lama = 0.0
+        if lama <= cfg.calibration_time:
+            self.calibration_stats.update((fitur.x_n, fitur.y_face_center))
+            if fitur.pose is not None:
+                self.calibration_pose.update(fitur.pose[:2])
+
+        if self.profile_check is not None:
+            if lama < cfg.drift_check_time or len(self.calibration_stats) < 2:
+                return []
+            return self._cek_profil(w, h, now)
+
+        stabil = (cfg.calibration_min_time is not None and lama >= cfg.calibration_min_time
+                  and self.calibration_stats.stabil(cfg.calibration_tolerance * max(w, h))
+                  and (len(self.calibration_pose) == 0 or self.calibration_pose.stabil(TOLERANSI_POSE)))
+        if lama <= cfg.calibration_time and not stabil:
+            return []
+        return self._selesai_kalibrasi(now, "calibration")
+
+    def _cek_profil(self, w, h, now):
+        """Profil tersimpan dipakai jika posisi sekarang masih cocok; jika bergeser, lanjut kalibrasi penuh."""
+        profil, self.profile_check = self.profile_check, None
+        cocok, selisih = cek_drift(profil["position"], self.calibration_stats, (w, h), minimum=DRIFT_MIN_RELATIF)
+        if cocok and profil.get("pose") and len(self.calibration_pose):
+            cocok_pose, _ = cek_drift(profil["pose"], self.calibration_pose, minimum=DRIFT_MIN_POSE)
+            cocok = cocok and cocok_pose
+        if not cocok:
+            # Sampel yang sudah terkumpul tetap dipakai untuk kalibrasi penuh
+            return [self._event("calibration_drift", now, offset=[round(float(v), 3) for v in selisih])]
+        x, y = profil["position"]["mean"]
+        self.calibration_stats.mean[:] = (x * w, y * h)  # baseline profil, bukan rata-rata cek singkat
+        if profil.get("pose"):
+            self.calibration_pose.mean[:] = profil["pose"]["mean"]
+        self.profile_used = profil
+        return self._selesai_kalibrasi(now, "profile")
+
+    def _selesai_kalibrasi(self, now, sumber):
+        events = []
+        if len(self.calibration_stats):
+            x_mean, y_mean = self.calibration_stats.mean
+            self.baseline_nose = (int(x_mean), 0)
+            self.baseline_face_center = (0, int(y_mean))
+            self.baseline_pose = tuple(self.calibration_pose.mean.tolist()) if len(self.calibration_pose) else None
+            self.is_calibrated = True
+            events.append(self._event("calibrated", now, baseline=[int(x_mean), int(y_mean)], source=sumber,
+                                      samples=len(self.calibration_stats),
+                                      seconds=round(now - self.calibration_start_time, 2)))
+        self.is_calibrating = False
+        return events
+
+    def _update_pengawasan(self, fitur, w, h, now):
+        cfg = self.config
+        if cfg.use_pose and fitur.pose is not None and self.baseline_pose is not None:
+            raw_percent = direction_percents(
+                fitur.pose[0] - self.baseline_pose[0], -(fitur.pose[1] - self.baseline_pose[1]),
+                *cfg.pose_scale, max_percent=None)
+        else:
+            raw_percent = direction_percents(
+                fitur.x_n - self.baseline_nose[0], fitur.y_face_center - self.baseline_face_center[1],
+                w * 0.4, h * 0.4, max_percent=None)
+        final_right, final_left, final_up, final_down = self.smoother.update(raw_percent, now).astype(int).tolist()
+        self.percents = (final_right, final_left, final_up, final_down)
+
+        is_turning = final_right > cfg.turn_threshold_percent or final_left > cfg.turn_threshold_percent
+        is_nodding = final_up > cfg.nod_threshold_percent or final_down > cfg.nod_threshold_percent
+
+        events = []
+        if is_turning or is_nodding:
+            if self.deviation_start_time is None:
+                self.deviation_start_time = now
+            completed_intervals = int((now - self.deviation_start_time) / cfg.deviation_duration_seconds)
+            if completed_intervals > self.violations_logged_this_deviation:
+                self.event_timestamps.append(now)
+                self.violations_logged_this_deviation = completed_intervals
+                self.violations_total += 1
+
+                if is_turning:
+                    arah = "kanan" if final_right > final_left else "kiri"
+                else:
+                    arah = "atas" if final_up > final_down else "bawah"
+                besar = dict(zip(("kanan", "kiri", "atas", "bawah"), self.percents))[arah]
+                events.append(self._event("violation", now, direction=arah, magnitude=besar,
+                                          count=len(self.event_timestamps)))
+        else:
+            self.deviation_start_time = None
+            self.violations_logged_this_deviation = 0
+
+        while self.event_timestamps and self.event_timestamps[0] < now - cfg.warning_window_seconds:
+            self.event_timestamps.popleft()
+        return events
+
+    @property
+    def violations_in_window(self):
+        return len(self.event_timestamps)
+
+    @property
+    def warning(self):
+        return self.is_calibrated and len(self.event_timestamps) >= self.config.warning_count_threshold
+
+
+def teks_pelanggaran(event):
+    """Format event pelanggaran seperti log terminal branch.py."""
+    arah = event["direction"]
+    jenis = "Menoleh" if arah in ("kanan", "kiri") else "Menunduk"
+    return f"--> PELANGGARAN #{event['count']} terdeteksi: {jenis} ke {arah.upper()}"
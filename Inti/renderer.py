@@ -0,0 +1,170 @@
+import cv2
+import numpy as np
+
+# --- TATA LETAK GAME (sama dengan TempleRunGame.draw_game) ---
+GAME_AREA_X = 100
+GAME_AREA_WIDTH = 600
+INFO_PANEL_X = GAME_AREA_X + GAME_AREA_WIDTH + 50
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+
+def _beririsan(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+class GameRenderer:
+    """
+    Renderer jendela game dengan layer statis yang di-cache per resolusi.
+    Background, lane dan teks yang tidak pernah berubah digambar sekali; setiap frame hanya
+    area yang kotor di frame sebelumnya (sprite, teks sementara) yang dipulihkan dari cache,
+    lalu sprite baru digambar ke buffer yang sama. Biaya render mengikuti luas sprite, bukan resolusi layar.
+    """
+
+    def __init__(self):
+        self.ukuran = None
+        self.statis = None
+        self.buffer = None
+        self._kotor = []   # kotak (x0, y0, x1, y1) yang harus dipulihkan di awal frame berikutnya
+        self._hud = {}     # kunci -> (teks, kotak) untuk teks HUD yang hanya digambar ulang jika berubah
+        self.piksel_dipulihkan = 0
+
+    # --- LAYER STATIS ---
+    def _gambar_statis(self, h, w):
+        statis = np.zeros((h, w, 3), dtype=np.uint8)
+        cv2.rectangle(statis, (GAME_AREA_X, 0), (GAME_AREA_X + GAME_AREA_WIDTH, h), (50, 50, 50), -1)
+        for i in range(1, 3):
+            x = GAME_AREA_X + i * (GAME_AREA_WIDTH // 3)
+            cv2.line(statis, (x, 0), (x, h), (255, 255, 255), 2)
+        cv2.putText(statis, "ESC: Keluar", (INFO_PANEL_X, h - 150), FONT, 0.7, (255, 255, 255), 1)
+        cv2.putText(statis, "R: Reset", (INFO_PANEL_X, h - 120), FONT, 0.7, (255, 255, 255), 1)
+        return statis
+
+    def mulai(self, h, w):
+        """Siapkan buffer untuk frame baru: pulihkan area kotor dari layer statis. Kembalikan buffer."""
+        if self.ukuran != (h, w):
+            self.ukuran = (h, w)
+            self.statis = self._gambar_statis(h, w)
+            self.buffer = self.statis.copy()
+            self._kotor = []
+            self._hud = {}
+            return self.buffer
+
+        for kotak in self._kotor:
+            x0, y0, x1, y1 = kotak
+            self.buffer[y0:y1, x0:x1] = self.statis[y0:y1, x0:x1]
+            self.piksel_dipulihkan += (x1 - x0) * (y1 - y0)
+            self._batalkan_hud(kotak)
+        self._kotor = []
+        return self.buffer
+
+    def _batalkan_hud(self, kotak):
+        """Teks HUD yang tertimpa area `kotak` dihapus seluruhnya agar digambar ulang utuh."""
+        for kunci, (_, kotak_hud) in list(self._hud.items()):
+            if _beririsan(kotak, kotak_hud):
+                x0, y0, x1, y1 = kotak_hud
+                self.buffer[y0:y1, x0:x1] = self.statis[y0:y1, x0:x1]
+                del self._hud[kunci]
+
+    def _tandai(self, x0, y0, x1, y1):
+        h, w = self.ukuran
+        x0, y0 = max(0, int(x0)), max(0, int(y0))
+        x1, y1 = min(w, int(x1)), min(h, int(y1))
+        if x0 < x1 and y0 < y1:
+            self._kotor.append((x0, y0, x1, y1))
+            return x0, y0, x1, y1
+        return None
+
+    @staticmethod
+    def _kotak_teks(teks, org, skala, tebal):
+        (tw, th), baseline = cv2.getTextSize(teks, FONT, skala, tebal)
+        x, y = org
+        return x - tebal, y - th - tebal, x + tw + tebal, y + baseline + tebal
+
+    # --- PRIMITIF (menggambar + mencatat area kotor) ---
+    def rectangle(self, p1, p2, warna, tebal=1):
+        cv2.rectangle(self.buffer, p1, p2, warna, tebal)
+        m = max(tebal, 1)
+        self._tandai(min(p1[0], p2[0]) - m, min(p1[1], p2[1]) - m, max(p1[0], p2[0]) + m + 1, max(p1[1], p2[1]) + m + 1)
+
+    def circle(self, pusat, radius, warna, tebal=1):
+        cv2.circle(self.buffer, pusat, radius, warna, tebal)
+        m = radius + max(tebal, 1) + 1
+        self._tandai(pusat[0] - m, pusat[1] - m, pusat[0] + m + 1, pusat[1] + m + 1)
+
+    def text(self, teks, org, skala, warna, tebal=1, font=FONT):
+        cv2.putText(self.buffer, teks, org, font, skala, warna, tebal)
+        self._tandai(*self._kotak_teks(teks, org, skala, tebal))
+
+    def hud(self, kunci, teks, org, skala, warna, tebal=1):
+        """Teks yang bertahan antar frame: hanya dihapus & digambar ulang saat isinya berubah."""
+        lama = self._hud.get(kunci)
+        if lama is not None and lama[0] == teks:
+            return
+        if lama is not None:
+            x0, y0, x1, y1 = lama[1]
+            self.buffer[y0:y1, x0:x1] = self.statis[y0:y1, x0:x1]
+        cv2.putText(self.buffer, teks, org, FONT, skala, warna, tebal)
+        h, w = self.ukuran
+        x0, y0, x1, y1 = self._kotak_teks(teks, org, skala, tebal)
+        self._hud[kunci] = (teks, (max(0, x0), max(0, y0), min(w, x1), min(h, y1)))
+
+    def redupkan(self, x0, y0, x1, y1, alpha=0.2):
+        """Gelapkan satu area saja (pengganti image.copy() + addWeighted satu layar penuh)."""
+        kotak = self._tandai(x0, y0, x1, y1)
+        if kotak is None:
+            return
+        x0, y0, x1, y1 = kotak
+        roi = self.buffer[y0:y1, x0:x1]
+        cv2.addWeighted(roi, alpha, roi, 0, 0, dst=roi)
+        self._batalkan_hud(kotak)
+
+    # --- GAME ---
+    def render_game(self, game, alpha=1.0):
+        """Gambar sprite, player, HUD dan layar game over (hasil sama dengan TempleRunGame.draw_game)."""
+        h, w = self.ukuran
+        player_x, geser_y = game.posisi_render(alpha)
+        for obs in game.obstacles.kotak():
+            y = obs[1] + geser_y
+            self.rectangle((int(obs[0] - obs[2]//2), int(y - obs[3]//2)),
+                           (int(obs[0] + obs[2]//2), int(y + obs[3]//2)), (0, 0, 255), -1)
+        for coin in game.coins.kotak():
+            self.circle((int(coin[0]), int(coin[1] + geser_y)), 15, (0, 255, 255), -1)
+
+        pemain = (int(player_x), int(game.player_y))
+        self.circle(pemain, 30, (0, 255, 0), -1)
+        self.circle(pemain, 30, (255, 255, 255), 3)
+
+        self.hud("score", f"Score: {game.score}", (INFO_PANEL_X, 100), 1, (255, 255, 255), 2)
+        self.hud("speed", f"Speed: {int(game.speed)}", (INFO_PANEL_X, 150), 1, (255, 255, 255), 2)
+
+        if game.game_over:
+            self.redupkan(w//2-200, h//2-100, w//2+201, h//2+101)
+            self.text("GAME OVER!", (w//2-120, h//2-20), 1.5, (0, 0, 255), 3)
+            self.text(f"Final Score: {game.score}", (w//2-100, h//2+20), 1, (255, 255, 255), 2)
+            self.text("Tekan 'R' untuk main lagi", (w//2-150, h//2+60), 0.8, (255, 255, 0), 2)
+        return self.buffer
+
+
+class FullRedrawRenderer:
+    """Perilaku lama: frame hitam baru setiap frame lalu semua digambar ulang (CACHED_RENDER = False)."""
+
+    def __init__(self):
+        self.buffer = None
+
+    def mulai(self, h, w):
+        self.buffer = np.zeros((h, w, 3), dtype=np.uint8)
+        return self.buffer
+
+    def rectangle(self, p1, p2, warna, tebal=1):
+        cv2.rectangle(self.buffer, p1, p2, warna, tebal)
+
+    def text(self, teks, org, skala, warna, tebal=1, font=FONT):
+        cv2.putText(self.buffer, teks, org, font, skala, warna, tebal)
+
+    def render_game(self, game, alpha=1.0):
+        game.draw_game(self.buffer, alpha)
+        return self.buffer
+
+
+def buat_renderer(cached=True):
+    return GameRenderer() if cached else FullRedrawRenderer()
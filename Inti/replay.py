@@ -0,0 +1,126 @@
+import argparse
+import time
+
+import numpy as np
+
+from head_features import HeadFeatures, batch_features
+from landmark_trace import PENANDA_KALIBRASI, TraceReader
+from proctoring import ProctorConfig, ProctorSession
+from tracking import HeadTracker
+
+# --- KONFIGURASI DEFAULT ---
+CHUNK_FRAMES = 4096  # frame yang dibaca & dihitung fiturnya sekaligus dari memmap
+
+
+def fitur_potongan(trace, awal, akhir):
+    """
+    Hitung fitur wajah utama untuk frame [awal, akhir) sekaligus (tanpa FaceMesh).
+    Jika trace menyimpan lebih dari satu wajah, wajah utama = wajah dengan kotak terbesar (seperti wajah_utama).
+    """
+    n_faces = trace.records["n_faces"][awal:akhir].astype(np.int64)
+    lm = trace.landmarks(awal, akhir, 0)
+    if trace.max_faces > 1:
+        semua = np.stack([lm] + [trace.landmarks(awal, akhir, j) for j in range(1, trace.max_faces)], axis=1)
+        # Reduksi per kolom yang contiguous: jauh lebih cepat daripada max(axis=2) pada [..., :2]
+        x, y = np.ascontiguousarray(semua[..., 0]), np.ascontiguousarray(semua[..., 1])
+        luas = (x.max(axis=2) - x.min(axis=2)) * (y.max(axis=2) - y.min(axis=2))
+        luas[np.arange(trace.max_faces)[None, :] >= n_faces[:, None]] = -1
+        lm = semua[np.arange(len(semua)), luas.argmax(axis=1)]
+    w = trace.records["w"][awal:akhir]
+    h = trace.records["h"][awal:akhir]
+    return batch_features(lm, w, h), n_faces
+
+
+def iterasi_fitur(trace, chunk_frames=CHUNK_FRAMES):
+    """Hasilkan (t, w, h, fitur atau None, jumlah wajah, penanda) per frame."""
+    for awal in range(0, len(trace), chunk_frames):
+        akhir = min(awal + chunk_frames, len(trace))
+        kolom, n_faces = fitur_potongan(trace, awal, akhir)
+        rec = trace.records[awal:akhir]
+        baris = zip(rec["t"].tolist(), rec["w"].tolist(), rec["h"].tolist(), n_faces.tolist(),
+                    rec["flags"].tolist(), kolom["x_n"].tolist(), kolom["y_n"].tolist(),
+                    kolom["x_eye_center"].tolist(), kolom["y_min"].tolist(), kolom["y_max"].tolist())
+        for t, w, h, jumlah, penanda, x_n, y_n, x_eye_center, y_min, y_max in baris:
+            fitur = None
+            if jumlah:
+                fitur = HeadFeatures.from_values(x_n, y_n, x_eye_center, y_min, y_max)
+            yield t, w, h, fitur, jumlah, penanda
+
+
+def replay_tracker(trace, args):
+    """Logika main.py: kalibrasi kotak -> siap -> persentase arah (smoothing + deadzone)."""
+    tracker = HeadTracker(args.smoothing_frames, args.smoothing_filter, args.deadzone)
+    keluaran = []
+    for t, w, h, fitur, _, penanda in iterasi_fitur(trace):
+        if penanda & PENANDA_KALIBRASI:
+            tracker.reset()
+        if tracker.update(fitur, w, h, t) == tracker.TRACKING:
+            keluaran.append(tracker.percents)
+
+    keluaran = np.array(keluaran, dtype=np.int64).reshape(-1, 4)
+    ringkasan = {"frame_tracking": len(keluaran)}
+    if len(keluaran):
+        ringkasan["frame_bergerak"] = float((keluaran.max(axis=1) > 0).mean())
+        # Jitter: rata-rata perubahan persentase antar frame (makin kecil makin mulus)
+        ringkasan["jitter"] = float(np.abs(np.diff(keluaran, axis=0)).mean()) if len(keluaran) > 1 else 0.0
+        ringkasan["maks"] = dict(zip(("kanan", "kiri", "atas", "bawah"), keluaran.max(axis=0).tolist()))
+    return ringkasan
+
+
+def replay_proctor(trace, args):
+    """Logika branch.py: kalibrasi sesuai rekaman (tombol 'c'), atau otomatis di frame pertama."""
+    config = ProctorConfig(
+        smoothing_frames=args.smoothing_frames, smoothing_filter=args.smoothing_filter,
+        calibration_time=args.calibration_time, turn_threshold_percent=args.turn_threshold,
+        nod_threshold_percent=args.nod_threshold, deviation_duration_seconds=args.deviation_seconds,
+        warning_window_seconds=args.warning_window, warning_count_threshold=args.warning_count)
+    sesi = ProctorSession("replay", config)
+    ada_penanda = bool((trace.records["flags"] & PENANDA_KALIBRASI).any())
+    pelanggaran = []
+    frame_warning = 0
+    multi_wajah = 0
+    for i, (t, w, h, fitur, jumlah, penanda) in enumerate(iterasi_fitur(trace)):
+        if (penanda & PENANDA_KALIBRASI) or (i == 0 and not ada_penanda):
+            sesi.start_calibration(t)
+        for event in sesi.update(fitur, w, h, t):
+            if event["type"] == "violation":
+                pelanggaran.append(event)
+        frame_warning += sesi.warning
+        multi_wajah += jumlah > 1
+
+    per_arah = {}
+    for event in pelanggaran:
+        per_arah[event["direction"]] = per_arah.get(event["direction"], 0) + 1
+    return {
+        "pelanggaran": len(pelanggaran),
+        "per_arah": per_arah,
+        "frame_warning": frame_warning,
+        "frame_multi_wajah": multi_wajah,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay rekaman landmark ke logika tracking tanpa kamera & FaceMesh")
+    parser.add_argument("traces", nargs="+", help="file trace hasil RECORD_TRACE")
+    parser.add_argument("--mode", choices=("tracker", "proctor"), default="proctor",
+                        help="tracker = logika main.py, proctor = logika branch.py")
+    parser.add_argument("--smoothing-frames", type=int, default=7)
+    parser.add_argument("--smoothing-filter", default="moving_average")
+    parser.add_argument("--deadzone", type=int, default=4)
+    parser.add_argument("--calibration-time", type=float, default=3)
+    parser.add_argument("--turn-threshold", type=int, default=17)
+    parser.add_argument("--nod-threshold", type=int, default=9)
+    parser.add_argument("--deviation-seconds", type=float, default=2)
+    parser.add_argument("--warning-window", type=float, default=60)
+    parser.add_argument("--warning-count", type=int, default=3)
+    args = parser.parse_args()
+
+    for path in args.traces:
+        trace = TraceReader(path)
+        mulai = time.perf_counter()
+        ringkasan = (replay_tracker if args.mode == "tracker" else replay_proctor)(trace, args)
+        durasi = time.perf_counter() - mulai
+        print(f"{path}: {len(trace)} frame, {trace.durasi:.0f} s rekaman, replay {durasi:.2f} s "
+              f"({len(trace) / durasi if durasi else 0:.0f} frame/s)")
+        for kunci, nilai in ringkasan.items():
+            print(f"  {kunci}: {nilai}")
@@ -0,0 +1,127 @@
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from face_count import indeks_wajah_utama
+from head_features import LandmarkResult, landmarks_to_array
+
+
+def buat_model_cari(max_num_faces=1, refine_landmarks=True, min_detection_confidence=0.5):
+    """FaceMesh static_image_mode untuk pencarian RoiFaceMesh di frame penuh: selalu deteksi, tanpa state tracking."""
+    return mp.solutions.face_mesh.FaceMesh(static_image_mode=True, max_num_faces=max_num_faces,
+                                           refine_landmarks=refine_landmarks,
+                                           min_detection_confidence=min_detection_confidence)
+
+
+class RoiFaceMesh:
+    """
+    Pembungkus `face_mesh.process` yang menjalankan inferensi di crop persegi sekitar wajah.
+
+    Kotak wajah diambil dari landmark frame sebelumnya, diberi padding, lalu di-resize ke
+    `roi_size` x `roi_size`. Landmark hasil crop dipetakan balik ke koordinat ternormalisasi
+    frame penuh, jadi perhitungan persentase di skrip tidak berubah. Jika wajah hilang di crop,
+    pencarian langsung diulang di frame penuh (diperkecil ke `search_width`).
+
+    FaceMesh legacy membawa ROI tracking antar panggilan dalam koordinat ternormalisasi input sebelumnya,
+    jadi crop dan frame penuh tidak boleh bergantian di satu model. Pencarian frame penuh memakai
+    `search_process` (lihat `buat_model_cari`); None = `process` yang sama, hanya untuk model tanpa state.
+    """
+
+    def __init__(self, process, roi_size=256, padding=0.6, search_width=640, full_interval=30,
+                 search_process=None):
+        self.inner = process
+        self.search = search_process or process
+        self.roi_size = roi_size
+        self.padding = padding
+        self.search_width = search_width
+        self.full_interval = full_interval  # cari ulang di frame penuh tiap N frame (0 = tidak pernah)
+        self.crop = None  # (x0, y0, sisi) dalam piksel frame penuh
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.lost = 0
+        self._frame_sejak_penuh = 0
+
+    def reset(self):
+        self.crop = None
+
+    def process(self, rgb):
+        self._frame_sejak_penuh += 1
+        if self.crop is not None and not (self.full_interval and self._frame_sejak_penuh >= self.full_interval):
+            hasil = self._proses_roi(rgb)
+            if hasil.multi_face_landmarks:
+                return hasil
+            self.lost += 1
+        return self._proses_penuh(rgb)
+
+    # --- INFERENSI ---
+    def _proses_penuh(self, rgb):
+        self.full_frames += 1
+        self._frame_sejak_penuh = 0
+        h, w = rgb.shape[:2]
+        masukan = rgb
+        if self.search_width and w > self.search_width:
+            # Koordinat ternormalisasi tidak berubah oleh skala seragam, jadi tidak perlu dipetakan
+            skala = self.search_width / w
+            masukan = cv2.resize(rgb, (self.search_width, int(h * skala)), interpolation=cv2.INTER_AREA)
+        results = self.search(masukan)
+        wajah = [landmarks_to_array(f) for f in (results.multi_face_landmarks or [])]
+        self._perbarui_crop(wajah, w, h, paksa=True)
+        return LandmarkResult(wajah)
+
+    def _proses_roi(self, rgb):
+        self.roi_frames += 1
+        h, w = rgb.shape[:2]
+        x0, y0, sisi = self.crop
+        potongan = rgb[y0:y0 + sisi, x0:x0 + sisi]
+        interpolasi = cv2.INTER_AREA if sisi > self.roi_size else cv2.INTER_LINEAR
+        masukan = cv2.resize(potongan, (self.roi_size, self.roi_size), interpolation=interpolasi)
+        results = self.inner(masukan)
+
+        wajah = []
+        for face_landmarks in results.multi_face_landmarks or []:
+            lm = landmarks_to_array(face_landmarks).copy()
+            lm[:, 0] = (lm[:, 0] * sisi + x0) / w
+            lm[:, 1] = (lm[:, 1] * sisi + y0) / h
+            lm[:, 2] *= sisi / w  # z MediaPipe berskala lebar gambar
+            wajah.append(lm)
+        self._perbarui_crop(wajah, w, h)
+        return LandmarkResult(wajah)
+
+    # --- KOTAK WAJAH ---
+    def _perbarui_crop(self, wajah, w, h, paksa=False):
+        if not wajah:
+            self.crop = None
+            return
+        lm = wajah[indeks_wajah_utama(wajah)]  # ikuti wajah yang sama dengan wajah_utama di skrip
+        x_min, y_min = lm[:, 0].min() * w, lm[:, 1].min() * h
+        x_max, y_max = lm[:, 0].max() * w, lm[:, 1].max() * h
+
+        # Crop hanya digeser jika wajah mendekati tepi crop atau ukurannya berubah jauh,
+        # supaya input ke FaceMesh stabil antar frame
+        if self.crop is not None and not paksa:
+            x0, y0, sisi = self.crop
+            margin = sisi * 0.1
+            ukuran = max(x_max - x_min, y_max - y_min) * (1 + 2 * self.padding)
+            di_dalam = (x_min > x0 + margin and y_min > y0 + margin
+                        and x_max < x0 + sisi - margin and y_max < y0 + sisi - margin)
+            if di_dalam and 0.8 < ukuran / sisi < 1.25:
+                return
+
+        sisi = int(max(x_max - x_min, y_max - y_min) * (1 + 2 * self.padding))
+        sisi = max(16, min(sisi, w, h))
+        cx, cy = (x_min + x_max) / 2, (y_min + y_max) / 2
+        x0 = int(np.clip(cx - sisi / 2, 0, w - sisi))
+        y0 = int(np.clip(cy - sisi / 2, 0, h - sisi))
+        self.crop = (x0, y0, sisi)
+
+    def box_piksel(self):
+        """Kotak crop saat ini (x1, y1, x2, y2) untuk digambar, atau None."""
+        if self.crop is None:
+            return None
+        x0, y0, sisi = self.crop
+        return x0, y0, x0 + sisi, y0 + sisi
+
+    def ringkasan(self):
+        total = max(self.roi_frames + self.full_frames, 1)
+        return (f"ROI: {self.roi_frames} frame di crop, {self.full_frames} frame penuh "
+                f"({100 * self.roi_frames / total:.0f}% crop), wajah hilang di crop {self.lost}x")
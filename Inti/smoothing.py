@@ -0,0 +1,209 @@
+import math
+import time
+
+import numpy as np
+
+
+def _bentuk(shape):
+    return (shape,) if isinstance(shape, int) else tuple(shape)
+
+
+# --- MOVING AVERAGE (running sum) ---
+class MovingAverage:
+    """
+    Rata-rata N sampel terakhir dengan running sum: O(1) per update, berapa pun N-nya.
+    Semua channel (mis. kanan/kiri/atas/bawah, atau satu baris per wajah) difilter sekaligus.
+    """
+
+    def __init__(self, shape, window):
+        self.window = window
+        self._buffer = np.zeros((window,) + _bentuk(shape), dtype=np.float64)
+        self._sum = np.zeros(_bentuk(shape), dtype=np.float64)
+        self._idx = 0
+        self._count = 0
+
+    def update(self, x, t=None):
+        if self._count == self.window:
+            self._sum -= self._buffer[self._idx]
+        else:
+            self._count += 1
+        self._buffer[self._idx] = x
+        self._sum += self._buffer[self._idx]
+        self._idx += 1
+        if self._idx == self.window:
+            # Hitung ulang sum sekali per putaran agar galat pembulatan tidak menumpuk
+            self._idx = 0
+            self._buffer.sum(axis=0, out=self._sum)
+        return self.value
+
+    @property
+    def value(self):
+        if self._count == 0:
+            return np.zeros_like(self._sum)
+        return self._sum / self._count
+
+    def __len__(self):
+        return self._count
+
+    def reset(self):
+        self._buffer.fill(0)
+        self._sum.fill(0)
+        self._idx = 0
+        self._count = 0
+
+
+# --- MOVING AVERAGE PER BARIS ---
+class MovingAverageRows:
+    """
+    Moving average untuk banyak baris independen (mis. satu baris per identitas wajah).
+    Setiap baris punya jendela & jumlah sampel sendiri, hanya diperbarui saat barisnya terlihat,
+    dan bisa di-reset sendiri ketika slot identitas dipakai ulang.
+    """
+
+    def __init__(self, rows, channels, window):
+        self.window = window
+        self._buffer = np.zeros((rows, window, channels), dtype=np.float64)
+        self._sum = np.zeros((rows, channels), dtype=np.float64)
+        self._idx = np.zeros(rows, dtype=np.int64)
+        self._count = np.zeros(rows, dtype=np.int64)
+
+    def update(self, rows, x):
+        """rows: indeks baris (F,) tanpa duplikat, x: (F, channels). Kembalikan rata-rata baris tersebut."""
+        rows = np.asarray(rows)
+        i = self._idx[rows]
+        penuh = self._count[rows] == self.window
+        self._sum[rows] -= self._buffer[rows, i] * penuh[:, None]
+        self._buffer[rows, i] = x
+        self._sum[rows] += self._buffer[rows, i]
+        i = (i + 1) % self.window
+        self._idx[rows] = i
+        self._count[rows] = np.minimum(self._count[rows] + 1, self.window)
+        putaran = rows[i == 0]
+        if len(putaran):
+            # Hitung ulang sum sekali per putaran agar galat pembulatan tidak menumpuk
+            self._sum[putaran] = self._buffer[putaran].sum(axis=1)
+        return self._sum[rows] / self._count[rows][:, None]
+
+    def reset(self, rows):
+        self._buffer[rows] = 0
+        self._sum[rows] = 0
+        self._idx[rows] = 0
+        self._count[rows] = 0
+
+
+# --- ONE EURO FILTER ---
+class OneEuroFilter:
+    """
+    Low-pass adaptif (Casiez dkk., 2012): cutoff naik saat kepala bergerak cepat sehingga lag kecil,
+    dan turun saat diam sehingga jitter tetap teredam.
+    """
+
+    def __init__(self, shape, min_cutoff=1.0, beta=0.02, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self._x = np.zeros(_bentuk(shape), dtype=np.float64)
+        self._dx = np.zeros(_bentuk(shape), dtype=np.float64)
+        self._t = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def update(self, x, t=None):
+        t = time.perf_counter() if t is None else t
+        x = np.asarray(x, dtype=np.float64)
+        if self._t is None:
+            self._x[...] = x
+            self._dx.fill(0)
+            self._t = t
+            return self._x.copy()
+
+        dt = max(t - self._t, 1e-6)
+        self._t = t
+        dx = (x - self._x) / dt
+        self._dx += self._alpha(self.d_cutoff, dt) * (dx - self._dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self._dx)
+        self._x += self._alpha(cutoff, dt) * (x - self._x)
+        return self._x.copy()
+
+    @property
+    def value(self):
+        return self._x.copy()
+
+    def reset(self):
+        self._x.fill(0)
+        self._dx.fill(0)
+        self._t = None
+
+
+# --- KALMAN KECEPATAN KONSTAN ---
+class ConstantVelocityKalman:
+    """
+    Kalman per channel dengan state [posisi, kecepatan]. Matriks kovarians 2x2 disimpan
+    sebagai tiga array (p00, p01, p11) sehingga semua channel diperbarui dalam satu langkah.
+    """
+
+    def __init__(self, shape, process_noise=5e4, measurement_noise=9.0):
+        self.q = process_noise       # varians percepatan (satuan^2/detik^4)
+        self.r = measurement_noise   # varians noise pengukuran (satuan^2)
+        bentuk = _bentuk(shape)
+        self._pos = np.zeros(bentuk)
+        self._vel = np.zeros(bentuk)
+        self._p00 = np.zeros(bentuk)
+        self._p01 = np.zeros(bentuk)
+        self._p11 = np.zeros(bentuk)
+        self._t = None
+
+    def update(self, x, t=None):
+        t = time.perf_counter() if t is None else t
+        x = np.asarray(x, dtype=np.float64)
+        if self._t is None:
+            self._pos[...] = x
+            self._vel.fill(0)
+            self._p00.fill(self.r)
+            self._p01.fill(0)
+            self._p11.fill(self.r)
+            self._t = t
+            return self._pos.copy()
+
+        dt = max(t - self._t, 1e-6)
+        self._t = t
+
+        # Prediksi
+        self._pos += self._vel * dt
+        p00 = self._p00 + dt * (2 * self._p01 + dt * self._p11) + self.q * dt ** 4 / 4
+        p01 = self._p01 + dt * self._p11 + self.q * dt ** 3 / 2
+        p11 = self._p11 + self.q * dt ** 2
+
+        # Koreksi dengan pengukuran
+        s = p00 + self.r
+        k0, k1 = p00 / s, p01 / s
+        inovasi = x - self._pos
+        self._pos += k0 * inovasi
+        self._vel += k1 * inovasi
+        self._p00 = (1 - k0) * p00
+        self._p01 = (1 - k0) * p01
+        self._p11 = p11 - k1 * p01
+        return self._pos.copy()
+
+    @property
+    def value(self):
+        return self._pos.copy()
+
+    def reset(self):
+        for arr in (self._pos, self._vel, self._p00, self._p01, self._p11):
+            arr.fill(0)
+        self._t = None
+
+
+def buat_filter(jenis, shape, window=7, **kwargs):
+    """Buat filter smoothing: "moving_average", "one_euro" atau "kalman"."""
+    if jenis == "moving_average":
+        return MovingAverage(shape, window)
+    if jenis == "one_euro":
+        return OneEuroFilter(shape, **kwargs)
+    if jenis == "kalman":
+        return ConstantVelocityKalman(shape, **kwargs)
+    raise ValueError(f"Jenis filter tidak dikenal: {jenis}")
@@ -0,0 +1,178 @@
+import os
+import threading
+import time
+
+import mediapipe as mp
+import numpy as np
+from mediapipe.tasks.python import BaseOptions
+from mediapipe.tasks.python import vision
+
+from head_features import LandmarkResult, pose_from_matrix
+from pipeline import LatestSlot, SequentialSource
+
+# --- KONFIGURASI DEFAULT ---
+# Model yang sama dengan aplikasi Flutter
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                          "App", "comvis_app", "assets", "models", "face_landmarker.task")
+MAX_IN_FLIGHT = 2   # frame yang boleh sedang diproses MediaPipe sekaligus; frame kamera lain dibuang
+BATAS_PENDING = 1.0  # detik; frame yang tidak pernah mendapat callback (dibuang MediaPipe) dilupakan
+
+
+def _ke_hasil(result, pose):
+    """FaceLandmarkerResult -> LandmarkResult (landmark sebagai array (N, 3), pose opsional)."""
+    wajah = [np.array([(p.x, p.y, p.z) for p in titik], dtype=np.float32) for titik in result.face_landmarks]
+    poses = []
+    if pose and result.facial_transformation_matrixes:
+        poses = [pose_from_matrix(m) for m in result.facial_transformation_matrixes]
+    return LandmarkResult(wajah, poses)
+
+
+class TasksFaceLandmarker:
+    """
+    Engine inferensi berbasis MediaPipe Tasks `FaceLandmarker` (model .task yang dibawa repo).
+    live_stream=True: frame dikirim lewat `submit` dan hasilnya datang di callback tanpa menahan pemanggil.
+    live_stream=False: `process(rgb)` sinkron (mode VIDEO), pengganti langsung `face_mesh.process`.
+    Hasil berupa LandmarkResult; dengan pose=True ikut berisi (yaw, pitch, roll) tiap wajah.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, num_faces=1, pose=False, live_stream=True, callback=None,
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5):
+        self.pose = pose
+        self.callback = callback  # callback(hasil, timestamp_ms) untuk mode live stream
+        self._t_terakhir = -1
+        opsi = vision.FaceLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=os.path.normpath(model_path)),
+            running_mode=vision.RunningMode.LIVE_STREAM if live_stream else vision.RunningMode.VIDEO,
+            num_faces=num_faces,
+            min_face_detection_confidence=min_detection_confidence,
+            min_face_presence_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            output_facial_transformation_matrixes=pose,
+            result_callback=self._hasil if live_stream else None)
+        self.landmarker = vision.FaceLandmarker.create_from_options(opsi)
+
+    def timestamp(self, t_ms=None):
+        # MediaPipe menuntut timestamp naik terus
+        t_ms = int(time.perf_counter() * 1000) if t_ms is None else int(t_ms)
+        self._t_terakhir = max(t_ms, self._t_terakhir + 1)
+        return self._t_terakhir
+
+    def _hasil(self, result, _image, timestamp_ms):
+        if self.callback is not None:
+            self.callback(_ke_hasil(result, self.pose), timestamp_ms)
+
+    def submit(self, rgb, t_ms=None):
+        """Kirim satu frame RGB (live stream) tanpa menunggu hasil. Kembalikan timestamp yang dipakai."""
+        t_ms = self.timestamp(t_ms)
+        self.landmarker.detect_async(mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb), t_ms)
+        return t_ms
+
+    def process(self, rgb):
+        """Inferensi sinkron satu frame RGB (mode VIDEO)."""
+        result = self.landmarker.detect_for_video(mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb),
+                                                  self.timestamp())
+        return _ke_hasil(result, self.pose)
+
+    def close(self):
+        self.landmarker.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TasksPipeline(SequentialSource):
+    """
+    Sumber frame dengan FaceLandmarker mode LIVE_STREAM: thread capture mengirim frame ke MediaPipe
+    dan langsung lanjut membaca kamera; hasil masuk lewat callback ke slot tunggal (latest-frame-wins).
+    Antarmukanya sama dengan TrackingPipeline (iterasi, poll, selesai, stop).
+    `post(rgb, hasil)` opsional mengubah hasil sebelum masuk slot (mis. menambah jumlah wajah).
+    """
+
+    def __init__(self, cap, engine, flip=True, post=None, max_in_flight=MAX_IN_FLIGHT):
+        super().__init__(cap, None, flip)
+        self.engine = engine
+        self.engine.callback = self._callback
+        self.post = post
+        self.max_in_flight = max_in_flight
+        self._pending = {}  # timestamp_ms -> (FramePacket, rgb)
+        self._kunci = threading.Lock()
+        self._slot_hasil = LatestSlot()
+        self._berhenti = threading.Event()
+        self.dibuang_kamera = 0     # frame kamera yang tidak dikirim karena MediaPipe masih sibuk
+        self.dibuang_mediapipe = 0  # frame yang dikirim tapi tidak pernah mendapat hasil
+        self._thread = threading.Thread(target=self._loop_capture, name="capture", daemon=True)
+        self._thread.start()
+
+    @property
+    def dropped_frames(self):
+        return self.dibuang_kamera + self.dibuang_mediapipe + self._slot_hasil.dropped
+
+    @property
+    def aktif(self):
+        return self._thread.is_alive() or bool(self._pending)
+
+    def _loop_capture(self):
+        seq = 0
+        while not self._berhenti.is_set() and self.cap.isOpened():
+            seq += 1
+            paket = self._baca(seq)
+            if paket is None:
+                break
+            with self._kunci:
+                self._lupakan_basi(paket.t_capture)
+                sibuk = len(self._pending) >= self.max_in_flight
+            if sibuk:
+                self.dibuang_kamera += 1
+                self._lepas(paket)
+                continue
+            rgb = self._rgb(paket)
+            paket.t_process = time.perf_counter()
+            with self._kunci:
+                t_ms = self.engine.timestamp()
+                self._pending[t_ms] = (paket, rgb)
+            self.engine.landmarker.detect_async(mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb), t_ms)
+
+        # Tunggu hasil frame yang masih diproses, lalu tutup slot
+        batas = time.perf_counter() + BATAS_PENDING
+        while self._pending and time.perf_counter() < batas and not self._berhenti.is_set():
+            time.sleep(0.005)
+        self._slot_hasil.close()
+
+    def _lupakan_basi(self, now):
+        for t_ms, (paket, _) in list(self._pending.items()):
+            if now - paket.t_process > BATAS_PENDING:
+                del self._pending[t_ms]
+                self._lepas(paket)
+                self.dibuang_mediapipe += 1
+
+    def _callback(self, hasil, timestamp_ms):
+        with self._kunci:
+            item = self._pending.pop(timestamp_ms, None)
+            # Frame lebih lama yang belum dijawab sudah dilewati MediaPipe (flow limiter)
+            for t_ms in [t for t in self._pending if t < timestamp_ms]:
+                self._lepas(self._pending.pop(t_ms)[0])
+                self.dibuang_mediapipe += 1
+        if item is None:
+            return
+        paket, rgb = item
+        paket.results = self.post(rgb, hasil) if self.post is not None else hasil
+        paket.t_inference = time.perf_counter()
+        self._lepas(self._slot_hasil.put(paket))
+
+    def __iter__(self):
+        while True:
+            paket = self._slot_hasil.get()
+            if paket is None:
+                return
+            yield paket
+
+    def poll(self, timeout=0):
+        return self._slot_hasil.get(timeout=timeout)
+
+    def stop(self):
+        self._berhenti.set()
+        self._thread.join(timeout=1.0)
+        self._slot_hasil.close()
@@ -1,19 +1,48 @@
 import cv2
 import mediapipe as mp
-import numpy as np
 import random
 import time
-from collections import deque
+from pipeline import TrackingPipeline
+from calibration import ProfileStore, kunci_profil
+from roi_tracker import RoiFaceMesh, buat_model_cari
+from motion_gate import MotionGate
+from face_count import fitur_wajah_utama
+from tracking import HeadTracker
+from entity_pool import EntityPool
+from renderer import buat_renderer
+from game_loop import FixedTimestep
 
 # --- KONFIGURASI GAME ---
 # --- PERBAIKAN SENSITIVITAS ---
 SMOOTHING_FRAMES = 5
+SMOOTHING_FILTER = "one_euro"  # lag lebih kecil dari rata-rata 5 frame; bisa juga "moving_average"/"kalman"
 DEADZONE_THRESHOLD = 5  # Turunkan dari 8 ke 5 agar lebih responsif
 SENSITIVITY = 3.5       # Naikkan dari 2.0 ke 3.5 agar player bergerak lebih lincah
+MOVE_SCALE = 0.12       # offset hidung (bagian dari frame) untuk 100%, lebih kecil dari main.py agar responsif
+CALIBRATION_BOX = (0.2, 0.3)  # lebar, tinggi kotak "hidung di dalam kotak" (bagian dari frame)
+READY_SECONDS = 1.5     # jeda "GET READY!" maksimal; selesai lebih awal jika posisi netral sudah stabil
+# Profil kalibrasi (sama dengan main.py, satu kunci per pengguna/komputer): jika posisi netral tidak bergeser,
+# kotak & jeda dilewati. None = selalu kalibrasi.
+PROFILE_STORE = None    # mis. "calibration_profiles.json"
+PROFILE_USER = "default"
+ROI_MODE = False        # inferensi di crop sekitar wajah, cari ulang di frame penuh jika hilang
+ROI_SIZE = 256
+MOTION_GATE = False     # lewati inferensi saat kepala diam, landmark terakhir dipakai ulang
+CACHED_RENDER = True    # layer statis di-cache, hanya sprite & HUD yang berubah yang digambar ulang
+
+# --- LOOP GAME ---
+# Simulasi berjalan dengan langkah tetap, terpisah dari FPS kamera/MediaPipe (capture & inferensi
+# selalu di thread sendiri). Speed & sensitivitas tetap dalam satuan "per frame pada REFERENCE_FPS",
+# jadi rasanya sama seperti dulu di webcam 30 FPS, berapa pun FPS kamera sebenarnya.
+SIM_HZ = 60
+REFERENCE_FPS = 30
+
+LANES = [150, 400, 650]  # posisi x tengah tiap lane
+JUMLAH_OBSTACLE = 5     # jumlah minimal obstacle & koin di layar (naikkan untuk level yang lebih sulit)
+JUMLAH_COIN = 8
 
 # --- KONFIGURASI HEAD TRACKING ---
 mp_face_mesh = mp.solutions.face_mesh
-cap = cv2.VideoCapture(0)
 
 # --- VARIABEL GAME ---
 class TempleRunGame:
@@ -23,16 +52,12 @@ class TempleRunGame:
         self.score = 0
         self.speed = 5
         self.game_over = False
-        self.kalibrasi_selesai = False
-        self.waktu_kalibrasi = 0
-        
-        self.obstacles = []
-        self.coins = []
+        self.prev_player_x = self.player_x  # state tick sebelumnya, untuk interpolasi render
+        self.dy_terakhir = 0.0
         
-        self.percent_right_hist = deque(maxlen=SMOOTHING_FRAMES)
-        self.percent_left_hist = deque(maxlen=SMOOTHING_FRAMES)
-        self.percent_up_hist = deque(maxlen=SMOOTHING_FRAMES)
-        self.percent_down_hist = deque(maxlen=SMOOTHING_FRAMES)
+        # Obstacle & koin disimpan sebagai array (struct-of-arrays), bukan list [x, y, w, h]
+        self.obstacles = EntityPool(max(16, JUMLAH_OBSTACLE * 2))
+        self.coins = EntityPool(max(16, JUMLAH_COIN * 2))
         
         self.generate_initial_objects()
         
@@ -40,73 +65,81 @@ class TempleRunGame:
         # Generate obstacles
         for i in range(5):
             y = -i * 250 - 100
-            lane = random.choice([150, 400, 650]) # Disesuaikan dengan posisi lane
-            self.obstacles.append([lane, y, 80, 80])
+            lane = random.choice(LANES) # Disesuaikan dengan posisi lane
+            self.obstacles.spawn(lane, y, 80, 80)
 
         # Generate coins
         for i in range(10):
             y = -i * 120 - 50
-            lane = random.choice([150, 400, 650])
-            coin_overlap = any(abs(obs[1] - y) < 100 and obs[0] == lane for obs in self.obstacles)
-            if not coin_overlap:
-                self.coins.append([lane, y, 30, 30])
+            lane = random.choice(LANES)
+            if not self.obstacles.near(lane, y, 100):
+                self.coins.spawn(lane, y, 30, 30)
     
-    def update_objects(self, h):
-        for obs in self.obstacles:
-            obs[1] += self.speed
-        for coin in self.coins:
-            coin[1] += self.speed
-            
-        self.obstacles = [obs for obs in self.obstacles if obs[1] < h + 50]
-        self.coins = [coin for coin in self.coins if coin[1] < h + 50]
+    def update_objects(self, h, skala=1.0):
+        self.dy_terakhir = self.speed * skala
+        self.obstacles.move(dy=self.dy_terakhir)
+        self.coins.move(dy=self.dy_terakhir)
+
+        self.obstacles.cull(h + 50)
+        self.coins.cull(h + 50)
         
-        if len(self.obstacles) < 5:
-            y = min([obs[1] for obs in self.obstacles] or [0]) - random.randint(200, 400)
-            lane = random.choice([150, 400, 650])
-            self.obstacles.append([lane, y, 80, 80])
+        if len(self.obstacles) < JUMLAH_OBSTACLE:
+            y = self.obstacles.min_y() - random.randint(200, 400)
+            lane = random.choice(LANES)
+            self.obstacles.spawn(lane, y, 80, 80)
             
-        if len(self.coins) < 8:
-            y = min([coin[1] for coin in self.coins] or [0]) - random.randint(150, 300)
-            lane = random.choice([150, 400, 650])
-            coin_overlap = any(abs(obs[1] - y) < 100 and obs[0] == lane for obs in self.obstacles)
-            if not coin_overlap:
-                self.coins.append([lane, y, 30, 30])
+        if len(self.coins) < JUMLAH_COIN:
+            y = self.coins.min_y() - random.randint(150, 300)
+            lane = random.choice(LANES)
+            if not self.obstacles.near(lane, y, 100):
+                self.coins.spawn(lane, y, 30, 30)
     
     def check_collisions(self):
         player_rect = (self.player_x - 30, self.player_y - 30, 60, 60)
         
-        for obs in self.obstacles:
-            obs_rect = (obs[0] - obs[2]//2, obs[1] - obs[3]//2, obs[2], obs[3])
-            if (player_rect[0] < obs_rect[0] + obs_rect[2] and
-                player_rect[0] + player_rect[2] > obs_rect[0] and
-                player_rect[1] < obs_rect[1] + obs_rect[3] and
-                player_rect[1] + player_rect[3] > obs_rect[1]):
-                self.game_over = True
+        if self.obstacles.overlaps(*player_rect).any():
+            self.game_over = True
                 
-        for coin in self.coins[:]:
-            coin_rect = (coin[0] - coin[2]//2, coin[1] - coin[3]//2, coin[2], coin[3])
-            if (player_rect[0] < coin_rect[0] + coin_rect[2] and
-                player_rect[0] + player_rect[2] > coin_rect[0] and
-                player_rect[1] < coin_rect[1] + coin_rect[3] and
-                player_rect[1] + player_rect[3] > coin_rect[1]):
-                self.coins.remove(coin)
-                self.score += 10
+        kena = self.coins.overlaps(*player_rect)
+        self.score += 10 * self.coins.kill(kena)
     
-    def update_player_position(self, head_data, w, h):
+    def update_player_position(self, head_data, w, h, skala=1.0):
         if head_data:
             left_move, right_move, _, _ = head_data
             
             # Gerakan horizontal, /5 untuk membuatnya lebih cepat
             if right_move > 0:
-                self.player_x += SENSITIVITY * (right_move / 5)
+                self.player_x += SENSITIVITY * skala * (right_move / 5)
             elif left_move > 0:
-                self.player_x -= SENSITIVITY * (left_move / 5)
+                self.player_x -= SENSITIVITY * skala * (left_move / 5)
             
             self.player_x = max(150, min(650, self.player_x)) # Batasi posisi player di lane
             self.player_y = h - 150 # Posisi player tetap di bawah
     
-    def draw_game(self, image):
+    def tick(self, head_data, w, h):
+        """Satu langkah simulasi tetap (1/SIM_HZ detik) dengan input kepala terakhir."""
+        skala = REFERENCE_FPS / SIM_HZ
+        self.prev_player_x = self.player_x
+        self.update_player_position(head_data, w, h, skala)
+        self.update_objects(h, skala)
+        self.check_collisions()
+
+        if self.score > 0 and self.score % 50 == 0:
+            self.speed = min(self.speed + 0.05 * skala, 15)
+
+    def diam(self):
+        """Tick saat game berhenti (belum siap/wajah hilang/game over): tidak ada yang bergerak."""
+        self.prev_player_x = self.player_x
+        self.dy_terakhir = 0.0
+
+    def posisi_render(self, alpha=1.0):
+        """(x player, geser y entitas) di antara tick sebelumnya dan tick terbaru."""
+        player_x = self.prev_player_x + (self.player_x - self.prev_player_x) * alpha
+        return player_x, -(1.0 - alpha) * self.dy_terakhir
+
+    def draw_game(self, image, alpha=1.0):
         h, w, _ = image.shape
+        player_x, geser_y = self.posisi_render(alpha)
         
         # Area game utama
         game_area_x_start = 100
@@ -118,15 +151,16 @@ class TempleRunGame:
             x = game_area_x_start + i * (game_area_width // 3)
             cv2.line(image, (x, 0), (x, h), (255, 255, 255), 2)
         
-        for obs in self.obstacles:
-            cv2.rectangle(image, (int(obs[0] - obs[2]//2), int(obs[1] - obs[3]//2)), 
-                          (int(obs[0] + obs[2]//2), int(obs[1] + obs[3]//2)), (0, 0, 255), -1)
+        for obs in self.obstacles.kotak():
+            y = obs[1] + geser_y
+            cv2.rectangle(image, (int(obs[0] - obs[2]//2), int(y - obs[3]//2)), 
+                          (int(obs[0] + obs[2]//2), int(y + obs[3]//2)), (0, 0, 255), -1)
         
-        for coin in self.coins:
-            cv2.circle(image, (int(coin[0]), int(coin[1])), 15, (0, 255, 255), -1)
+        for coin in self.coins.kotak():
+            cv2.circle(image, (int(coin[0]), int(coin[1] + geser_y)), 15, (0, 255, 255), -1)
         
-        cv2.circle(image, (int(self.player_x), int(self.player_y)), 30, (0, 255, 0), -1)
-        cv2.circle(image, (int(self.player_x), int(self.player_y)), 30, (255, 255, 255), 3)
+        cv2.circle(image, (int(player_x), int(self.player_y)), 30, (0, 255, 0), -1)
+        cv2.circle(image, (int(player_x), int(self.player_y)), 30, (255, 255, 255), 3)
         
         # Info Panel di kanan
         info_panel_x = game_area_x_start + game_area_width + 50
@@ -143,85 +177,151 @@ class TempleRunGame:
             cv2.putText(image, f"Final Score: {self.score}", (w//2-100, h//2+20), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
             cv2.putText(image, "Tekan 'R' untuk main lagi", (w//2-150, h//2+60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 0), 2)
 
-# --- MAIN GAME LOOP ---
-game = TempleRunGame()
-
-# --- PERBAIKAN FULL SCREEN ---
-WINDOW_NAME = "Temple Run - Head Tracking"
-cv2.namedWindow(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN)
-cv2.setWindowProperty(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-
-with mp_face_mesh.FaceMesh(
-    max_num_faces=1, refine_landmarks=True, min_detection_confidence=0.5, min_tracking_confidence=0.5
-) as face_mesh:
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret: break
-
-        frame = cv2.flip(frame, 1)
-        h, w, _ = frame.shape
-        
-        # Buat background hitam untuk keseluruhan jendela
-        image = np.zeros((h, w, 3), dtype=np.uint8)
-        
-        results = face_mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        
-        head_data = None
-        if results.multi_face_landmarks:
-            face_landmarks = results.multi_face_landmarks[0]
-            nose = face_landmarks.landmark[1]
-            x_n, y_n = int(nose.x * w), int(nose.y * h)
-
-            if not game.kalibrasi_selesai:
-                box_w, box_h = int(w * 0.2), int(h * 0.3)
-                x1, y1 = (w - box_w) // 2, (h - box_h) // 2
-                cv2.rectangle(image, (x1, y1), (x1+box_w, y1+box_h), (0, 255, 0), 3)
-                cv2.putText(image, "Posisikan wajah di kotak", (x1 - 50, y1 - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-                if x1 < x_n < x1+box_w and y1 < y_n < y1+box_h:
-                    game.kalibrasi_selesai = True
-                    game.waktu_kalibrasi = time.time()
+def buat_tracker(profile=None):
+    """HeadTracker dengan kotak, jeda & sensitivitas game (kalibrasi, smoothing & deadzone sama seperti main.py)."""
+    # --- PERBAIKAN SENSITIVITAS --- (divisor lebih kecil)
+    return HeadTracker(SMOOTHING_FRAMES, SMOOTHING_FILTER, DEADZONE_THRESHOLD, scale=MOVE_SCALE,
+                       box=CALIBRATION_BOX, ready_seconds=READY_SECONDS, profile=profile)
+
+
+def baca_input(tracker, results, w, h, now):
+    """
+    Proses satu hasil tracker (dipanggil hanya saat ada frame kamera baru).
+    Kembalikan (head_data, status HeadTracker); head_data None berarti game berhenti.
+    """
+    status = tracker.update(fitur_wajah_utama(results, w, h), w, h, now)
+    if status != tracker.TRACKING:
+        return None, status
+    final_right, final_left, _, _ = tracker.percents
+    return (final_left, final_right, 0, 0), status  # Up/down tidak dipakai di game ini
+
+
+class GameRunner:
+    """
+    Satu permainan di jendela: game, renderer, fixed timestep dan input kepala terakhir.
+    Dipakai loop di bawah maupun mode game di app_host.py (kamera & FaceMesh milik pemanggil).
+    Kalibrasi lewat HeadTracker; dengan `profiles` (ProfileStore) posisi netral dipakai ulang & disimpan.
+    """
+
+    def __init__(self, cached_render=CACHED_RENDER, sim_hz=SIM_HZ, profiles=None, kunci=None):
+        self.game = TempleRunGame()
+        self.renderer = buat_renderer(cached_render)
+        self.timestep = FixedTimestep(sim_hz)
+        self.profiles = profiles
+        self.kunci = kunci or kunci_profil(PROFILE_USER)
+        self.profil_disimpan = False
+        self.tracker = buat_tracker(self._profil())
+        self.head_data, self.status = None, self.tracker.status
+
+    def _profil(self):
+        return self.profiles.load(self.kunci) if self.profiles is not None else None
+
+    def input(self, results, w, h):
+        """Input: hanya diproses saat tracker menghasilkan frame baru, di antaranya input terakhir dipakai."""
+        tracker = self.tracker
+        self.head_data, self.status = baca_input(tracker, results, w, h, time.time())
+        if self.status == tracker.TRACKING and self.profiles is not None and not self.profil_disimpan \
+                and tracker.profile_used is None:
+            profil = tracker.calibration_profile(w, h)
+            if profil is not None:
+                self.profiles.save(self.kunci, profil)
+                self.profil_disimpan = True
+
+    def simulasi(self, w, h):
+        """Jalankan sejumlah tick tetap sesuai waktu yang berlalu."""
+        game = self.game
+        for _ in range(self.timestep.maju()):
+            if self.head_data is not None and not game.game_over:
+                game.tick(self.head_data, w, h)
             else:
-                if time.time() - game.waktu_kalibrasi < 1.5:
-                    cv2.putText(image, "GET READY!", (w//2 - 150, h//2), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 255, 0), 3)
-                else:
-                    left_eye = face_landmarks.landmark[33]
-                    right_eye = face_landmarks.landmark[263]
-                    x_le, x_re = int(left_eye.x * w), int(right_eye.x * w)
-                    x_eye_center = (x_le + x_re) // 2
-                    
-                    # --- PERBAIKAN SENSITIVITAS --- (divisor lebih kecil)
-                    dx = x_n - x_eye_center
-                    raw_percent_right = max(0, min(100, int((dx / (w*0.12)) * 100)))
-                    raw_percent_left = max(0, min(100, int((-dx / (w*0.12)) * 100)))
-
-                    game.percent_right_hist.append(raw_percent_right)
-                    game.percent_left_hist.append(raw_percent_left)
-                    
-                    smooth_percent_right = int(np.mean(game.percent_right_hist))
-                    smooth_percent_left = int(np.mean(game.percent_left_hist))
-                    
-                    final_right = smooth_percent_right if smooth_percent_right > DEADZONE_THRESHOLD else 0
-                    final_left = smooth_percent_left if smooth_percent_left > DEADZONE_THRESHOLD else 0
-                    
-                    head_data = (final_left, final_right, 0, 0) # Up/down tidak dipakai di game ini
-                    
-                    if not game.game_over:
-                        game.update_player_position(head_data, w, h)
-                        game.update_objects(h)
-                        game.check_collisions()
-                        
-                        if game.score > 0 and game.score % 50 == 0:
-                            game.speed = min(game.speed + 0.05, 15)
-
-        game.draw_game(image)
-        cv2.imshow(WINDOW_NAME, image)
-
-        key = cv2.waitKey(5) & 0xFF
-        if key == 27: break
-        elif key == ord('r'):
-            if game.game_over:
-                game = TempleRunGame()
-            game.kalibrasi_selesai = False
-
-cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+                game.diam()
+
+    def render(self, h, w, latensi_ms):
+        """Render dengan interpolasi di antara dua tick terakhir. Kembalikan gambar jendela."""
+        game, renderer = self.game, self.renderer
+        image = renderer.mulai(h, w)
+        if self.status == HeadTracker.KALIBRASI:
+            x1, y1, x2, y2 = self.tracker.calibration_box(w, h)
+            renderer.rectangle((x1, y1), (x2, y2), (0, 255, 0), 3)
+            renderer.text("Posisikan wajah di kotak", (x1 - 50, y1 - 20), 0.7, (0, 255, 0), 2)
+        elif self.status == HeadTracker.VERIFIKASI:
+            renderer.text("Mencocokkan profil kalibrasi...", (w//2 - 250, h//2), 1, (0, 255, 255), 2)
+        elif self.status == HeadTracker.SIAP:
+            renderer.text("GET READY!", (w//2 - 150, h//2), 2, (0, 255, 0), 3)
+
+        renderer.render_game(game, self.timestep.alpha)
+        renderer.text(f"Latensi: {latensi_ms:.0f} ms", (w - 220, h - 40), 0.6, (200, 200, 200), 1)
+        return image
+
+    def tunggu_ms(self):
+        """Tunggu sampai tick berikutnya (render ~SIM_HZ, sisa CPU untuk thread inferensi)."""
+        return max(1, int(self.timestep.sisa() * 1000))
+
+    def reset(self):
+        if self.game.game_over:
+            self.game = TempleRunGame()
+        self.tracker.reset(self._profil())
+        self.profil_disimpan = False
+        self.head_data, self.status = None, self.tracker.status
+
+    def lanjut(self):
+        """Mulai ulang jam simulasi setelah jeda (mis. kembali dari menu) tanpa mengejar tick yang terlewat."""
+        self.timestep.reset()
+
+
+# --- MAIN GAME LOOP ---
+if __name__ == "__main__":
+    cap = cv2.VideoCapture(0)
+    runner = GameRunner(profiles=ProfileStore(PROFILE_STORE) if PROFILE_STORE else None)
+
+    # --- PERBAIKAN FULL SCREEN ---
+    WINDOW_NAME = "Temple Run - Head Tracking"
+    cv2.namedWindow(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN)
+    cv2.setWindowProperty(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+
+    with mp_face_mesh.FaceMesh(
+        max_num_faces=1, refine_landmarks=True, min_detection_confidence=0.5, min_tracking_confidence=0.5
+    ) as face_mesh:
+        roi = RoiFaceMesh(face_mesh.process, ROI_SIZE, search_process=buat_model_cari().process) if ROI_MODE else None
+        proses = roi.process if ROI_MODE else face_mesh.process
+        gate = MotionGate(proses) if MOTION_GATE else None
+        sumber = TrackingPipeline(cap, gate.process if MOTION_GATE else proses)
+
+        # Ukuran jendela mengikuti frame kamera pertama
+        paket = sumber.poll(timeout=5.0)
+        h, w = paket.frame.shape[:2] if paket is not None else (720, 1280)
+        frame_kamera = 0
+        t_mulai = time.perf_counter()
+
+        while paket is not None or sumber.aktif:
+            if paket is not None:
+                h, w = paket.frame.shape[:2]
+                runner.input(paket.results, w, h)
+                frame_kamera += 1
+
+            runner.simulasi(w, h)
+            image = runner.render(h, w, sumber.latency.last_ms)
+            cv2.imshow(WINDOW_NAME, image)
+            if paket is not None:
+                sumber.selesai(paket)
+
+            key = cv2.waitKey(runner.tunggu_ms()) & 0xFF
+            if key == 27: break
+            elif key == ord('r'):
+                runner.reset()
+
+            paket = sumber.poll()
+
+        sumber.stop()
+
+    durasi = time.perf_counter() - t_mulai
+    timestep = runner.timestep
+    print(f"Simulasi: {timestep.tick} tick dalam {durasi:.1f} s ({timestep.tick / max(durasi, 1e-9):.1f} Hz, "
+          f"{timestep.dilewati} dilewati), kamera/tracker {frame_kamera / max(durasi, 1e-9):.1f} FPS")
+    print(sumber.latency.ringkasan())
+    if roi is not None:
+        print(roi.ringkasan())
+    if gate is not None:
+        print(gate.ringkasan())
+    cap.release()
+    cv2.destroyAllWindows()
@@ -0,0 +1,58 @@
+from head_features import HeadFeatures
+from proctoring import ProctorConfig, ProctorSession
+
+W, H = 640, 480
+FPS = 30
+
+
+def fitur_lurus():
+    return HeadFeatures.from_values(320, 250, 320, 200, 300)
+
+
+def profil_tersimpan():
+    """Profil hasil kalibrasi penuh dengan wajah yang sama seperti fitur_lurus()."""
+    sesi = ProctorSession()
+    sesi.start_calibration(0.0)
+    for i in range(4 * FPS):
+        sesi.update(fitur_lurus(), W, H, i / FPS)
+    assert sesi.is_calibrated
+    return sesi.calibration_profile(W, H)
+
+
+def jalankan(sesi, wajah_terlihat, detik):
+    """Update `sesi` selama `detik` pada 30 FPS; `wajah_terlihat(t)` menentukan apakah wajah terdeteksi."""
+    events = []
+    for i in range(int(detik * FPS)):
+        t = i / FPS
+        events += sesi.update(fitur_lurus() if wajah_terlihat(t) else None, W, H, t)
+    return events
+
+
+def test_profil_tanpa_wajah_di_awal():
+    # Kamera/model warm-up: wajah baru terlihat setelah jendela kalibrasi (3 s) lewat
+    sesi = ProctorSession()
+    sesi.start_calibration(0.0, profil_tersimpan())
+    events = jalankan(sesi, lambda t: t >= 3.3, 10)
+    kalibrasi = [e for e in events if e["type"] == "calibrated"]
+    assert sesi.is_calibrated and not sesi.is_calibrating
+    assert kalibrasi[0]["source"] == "profile"
+    assert kalibrasi[0]["t"] < 3.3 + 1.0
+
+
+def test_tanpa_profil_tanpa_wajah_di_awal():
+    sesi = ProctorSession()
+    sesi.start_calibration(0.0)
+    events = jalankan(sesi, lambda t: t >= 3.3, 10)
+    assert sesi.is_calibrated
+    assert [e["source"] for e in events if e["type"] == "calibrated"] == ["calibration"]
+
+
+def test_profil_wajah_sekilas_lanjut_kalibrasi_penuh():
+    # Satu frame wajah di awal, lalu hilang melewati jendela: profil tidak bisa dicek, kalibrasi penuh dimulai ulang
+    sesi = ProctorSession(config=ProctorConfig(calibration_min_time=None))
+    sesi.start_calibration(0.0, profil_tersimpan())
+    events = jalankan(sesi, lambda t: t < 1 / FPS or t >= 5.0, 10)
+    kalibrasi = [e for e in events if e["type"] == "calibrated"]
+    assert sesi.is_calibrated
+    assert kalibrasi[0]["source"] == "calibration"
+    assert kalibrasi[0]["samples"] > 2
@@ -0,0 +1,108 @@
+from calibration import TOLERANSI_RELATIF, RunningStats, cek_drift
+from head_features import apply_deadzone, direction_percents
+from smoothing import buat_filter
+
+
+class HeadTracker:
+    """
+    Logika mode test di main.py tanpa tampilan: kalibrasi "hidung di dalam kotak",
+    jeda siap, lalu persentase kanan/kiri/atas/bawah yang sudah di-smoothing & deadzone.
+    Selama jeda siap, offset hidung netral dikumpulkan (Welford); jeda berakhir lebih awal jika sudah stabil.
+    Dengan profil tersimpan, kotak & jeda dilewati jika offset netral saat ini masih cocok (cek drift singkat).
+    Waktu diberikan dari luar (`now`) agar bisa dipakai untuk replay rekaman.
+    """
+
+    # Status yang bisa dikembalikan update()
+    TANPA_WAJAH = "tanpa_wajah"
+    VERIFIKASI = "verifikasi"
+    KALIBRASI = "kalibrasi"
+    SIAP = "siap"
+    TRACKING = "tracking"
+
+    def __init__(self, smoothing_frames=7, smoothing_filter="moving_average", deadzone=4,
+                 scale=0.25, box=(0.3, 0.4), ready_seconds=2.0, use_pose=False, pose_scale=(45.0, 30.0),
+                 min_ready_seconds=0.5, profile=None, drift_seconds=0.5):
+        self.deadzone = deadzone
+        self.scale = scale
+        # use_pose: pakai sudut yaw/pitch asli (engine Tasks) jika ada; pose_scale = derajat untuk 100%
+        self.use_pose = use_pose
+        self.pose_scale = pose_scale
+        self.box = box
+        self.ready_seconds = ready_seconds
+        self.min_ready_seconds = min_ready_seconds
+        self.drift_seconds = drift_seconds
+        self.smoother = buat_filter(smoothing_filter, 4, window=smoothing_frames)
+        self.netral = RunningStats(2)  # offset hidung (dx, dy) saat wajah lurus
+        self.percents = (0, 0, 0, 0)  # kanan, kiri, atas, bawah (final)
+        self.reset(profile)
+
+    def reset(self, profile=None):
+        """Ulangi kalibrasi dan kosongkan history smoothing (tombol 'r'); `profile` = profil tersimpan untuk dicek."""
+        self.kalibrasi_selesai = False
+        self.siap_selesai = False
+        self.waktu_kalibrasi_selesai = 0
+        self.profile_check = profile if profile and profile.get("neutral") else None
+        self.profile_used = None
+        self._mulai_cek = None
+        self.netral.reset()
+        self.smoother.reset()
+        self.percents = (0, 0, 0, 0)
+        self.status = self.VERIFIKASI if self.profile_check is not None else self.KALIBRASI
+
+    def calibration_box(self, w, h):
+        box_width, box_height = int(w * self.box[0]), int(h * self.box[1])
+        x1, y1 = (w - box_width) // 2, (h - box_height) // 2
+        return x1, y1, x1 + box_width, y1 + box_height
+
+    def calibration_profile(self, w, h):
+        """Offset netral sebagai dict JSON untuk ProfileStore, None jika jeda siap belum selesai."""
+        if self.profile_used is not None:
+            return self.profile_used
+        if not self.siap_selesai or len(self.netral) < 2:
+            return None
+        return {"neutral": self.netral.to_dict((w, h))}
+
+    def _verifikasi(self, fitur, w, h, now):
+        if self._mulai_cek is None:
+            self._mulai_cek = now
+        self.netral.update(fitur.nose_offset)
+        if now - self._mulai_cek < self.drift_seconds or len(self.netral) < 2:
+            return self.VERIFIKASI
+        cocok, _ = cek_drift(self.profile_check["neutral"], self.netral, (w, h))
+        if cocok:
+            self.kalibrasi_selesai = self.siap_selesai = True
+            self.profile_used = self.profile_check
+        else:
+            self.netral.reset()  # posisi berubah: kembali ke kalibrasi kotak biasa
+        self.profile_check = None
+        return self.SIAP if cocok else self.KALIBRASI
+
+    def update(self, fitur, w, h, now):
+        """Proses satu frame (`fitur` = HeadFeatures atau None), kembalikan status frame ini."""
+        if fitur is None:
+            self.status = self.TANPA_WAJAH
+        elif self.profile_check is not None:
+            self.status = self._verifikasi(fitur, w, h, now)
+        elif not self.kalibrasi_selesai:
+            x1, y1, x2, y2 = self.calibration_box(w, h)
+            if x1 < fitur.x_n < x2 and y1 < fitur.y_n < y2:
+                self.kalibrasi_selesai = True
+                self.waktu_kalibrasi_selesai = now
+            self.status = self.KALIBRASI
+        elif not self.siap_selesai:
+            self.netral.update(fitur.nose_offset)
+            lama = now - self.waktu_kalibrasi_selesai
+            self.siap_selesai = lama >= self.ready_seconds or (
+                lama >= self.min_ready_seconds and self.netral.stabil(TOLERANSI_RELATIF * max(w, h)))
+            self.status = self.SIAP
+        else:
+            if self.use_pose and fitur.pose is not None:
+                dx, dy = fitur.pose_offset
+                raw_percent = direction_percents(dx, dy, *self.pose_scale)
+            else:
+                dx, dy = fitur.nose_offset
+                raw_percent = direction_percents(dx, dy, w * self.scale, h * self.scale)
+            smooth_percent = self.smoother.update(raw_percent, now).astype(int)
+            self.percents = tuple(apply_deadzone(smooth_percent, self.deadzone).tolist())
+            self.status = self.TRACKING
+        return self.status
@@ -0,0 +1,135 @@
+import argparse
+import json
+import socket
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from pipeline import LatestSlot
+
+# --- KONFIGURASI ---
+ALAMAT = "127.0.0.1:8765"
+WINDOW_NAME = "Headless Viewer"
+UKURAN = (640, 360)  # lebar, tinggi kanvas
+ARAH = ("kanan", "kiri", "atas", "bawah")
+TOMBOL_PERINTAH = {ord('c'): "calibrate", ord('r'): "reset", ord('s'): "stats"}
+
+
+class Pelanggan:
+    """Klien stream event headless.py: baris JSON dibaca di thread sendiri, pose terbaru di LatestSlot."""
+
+    def __init__(self, host, port, on_event=None):
+        self.on_event = on_event  # dipanggil (dari thread pembaca) untuk setiap event selain pose
+        self.sock = socket.create_connection((host, port), timeout=5)
+        self.sock.settimeout(None)
+        self.pose = LatestSlot()
+        self.events = deque(maxlen=10)  # event selain pose, terbaru di akhir
+        self.status = "-"
+        self.stats = {}
+        self.terputus = False
+        self._thread = threading.Thread(target=self._baca, name="viewer", daemon=True)
+        self._thread.start()
+
+    def _baca(self):
+        try:
+            with self.sock.makefile("r", encoding="utf-8") as f:
+                for baris in f:
+                    event = json.loads(baris)
+                    jenis = event.get("type")
+                    if jenis == "pose":
+                        self.pose.put(event)
+                        continue
+                    if jenis == "status":
+                        self.status = event["status"]
+                    elif jenis == "stats":
+                        self.stats = event
+                    self.events.append(event)
+                    if self.on_event is not None:
+                        self.on_event(event)
+        except (OSError, ValueError):
+            pass
+        self.terputus = True
+        self.pose.close()
+
+    def kirim(self, perintah):
+        self.sock.sendall((perintah + "\n").encode())
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+def teks_event(event):
+    data = {k: v for k, v in event.items() if k not in ("session", "t", "type")}
+    return f"{time.strftime('%H:%M:%S', time.localtime(event.get('t', 0)))} {event['type']} {json.dumps(data)}"
+
+
+def gambar(kanvas, pelanggan, pose):
+    w, h = UKURAN
+    kanvas[:] = 30
+    cv2.putText(kanvas, f"Status: {pelanggan.status}", (20, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+    if pose is not None:
+        for i, arah in enumerate(ARAH):
+            y = 60 + i * 30
+            nilai = int(pose.get(arah, 0))
+            cv2.putText(kanvas, arah, (20, y + 15), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+            cv2.rectangle(kanvas, (90, y), (90 + nilai * 3, y + 20), (255, 255, 0), -1)
+            cv2.putText(kanvas, f"{nilai}%", (400, y + 15), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        warna = (0, 0, 255) if pose.get("warning") else (200, 200, 200)
+        cv2.putText(kanvas, f"seq {pose.get('seq')}  latensi {pose.get('latency_ms')} ms", (20, 190),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, warna, 1)
+    if pelanggan.stats:
+        s = pelanggan.stats
+        cv2.putText(kanvas, f"{s.get('fps')} FPS, p95 {s.get('latency_p95_ms')} ms, dibuang {s.get('dropped')}",
+                    (20, 215), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
+    for i, event in enumerate(list(pelanggan.events)[-5:]):
+        cv2.putText(kanvas, teks_event(event)[:80], (20, 245 + i * 20), cv2.FONT_HERSHEY_SIMPLEX, 0.4,
+                    (0, 0, 255) if event["type"] == "violation" else (180, 180, 180), 1)
+    cv2.putText(kanvas, "c: kalibrasi  r: reset  s: stats  q: keluar", (20, h - 10),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.45, (120, 120, 120), 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Viewer debug untuk stream event headless.py --listen")
+    parser.add_argument("address", nargs="?", default=ALAMAT, help="HOST:PORT server headless.py")
+    parser.add_argument("--text", action="store_true", help="cetak event ke terminal, tanpa jendela")
+    parser.add_argument("--send", choices=sorted(set(TOMBOL_PERINTAH.values()) | {"quit"}),
+                        help="kirim satu perintah lalu keluar")
+    args = parser.parse_args()
+
+    host, port = args.address.rsplit(":", 1)
+    pelanggan = Pelanggan(host, int(port), (lambda e: print(teks_event(e))) if args.text else None)
+
+    if args.send:
+        pelanggan.kirim(args.send)
+        time.sleep(0.2)
+    elif args.text:
+        # Mode teks: event dicetak semuanya (on_event), pose paling banyak 10x per detik
+        try:
+            while not pelanggan.terputus:
+                pose = pelanggan.pose.get(timeout=0.1)
+                if pose is not None:
+                    print(" ".join(f"{a}:{pose[a]:3d}%" for a in ARAH), f"seq {pose['seq']}")
+                    time.sleep(0.1)
+        except KeyboardInterrupt:
+            pass
+    else:
+        kanvas = np.zeros((UKURAN[1], UKURAN[0], 3), dtype=np.uint8)
+        pose = None
+        while not pelanggan.terputus:
+            pose = pelanggan.pose.get(timeout=0.03) or pose
+            gambar(kanvas, pelanggan, pose)
+            cv2.imshow(WINDOW_NAME, kanvas)
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
+                break
+            if key in TOMBOL_PERINTAH:
+                pelanggan.kirim(TOMBOL_PERINTAH[key])
+        cv2.destroyAllWindows()
+    pelanggan.close()
@@ -0,0 +1,181 @@
+import json
+import struct
+import threading
+
+from pipeline import LatestSlot
+
+# --- FORMAT PESAN BINER (11 byte, little endian) ---
+#   byte 0     : header = versi (4 bit atas) | flag (4 bit bawah, bit 0 = keyframe)
+#   byte 1..4  : kanan, kiri, atas, bawah (0..100, uint8)
+#   byte 5..6  : nomor urut (uint16, berputar)
+#   byte 7..10 : timestamp milidetik (uint32, berputar tiap ~49 hari)
+VERSI = 1
+FLAG_KEYFRAME = 0x01
+_PESAN = struct.Struct("<B4BHI")
+UKURAN_PESAN = _PESAN.size  # 11
+
+ARAH = ("kanan", "kiri", "atas", "bawah")
+
+# --- KONFIGURASI DEFAULT ---
+DEADZONE = 4              # perubahan <= ini (persen) tidak dikirim di mode delta
+KEYFRAME_INTERVAL = 1.0   # detik; nilai lengkap dikirim ulang walau tidak berubah (pemulihan pesan hilang)
+
+
+class PoseMessage:
+    """Satu update pose kepala hasil decode (biner maupun JSON)."""
+
+    __slots__ = ("percents", "seq", "t_ms", "keyframe")
+
+    def __init__(self, percents, seq=None, t_ms=None, keyframe=True):
+        self.percents = tuple(percents)  # kanan, kiri, atas, bawah
+        self.seq = seq
+        self.t_ms = t_ms
+        self.keyframe = keyframe
+
+    def as_dict(self):
+        return dict(zip(ARAH, self.percents))
+
+
+def _byte(nilai):
+    return 0 if nilai < 0 else 100 if nilai > 100 else int(nilai)
+
+
+def encode(percents, seq, t_ms, keyframe=False):
+    kanan, kiri, atas, bawah = percents
+    header = (VERSI << 4) | (FLAG_KEYFRAME if keyframe else 0)
+    return _PESAN.pack(header, _byte(kanan), _byte(kiri), _byte(atas), _byte(bawah),
+                       seq & 0xFFFF, int(t_ms) & 0xFFFFFFFF)
+
+
+def decode(data):
+    if len(data) != UKURAN_PESAN:
+        raise ValueError(f"pesan biner harus {UKURAN_PESAN} byte, bukan {len(data)}")
+    header, kanan, kiri, atas, bawah, seq, t_ms = _PESAN.unpack(data)
+    if header >> 4 != VERSI:
+        raise ValueError(f"versi protokol {header >> 4} tidak didukung")
+    return PoseMessage((kanan, kiri, atas, bawah), seq, t_ms, bool(header & FLAG_KEYFRAME))
+
+
+def is_binary_message(data):
+    return isinstance(data, (bytes, bytearray)) and len(data) == UKURAN_PESAN and data[0] >> 4 == VERSI
+
+
+def encode_json(percents):
+    """Format teks yang dikirim camera_screen.dart (tetap didukung ESP32)."""
+    kanan, kiri, atas, bawah = percents
+    return f'{{"kanan": {kanan}, "kiri": {kiri}, "atas": {atas}, "bawah": {bawah}}}'
+
+
+def decode_any(payload):
+    """Terima pesan biner atau JSON, kembalikan PoseMessage."""
+    if isinstance(payload, (bytes, bytearray)) and is_binary_message(payload):
+        return decode(payload)
+    data = json.loads(payload)
+    return PoseMessage([int(data.get(a, 0)) for a in ARAH])
+
+
+def seq_lebih_baru(seq, seq_sebelum):
+    """Bandingkan nomor urut 16-bit yang berputar (serial number arithmetic)."""
+    return 0 < ((seq - seq_sebelum) & 0xFFFF) < 0x8000
+
+
+# --- MODE KIRIM ---
+class DeltaEncoder:
+    """
+    Putuskan kapan update perlu dikirim.
+    mode "delta": hanya jika ada arah yang berubah > deadzone dari nilai terakhir yang dikirim
+                  (atau berpindah dari/ke 0), plus keyframe berkala.
+    mode "every_frame": kirim setiap frame (perilaku aplikasi Flutter saat ini).
+    """
+
+    def __init__(self, mode="delta", deadzone=DEADZONE, keyframe_interval=KEYFRAME_INTERVAL, binary=True):
+        if mode not in ("delta", "every_frame"):
+            raise ValueError(f"mode kirim tidak dikenal: {mode!r}")
+        self.mode = mode
+        self.deadzone = deadzone
+        self.keyframe_interval = keyframe_interval
+        self.binary = binary
+        self.seq = 0
+        self._terakhir = None
+        self._t_keyframe = None
+        self.frames = 0
+        self.terkirim = 0
+
+    def _berubah(self, percents):
+        for baru, lama in zip(percents, self._terakhir):
+            if abs(baru - lama) > self.deadzone or (baru == 0) != (lama == 0):
+                return True
+        return False
+
+    def update(self, percents, now):
+        """Kembalikan payload (bytes/str) yang harus dikirim untuk frame ini, atau None."""
+        self.frames += 1
+        keyframe = self._t_keyframe is None or now - self._t_keyframe >= self.keyframe_interval
+        if self.mode == "delta" and not keyframe and not self._berubah(percents):
+            return None
+        if keyframe:
+            self._t_keyframe = now
+        self._terakhir = tuple(percents)
+        self.seq = (self.seq + 1) & 0xFFFF
+        self.terkirim += 1
+        if self.binary:
+            return encode(percents, self.seq, now * 1000, keyframe)
+        return encode_json(percents)
+
+
+class PosePublisher:
+    """
+    Kirim stream pose ke WebSocket (ESP32 atau bridge_server.py) dari thread terpisah.
+    publish() tidak pernah menunggu jaringan: payload terbaru ditaruh di LatestSlot,
+    payload lama yang belum terkirim dibuang.
+    """
+
+    def __init__(self, url, mode="delta", binary=True, deadzone=DEADZONE, keyframe_interval=KEYFRAME_INTERVAL):
+        self.url = url
+        self.encoder = DeltaEncoder(mode, deadzone, keyframe_interval, binary)
+        self._slot = LatestSlot()
+        self._berhenti = threading.Event()
+        self.terhubung = False
+        self.byte_terkirim = 0
+        self._thread = threading.Thread(target=self._loop, name="publisher", daemon=True)
+        self._thread.start()
+
+    def publish(self, percents, now):
+        payload = self.encoder.update(percents, now)
+        if payload is not None:
+            self._slot.put(payload)
+
+    def _loop(self):
+        # websockets hanya dibutuhkan jika publisher dipakai
+        from websockets.exceptions import WebSocketException
+        from websockets.sync.client import connect
+
+        jeda = 0.5
+        while not self._berhenti.is_set():
+            try:
+                with connect(self.url, open_timeout=3, compression=None) as ws:
+                    self.terhubung = True
+                    jeda = 0.5
+                    while not self._berhenti.is_set():
+                        payload = self._slot.get(timeout=0.2)
+                        if payload is None:
+                            continue
+                        ws.send(payload)
+                        self.byte_terkirim += len(payload)
+            except (OSError, WebSocketException):
+                # Koneksi gagal/putus: coba lagi dengan jeda yang makin panjang
+                self.terhubung = False
+                self._berhenti.wait(jeda)
+                jeda = min(jeda * 2, 10.0)
+        self.terhubung = False
+
+    def ringkasan(self):
+        enc = self.encoder
+        persen = 100.0 * enc.terkirim / enc.frames if enc.frames else 0.0
+        return (f"Publisher {self.url} ({enc.mode}, {'biner' if enc.binary else 'JSON'}): "
+                f"{enc.terkirim}/{enc.frames} frame dikirim ({persen:.0f}%), {self.byte_terkirim} byte")
+
+    def stop(self):
+        self._berhenti.set()
+        self._slot.close()
+        self._thread.join(timeout=2.0)